@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark of backtesting several strategies over a season with one and with several processes.
+
+The season consists of shuffled copies of the fixture results, so no network access is needed.
+
+Run with `python -m benchmarks.backtest`.
+"""
+import os
+import random
+import time
+
+import f1fantasyoptimizer.backtest as backtest
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.tests.utils as utils
+
+N_ROUNDS = 22
+ENGINES = ("dp", "cpsat")
+
+
+def get_season_data():
+    race = data.parse_event_data(utils.load_fixture("race_result.html"))
+    rng = random.Random(0)
+    season_data = dict()
+    for r in range(N_ROUNDS):
+        names = [name for _, name in race]
+        # Swap neighbours only, so that the form of previous rounds carries some information
+        for i in range(len(names) - 1):
+            if rng.random() < 0.3:
+                names[i], names[i + 1] = names[i + 1], names[i]
+        season_data[f"{r}/venue"] = {"race-result": [(str(i + 1), name) for i, name in enumerate(names)]}
+    return season_data
+
+
+def main():
+    pick_data = utils.get_pick_data()
+    season_data = get_season_data()
+    names, td = utils.get_team_names()
+    for engine in ENGINES:
+        strategies = [backtest.Hindsight(engine=engine), backtest.FixedTeam(names, td),
+                      backtest.RecentForm(window=1, engine=engine), backtest.RecentForm(window=3, engine=engine),
+                      backtest.RecentForm(engine=engine)]
+        for max_workers in sorted({1, os.cpu_count() or 1}):
+            start = time.perf_counter()
+            result = backtest.backtest(pick_data, season_data, strategies, max_workers=max_workers)
+            print(f"engine {engine}, {max_workers} processes: {time.perf_counter() - start:.2f} s")
+        print(result.report())
+        print()
+
+
+if __name__ == '__main__':
+    main()
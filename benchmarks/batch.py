@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Benchmark of `solver.solve_batch` against solving every scenario separately.
+
+Run with `python -m benchmarks.batch`.
+"""
+import time
+
+import numpy as np
+
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tests.utils as utils
+
+SCENARIOS = (10, 100, 1000, 5000)
+# Number of scenarios which are solved separately to extrapolate the time of solving all scenarios separately
+SEPARATE_SAMPLE = 10
+
+
+def solve_separately(pick_data, points):
+    for row in points:
+        for pick, value in zip(pick_data.values(), row):
+            pick.points = value
+        solver.solve(pick_data, engine="dp")
+
+
+def main():
+    pick_data = utils.get_pick_data()
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    solve_separately(pick_data, rng.normal(20, 30, size=(SEPARATE_SAMPLE, len(pick_data))))
+    separate_per_scenario = (time.perf_counter() - start) / SEPARATE_SAMPLE
+
+    print(f"{'scenarios':>10} {'batch [s]':>10} {'per scenario [ms]':>18} {'separately [s]':>15}")
+    for n in SCENARIOS:
+        points = rng.normal(20, 30, size=(n, len(pick_data)))
+        start = time.perf_counter()
+        solver.solve_batch(pick_data, points)
+        batch = time.perf_counter() - start
+        print(f"{n:>10} {batch:>10.3f} {1000 * batch / n:>18.3f} {separate_per_scenario * n:>14.3f}*")
+    print("* extrapolated from solving each scenario separately with the dp engine")
+
+
+if __name__ == '__main__':
+    main()
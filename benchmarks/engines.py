@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark comparing the latency of the engines of `solver.solve`.
+
+Cold start measures importing the solver and solving once in a fresh interpreter, which includes importing the
+dependencies of the engine.
+
+Run with `python -m benchmarks.engines`.
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tests.utils as utils
+
+REPETITIONS = 20
+COLD_START_SCRIPT = """
+import time
+start = time.perf_counter()
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tests.utils as utils
+solver.solve(utils.get_pick_data(), engine="{engine}")
+print(time.perf_counter() - start)
+"""
+
+
+def cold_start(engine: str) -> float:
+    output = subprocess.check_output([sys.executable, "-c", COLD_START_SCRIPT.format(engine=engine)], text=True)
+    return float(output)
+
+
+def main():
+    pick_data = utils.get_pick_data()
+    print(f"{'engine':>8} {'median [ms]':>12} {'min [ms]':>9} {'cold start [ms]':>16}")
+    for engine in solver.ENGINES:
+        solver.solve(pick_data, engine=engine)  # warm up
+        timings = []
+        for _ in range(REPETITIONS):
+            start = time.perf_counter()
+            solver.solve(pick_data, engine=engine)
+            timings.append(time.perf_counter() - start)
+        print(f"{engine:>8} {1000 * statistics.median(timings):>12.2f} {1000 * min(timings):>9.2f} "
+              f"{1000 * cold_start(engine):>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Benchmark of finding the best team for every budget from 90M to 110M in steps of 0.1M: one Pareto frontier with
+`frontier.budget_sweep` compared to one solve per budget with each engine.
+
+Run with `python -m benchmarks.frontier`.
+"""
+import time
+
+import f1fantasyoptimizer.frontier as frontier
+import f1fantasyoptimizer.simulator as simulator
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tests.utils as utils
+
+ENGINES = ("dp", "cpsat")
+
+
+def main():
+    table = utils.get_pick_data().table()
+    start = time.perf_counter()
+    sweep = frontier.budget_sweep(table)
+    frontier_time = time.perf_counter() - start
+    print(f"{'frontier':<10} {frontier_time * 1000:>9.1f} ms for {len(sweep)} budgets")
+
+    for engine in ENGINES:
+        start = time.perf_counter()
+        for budget, team in sweep.items():
+            rows, td = solver.ENGINES[engine](budget=budget).solve(table)
+            points = table.points[rows].sum() + table.points[td]
+            assert abs(points - simulator.calculate_team_totals(team)["points"]) < 1e-6
+        print(f"{engine:<10} {(time.perf_counter() - start) * 1000:>9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
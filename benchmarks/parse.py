@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark of parsing the saved results pages against the previous parser, which decoded every page and built a tree
+of the whole document before querying it with uncompiled XPath expressions.
+
+Peak memory is measured with `tracemalloc`, so it only includes memory allocated by Python, e.g. decoded copies of the
+page, but not the tree built by libxml2.
+
+Run with `python -m benchmarks.parse`.
+"""
+import io
+import time
+import tracemalloc
+
+from lxml import html
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.tests.utils as utils
+
+REPEATS = 200
+
+
+def parse_event_data_tree(content):
+    tree = html.parse(io.StringIO(content.decode()))
+    mode_data = []
+    for entry in tree.xpath("//table[@class='resultsarchive-table']/tbody/tr"):
+        pos = entry.xpath("td[2]/text()")[0]
+        name_fields = entry.xpath("td[4]/descendant::*/text()")
+        mode_data.append((pos, " ".join(filter(None, [name_fields[0], name_fields[1]]))))
+    return mode_data
+
+
+def parse_venues_tree(content):
+    tree = html.parse(io.StringIO(content.decode()))
+    return {venue.text: venue.attrib["value"]
+            for venue in tree.xpath("//select[@class='resultsarchive-filter-form-select' and @name='meetingKey']"
+                                    "/option[string(@value)]")}
+
+
+def measure(parse, content):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        parse(content)
+    duration = (time.perf_counter() - start) / REPEATS
+    tracemalloc.start()
+    parse(content)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return duration, peak
+
+
+def main():
+    pages = (("race_result.html", parse_event_data_tree, data.parse_event_data),
+             ("qualifying.html", parse_event_data_tree, data.parse_event_data),
+             ("races.html", parse_venues_tree, data.parse_venues))
+    print(f"{'page':>16} {'size [kB]':>10} {'before [ms]':>12} {'after [ms]':>11} {'before [kB]':>12} "
+          f"{'after [kB]':>11}")
+    for file_name, before, after in pages:
+        content = utils.load_fixture(file_name)
+        assert before(content) == after(content)
+        (t_before, m_before), (t_after, m_after) = measure(before, content), measure(after, content)
+        print(f"{file_name:>16} {len(content) / 1024:>10.1f} {1000 * t_before:>12.3f} {1000 * t_after:>11.3f} "
+              f"{m_before / 1024:>12.1f} {m_after / 1024:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
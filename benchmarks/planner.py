@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the solve time of `planner.plan` against the number of planned rounds and of `planner.plan_rolling` over a
+whole season.
+
+Projected points vary around the points of the test data and prices follow a random walk.
+
+Run with `python -m benchmarks.planner`.
+"""
+import time
+
+import numpy as np
+
+import f1fantasyoptimizer.planner as planner
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tests.utils as utils
+
+HORIZONS = (1, 2, 4, 8, 12, 16, 24)
+SEASON_ROUNDS = 24
+ROLLING_HORIZONS = (1, 3, 5)
+
+
+def get_projections(pick_data, n_rounds, seed=0):
+    rng = np.random.default_rng(seed)
+    table = pick_data.table()
+    points = np.round(table.points / 3 + rng.normal(0, 8, size=(n_rounds, len(table))))
+    price_changes = rng.choice([-0.3, -0.1, 0, 0.1, 0.3], size=(n_rounds, len(table)))
+    price_changes[0] = 0
+    costs = np.round(np.maximum(table.costs + np.cumsum(price_changes, axis=0), 3.0), 1)
+    return points, costs
+
+
+def main():
+    pick_data = utils.get_pick_data()
+    initial_team = [pick.pick_id for pick in solver.solve(pick_data)]
+    points, costs = get_projections(pick_data, max(max(HORIZONS), SEASON_ROUNDS))
+
+    print(f"{'rounds':>7} {'plan [s]':>9} {'points':>8}")
+    for n in HORIZONS:
+        start = time.perf_counter()
+        result = planner.plan(pick_data, points[:n], costs=costs[:n], initial_team=initial_team)
+        print(f"{n:>7} {time.perf_counter() - start:>9.3f} {result.points:>8.1f}")
+    print()
+
+    print(f"Rolling over {SEASON_ROUNDS} rounds:")
+    print(f"{'horizon':>8} {'total [s]':>10} {'per round [s]':>14} {'points':>8}")
+    for horizon in ROLLING_HORIZONS:
+        start = time.perf_counter()
+        result = planner.plan_rolling(pick_data, points[:SEASON_ROUNDS], costs=costs[:SEASON_ROUNDS],
+                                      initial_team=initial_team, horizon=horizon)
+        elapsed = time.perf_counter() - start
+        print(f"{horizon:>8} {elapsed:>10.3f} {elapsed / SEASON_ROUNDS:>14.3f} {result.points:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
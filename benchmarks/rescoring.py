@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark of scoring many orders which differ from the previous order by one swap of two drivers: mutating picks with
+`simulator.simulate`, scoring from scratch with `simulator.score` and updating `simulator.OrderScorer` incrementally.
+
+Run with `python -m benchmarks.rescoring`.
+"""
+import time
+
+import numpy as np
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.simulator as simulator
+import f1fantasyoptimizer.tests.utils as utils
+
+N_ORDERS = 20000
+
+
+def main():
+    order = data.parse_event_data(utils.load_fixture("race_result.html"))
+    pick_data = utils.get_pick_data()
+    table = pick_data.table()
+    names, td = utils.get_team_names()
+    team_rows, td_row = [table.find(name) for name in names], table.find(td)
+    rng = np.random.default_rng(0)
+    swaps = rng.integers(0, len(order), size=(N_ORDERS, 2)).tolist()
+
+    timings = dict()
+    current = list(order)
+    start = time.perf_counter()
+    for i, j in swaps:
+        current[i], current[j] = current[j], current[i]
+        data.reset_points(pick_data)
+        simulator.simulate(pick_data, current)
+    timings["simulate"] = time.perf_counter() - start
+
+    current = list(order)
+    start = time.perf_counter()
+    for i, j in swaps:
+        current[i], current[j] = current[j], current[i]
+        simulator.score(table, current)
+    timings["score"] = time.perf_counter() - start
+
+    scorer = simulator.OrderScorer.from_order(table, order)
+    start = time.perf_counter()
+    for i, j in swaps:
+        scorer.swap(i, j)
+        scorer.team_points(team_rows, td_row)
+    timings["incremental"] = time.perf_counter() - start
+
+    assert np.allclose(scorer.points, simulator.score(table, current))
+    for name, seconds in timings.items():
+        print(f"{name:<12} {seconds / N_ORDERS * 1e6:>8.1f} µs per order")
+
+
+if __name__ == '__main__':
+    main()
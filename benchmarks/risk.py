@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the solve time of the risk-aware objectives against the number of scenarios.
+
+The scenarios are sampled with `montecarlo.simulate` from a distribution in which expensive drivers tend to finish in
+front, but every driver can finish anywhere or not at all.
+
+Run with `python -m benchmarks.risk`.
+"""
+import math
+import time
+
+import numpy as np
+
+import f1fantasyoptimizer.montecarlo as montecarlo
+import f1fantasyoptimizer.risk as risk
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tests.utils as utils
+from f1fantasyoptimizer.data import Pick
+
+SCENARIOS = (100, 250, 500, 1000)
+TIME_LIMIT = 30  # seconds
+DNF_PROBABILITY = 0.08
+
+
+def get_distribution(pick_data):
+    drivers = sorted((pick for pick in pick_data.values() if pick.pick_type == Pick.PickType.DRIVER),
+                     key=lambda pick: -pick.cost)
+    positions = np.array([[math.exp(-abs(i - rank) / 3) for i in range(len(drivers))] for rank in range(len(drivers))])
+    return montecarlo.PositionDistribution([pick.name for pick in drivers], positions,
+                                           dnf=np.full(len(drivers), DNF_PROBABILITY))
+
+
+def main():
+    pick_data = utils.get_pick_data()
+    distribution = get_distribution(pick_data)
+    rival = solver.solve(pick_data, engine="dp")
+
+    print(f"{'scenarios':>10} {'cvar [s]':>9} {'var [s]':>8} {'beat rival [s]':>15}")
+    for n in SCENARIOS:
+        samples = montecarlo.simulate(pick_data, distribution, n, seed=n, max_workers=1, keep_samples=True).samples
+        timings = []
+        for solve in (lambda: risk.solve_cvar(pick_data, samples, alpha=0.1, time_limit=TIME_LIMIT),
+                      lambda: risk.solve_value_at_risk(pick_data, samples, q=0.1, time_limit=TIME_LIMIT),
+                      lambda: risk.solve_beat_rival(pick_data, samples, rival, time_limit=TIME_LIMIT)):
+            start = time.perf_counter()
+            solve()
+            timings.append(time.perf_counter() - start)
+        print(f"{n:>10} " + " ".join(f"{t:>{w}.2f}{'*' if t >= TIME_LIMIT else ' '}"
+                                     for t, w in zip(timings, (8, 7, 14))))
+    print(f"* stopped after {TIME_LIMIT} s and returned the best team found so far")
+
+
+if __name__ == '__main__':
+    main()
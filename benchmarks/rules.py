@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark of re-scoring a season under a rule set in one batched pass with `rules.score_season`, compared to scoring
+every mode of every round separately with `simulator.score`. `rescore` is the time to score the already encoded results
+under another rule set.
+
+The season consists of shuffled copies of the fixture results, so no network access is needed.
+
+Run with `python -m benchmarks.rules`.
+"""
+import random
+import time
+
+import numpy as np
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.rules as rules
+import f1fantasyoptimizer.simulator as simulator
+import f1fantasyoptimizer.tests.utils as utils
+
+SEASON_LENGTHS = (22, 220, 2200)
+MODES = ("qualifying", "race-result")
+# Race points of the fantasy game with penalties for drivers who are not classified
+VARIANT_RULES = rules.RuleSet.from_dict("variant", {"*": {"position_points": [25, 18, 15, 12, 10, 8, 6, 4, 2, 1],
+                                                          "status_points": {"NC": -20, "DQ": -20},
+                                                          "constructor_bonuses": [(10, [0, 2, 5])]}})
+
+
+def get_season_data(n_rounds: int) -> data.SeasonData:
+    race = data.parse_event_data(utils.load_fixture("race_result.html"))
+    rng = random.Random(n_rounds)
+    season_data = dict()
+    for r in range(n_rounds):
+        event_data = dict()
+        for mode in MODES:
+            names = [name for _, name in race]
+            rng.shuffle(names)
+            event_data[mode] = [(str(i + 1), name) for i, name in enumerate(names)]
+        season_data[f"{r}/venue"] = event_data
+    return season_data
+
+
+def main():
+    table = utils.get_pick_data().table()
+    print(f"{'rounds':>7} {'loop [ms]':>10} {'batched [ms]':>13} {'rescore [ms]':>13}")
+    for n_rounds in SEASON_LENGTHS:
+        season_data = get_season_data(n_rounds)
+
+        start = time.perf_counter()
+        loop = np.vstack([sum(simulator.score(table, event_data[mode]) for mode in MODES)
+                          for event_data in season_data.values()])
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batched = rules.score_season(table, season_data, rules.LEGACY_RULES)
+        batched_time = time.perf_counter() - start
+
+        ranks, statuses = rules.LEGACY_RULES.compile(table, MODES).encode(list(season_data.values()))
+        start = time.perf_counter()
+        VARIANT_RULES.compile(table, MODES).score(ranks, statuses)
+        rescore_time = time.perf_counter() - start
+
+        assert np.allclose(loop, batched)
+        print(f"{n_rounds:>7} {loop_time * 1000:>10.1f} {batched_time * 1000:>13.1f} {rescore_time * 1000:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
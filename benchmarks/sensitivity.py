@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark of finding the points thresholds of all picks with `sensitivity.analyze`, compared to bisecting every
+threshold with repeated solves of the dynamic programming engine.
+
+Run with `python -m benchmarks.sensitivity`.
+"""
+import math
+import time
+
+import f1fantasyoptimizer.sensitivity as sensitivity
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tests.utils as utils
+
+# Points are searched within this distance of the current points of a pick
+SEARCH_RANGE = 500
+# Bisection stops once the threshold is known to this precision
+PRECISION = 0.05
+
+
+def bisect(table, engine, row, direction, team) -> tuple[float, int]:
+    changed = table.copy()
+    low, high, solves = 0.0, float(SEARCH_RANGE), 0
+    changed.points[row] = table.points[row] + direction * high
+    solves += 1
+    if engine.solve(changed) == team:
+        return math.inf * direction, solves
+    while high - low > PRECISION:
+        middle = (low + high) / 2
+        changed.points[row] = table.points[row] + direction * middle
+        solves += 1
+        if engine.solve(changed) == team:
+            low = middle
+        else:
+            high = middle
+    return float(table.points[row] + direction * high), solves
+
+
+def main():
+    table = utils.get_pick_data().table()
+    start = time.perf_counter()
+    report = sensitivity.analyze(table)
+    print(f"sensitivity: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    engine = solver.DynamicProgrammingEngine()
+    rows, td = engine.solve(table)
+    team = (sorted(rows), td)
+    start = time.perf_counter()
+    total_solves = 0
+    for row, pick in enumerate(report.picks):
+        for direction, expected in ((-1, pick.points_lower), (1, pick.points_upper)):
+            threshold, solves = bisect(table, engine, row, direction, team)
+            total_solves += solves
+            # The engine rounds points to a 0.1 grid, which moves ties by up to half a step
+            assert threshold == expected or abs(threshold - expected) <= PRECISION + 0.05 + 1e-9
+    print(f"bisection:   {(time.perf_counter() - start) * 1000:.1f} ms, {total_solves} solves")
+
+
+if __name__ == '__main__':
+    main()
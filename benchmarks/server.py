@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Load test of the optimization server: concurrent clients on keep-alive connections send solve, simulate and evaluate
+requests for a few venues, so that some of the requests are identical and are coalesced.
+
+The downloads are replaced by the test fixtures, so no network access is needed.
+
+Run with `python -m benchmarks.server`.
+"""
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.tests.utils as utils
+import f1fantasyoptimizer.ui.cli as cli
+import f1fantasyoptimizer.ui.server as server
+
+N_CLIENTS = 32
+N_REQUESTS = 2000
+ENGINES = ("dp", "cpsat")
+VENUES = {f"Venue {i}": f"{i}/venue" for i in range(4)}
+
+
+def patch_downloads():
+    results = {"race-result": data.parse_event_data(utils.load_fixture("race_result.html")),
+               "qualifying": data.parse_event_data(utils.load_fixture("qualifying.html"))}
+    data.download_pick_data = utils.get_pick_data
+    data.download_venues = lambda season: VENUES
+    data.download_mode_data = lambda *, season, venue_id, mode: results[mode]
+
+
+def get_requests() -> list[tuple[str, dict]]:
+    names, td = utils.get_team_names()
+    rng = random.Random(0)
+    requests = []
+    for _ in range(N_REQUESTS):
+        event = {"season": 2023, "venue": rng.choice(list(VENUES)), "modes": rng.choice([["race-result"],
+                                                                                        ["qualifying"]])}
+        command = rng.choice(server.SERVER_COMMANDS)
+        requests.append((command, {**event, "team": names, "td": td} if command == "evaluate" else event))
+    return requests
+
+
+async def client(port: int, requests: list[tuple[str, dict]], latencies: list[float]):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for command, body in requests:
+        content = json.dumps(body).encode()
+        start = time.perf_counter()
+        writer.write(f"POST /{command} HTTP/1.1\r\nContent-Length: {len(content)}\r\n\r\n".encode() + content)
+        await writer.drain()
+        status = (await reader.readline()).split()[1]
+        length = 0
+        while (line := await reader.readline()).strip():
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+        if status != b"200":
+            raise RuntimeError(f"Request failed with status {status.decode()}.")
+    writer.close()
+
+
+async def load_test(engine: str):
+    optimization_server = server.OptimizationServer(cli.Runner(engine=engine))
+    listener = await optimization_server.start("127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    requests = get_requests()
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, requests[i::N_CLIENTS], latencies) for i in range(N_CLIENTS)))
+    elapsed = time.perf_counter() - start
+    listener.close()
+    await listener.wait_closed()
+    optimization_server.close()
+    latencies = np.array(latencies) * 1000
+    print(f"engine {engine}: {len(latencies) / elapsed:.0f} requests/s, p50 {np.percentile(latencies, 50):.1f} ms, "
+          f"p99 {np.percentile(latencies, 99):.1f} ms, {optimization_server.coalesced} of "
+          f"{optimization_server.requests} requests coalesced")
+
+
+def main():
+    patch_downloads()
+    for engine in ENGINES:
+        asyncio.run(load_test(engine))
+
+
+if __name__ == '__main__':
+    main()
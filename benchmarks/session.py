@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark of re-solving with `solver.SolverSession` after the points of a few picks changed, compared to solving from
+scratch with `solver.solve`.
+
+Run with `python -m benchmarks.session`.
+"""
+import time
+
+import numpy as np
+
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tests.utils as utils
+
+UPDATES = 500
+CHANGED_PICKS = (1, 2, 5)
+POINTS_SIGMA = 5
+
+
+def get_updates(pick_data, n_changed, seed=0):
+    rng = np.random.default_rng(seed)
+    pick_ids = list(pick_data.keys())
+    points = {pick_id: pick.points for pick_id, pick in pick_data.items()}
+    updates = []
+    for _ in range(UPDATES):
+        changes = dict()
+        for pick_id in rng.choice(pick_ids, n_changed, replace=False).tolist():
+            points[pick_id] = float(np.round(points[pick_id] + rng.normal(0, POINTS_SIGMA), 1))
+            changes[pick_id] = points[pick_id]
+        updates.append(changes)
+    return updates
+
+
+def main():
+    print(f"{'changed':>8} {'solve [ms]':>11} {'session [ms]':>13} {'skipped':>8}")
+    for n_changed in CHANGED_PICKS:
+        pick_data = utils.get_pick_data()
+        updates = get_updates(pick_data, n_changed)
+
+        start = time.perf_counter()
+        for changes in updates:
+            for pick_id, points in changes.items():
+                pick_data[pick_id].points = points
+            solver.solve(pick_data)
+        scratch = (time.perf_counter() - start) / UPDATES
+
+        session = solver.SolverSession(utils.get_pick_data())
+        start = time.perf_counter()
+        for changes in updates:
+            session.update(changes)
+        incremental = (time.perf_counter() - start) / UPDATES
+        print(f"{n_changed:>8} {1000 * scratch:>11.2f} {1000 * incremental:>13.2f} {session.skipped / UPDATES:>8.0%}")
+
+
+if __name__ == '__main__':
+    main()
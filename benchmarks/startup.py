@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the cold start time of the CLI.
+
+Every measurement starts a fresh interpreter. The import time of the CLI module is measured inside the interpreter, so
+it does not depend on the startup time of Python itself. Bytecode is written by a warm-up run first, like for an
+installed package. Exits with status 1 if the median import time exceeds the budget, so it can be run in CI.
+
+Run with `python -m benchmarks.startup [--budget MS]`.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPEATS = 10
+# Maximum median import time of the CLI in milliseconds
+DEFAULT_BUDGET = 150.0
+
+IMPORT_CLI = "import time; start = time.perf_counter(); import f1fantasyoptimizer.ui.cli; " \
+             "print(1000 * (time.perf_counter() - start))"
+
+
+def run(args, env):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, *args], capture_output=True, check=True, text=True, env=env)
+    return 1000 * (time.perf_counter() - start), result.stdout
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET,
+                            help="maximum median import time of the CLI in milliseconds")
+    args = arg_parser.parse_args()
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+    commands = {
+        "python": ["-c", "pass"],
+        "--version": ["-m", "f1fantasyoptimizer", "--version"],
+        "import cli": ["-c", IMPORT_CLI],
+    }
+    for command in commands.values():
+        run(command, env)
+
+    import_times = []
+    print(f"{'command':>12} {'median [ms]':>12} {'min [ms]':>9}")
+    for name, command in commands.items():
+        timings = []
+        for _ in range(REPEATS):
+            duration, stdout = run(command, env)
+            timings.append(duration)
+            if name == "import cli":
+                import_times.append(float(stdout))
+        print(f"{name:>12} {statistics.median(timings):>12.1f} {min(timings):>9.1f}")
+
+    median_import = statistics.median(import_times)
+    print(f"import time of the CLI: {median_import:.1f} ms (budget {args.budget:.1f} ms)")
+    if median_import > args.budget:
+        print("The import time exceeds the budget!", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite of the core operations on synthetic pools of picks of growing size, with regression gates.
+
+Every size gets a random pool of picks, a random finishing order of its drivers and a results page and a feed rendered
+from them, so the parsers are measured on pages of the same size as the pool. The saved fixtures are parsed as well.
+The median time of every case is compared with the baselines stored in `benchmarks/baselines.json`; the suite exits
+with status 1 if any case is slower than its baseline by more than the threshold, so it can be run in CI. Baselines
+depend on the machine, so record them with `--update` on the machine which runs the gates.
+
+Run with `python -m benchmarks.suite [--sizes N ...] [--threshold RATIO] [--update]`.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.simulator as simulator
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tests.utils as utils
+
+SIZES = (30, 300, 3000)
+ENGINES = ("dp", "cpsat")
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+# Maximum ratio of the median time of a case to its baseline
+DEFAULT_THRESHOLD = 1.5
+# Differences below this number of milliseconds are timer noise and never count as regressions
+NOISE_FLOOR = 0.05
+# Every case is repeated until it ran for this number of seconds, but at least `MIN_REPEATS` times
+MIN_TIME = 0.5
+MIN_REPEATS = 3
+MAX_REPEATS = 1000
+FIXTURES = ("race_result.html", "qualifying.html")
+
+
+def measure(function: Callable[[], object]) -> float:
+    """
+    Measure the median time of a function in milliseconds.
+    """
+    function()  # warm up
+    timings = []
+    deadline = time.perf_counter() + MIN_TIME
+    while len(timings) < MIN_REPEATS or (time.perf_counter() < deadline and len(timings) < MAX_REPEATS):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return 1000 * statistics.median(timings)
+
+
+def get_cases(sizes: list[int]) -> dict[str, Callable[[], object]]:
+    cases = dict()
+    for name in FIXTURES:
+        content = utils.load_fixture(name)
+        cases[f"parse_event_data[{name}]"] = lambda content=content: data.parse_event_data(content)
+    races = utils.load_fixture("races.html")
+    cases["parse_venues[races.html]"] = lambda: data.parse_venues(races)
+
+    for size in sizes:
+        pick_data = utils.get_synthetic_pick_data(size)
+        table = pick_data.table()
+        order = utils.get_random_order(pick_data, 0)
+        page, feed = utils.render_results_page(order), utils.render_pick_feed(pick_data)
+        team = solver.solve(table, engine="dp")
+
+        def simulate(pick_data=pick_data, order=order):
+            data.reset_points(pick_data)
+            simulator.simulate(pick_data, order)
+
+        for engine in ENGINES:
+            cases[f"solve[{engine}]/{size}"] = lambda table=table, engine=engine: solver.solve(table, engine=engine)
+        cases[f"simulate/{size}"] = simulate
+        cases[f"score/{size}"] = lambda table=table, order=order: simulator.score(table, order)
+        cases[f"calculate_team_totals/{size}"] = lambda team=team: simulator.calculate_team_totals(team)
+        cases[f"parse_event_data/{size}"] = lambda page=page: data.parse_event_data(page)
+        cases[f"parse_pick_data/{size}"] = lambda feed=feed: data.parse_pick_data(feed)
+    return cases
+
+
+def load_baselines() -> dict[str, float]:
+    if not os.path.exists(BASELINES_PATH):
+        return dict()
+    with open(BASELINES_PATH) as f:
+        return json.load(f)["cases"]
+
+
+def save_baselines(results: dict[str, float]):
+    baselines = {**load_baselines(), **{name: round(ms, 4) for name, ms in results.items()}}
+    with open(BASELINES_PATH, "w") as f:
+        json.dump({"machine": platform.machine(), "python": platform.python_version(), "cases": baselines}, f,
+                  indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="numbers of picks of the pools")
+    arg_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                            help="maximum ratio of the time of a case to its baseline")
+    arg_parser.add_argument("--update", action="store_true", help="store the results as the new baselines")
+    args = arg_parser.parse_args()
+
+    baselines = load_baselines()
+    results = dict()
+    regressions = []
+    cases = get_cases(args.sizes)
+    width = max(len(name) for name in cases)
+    print(f"{'case':<{width}} {'median [ms]':>12} {'baseline [ms]':>14} {'ratio':>6}")
+    for name, function in cases.items():
+        results[name] = measure(function)
+        baseline = baselines.get(name)
+        if baseline is None:
+            print(f"{name:<{width}} {results[name]:>12.3f} {'-':>14} {'-':>6}")
+            continue
+        ratio = results[name] / baseline
+        regressed = ratio > args.threshold and results[name] - baseline > NOISE_FLOOR
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<{width}} {results[name]:>12.3f} {baseline:>14.3f} {ratio:>6.2f}{' !' if regressed else ''}")
+
+    if args.update:
+        save_baselines(results)
+        print(f"Stored the baselines of {len(results)} cases in {BASELINES_PATH}.")
+    elif regressions:
+        print(f"{len(regressions)} cases are slower than {args.threshold:.2f} times their baseline: "
+              f"{', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
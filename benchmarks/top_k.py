@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Benchmark of `solver.solve_top_k` for an increasing number of teams.
+
+For comparison, the teams are also found by rebuilding the model from scratch for every team.
+
+Run with `python -m benchmarks.top_k`.
+"""
+import time
+
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tests.utils as utils
+from ortools.sat.python import cp_model
+
+KS = (1, 5, 10, 25, 50, 100)
+
+
+def solve_top_k_rebuilding(pick_data, k):
+    table = pick_data.table()
+    excluded = []
+    for _ in range(k):
+        model, d_select, _ = solver._build_model(table)
+        for selected in excluded:
+            model.Add(sum(d_select[i] for i in selected) <= solver.CAPACITY - 1)
+        cp_solver = cp_model.CpSolver()
+        if cp_solver.Solve(model) != cp_model.OPTIMAL:
+            break
+        excluded.append([i for i in range(len(table)) if cp_solver.Value(d_select[i]) == 1])
+    return excluded
+
+
+def main():
+    pick_data = utils.get_pick_data()
+    print(f"{'k':>5} {'incremental [s]':>16} {'per team [ms]':>14} {'rebuilding [s]':>15}")
+    for k in KS:
+        start = time.perf_counter()
+        teams = solver.solve_top_k(pick_data, k)
+        incremental = time.perf_counter() - start
+        start = time.perf_counter()
+        solve_top_k_rebuilding(pick_data, k)
+        rebuilding = time.perf_counter() - start
+        print(f"{k:>5} {incremental:>16.3f} {1000 * incremental / len(teams):>14.1f} {rebuilding:>15.3f}")
+
+
+if __name__ == '__main__':
+    main()
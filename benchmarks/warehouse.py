@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark of querying results from a `warehouse.ResultsWarehouse` against parsing the results pages again.
+
+The warehouse is filled with the fixture pages for every venue and mode of several seasons, so no network access is
+needed.
+
+Run with `python -m benchmarks.warehouse`.
+"""
+import os
+import tempfile
+import time
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.tests.utils as utils
+import f1fantasyoptimizer.warehouse as warehouse
+
+SEASONS = (2021, 2022, 2023)
+N_VENUES = 22
+PAGES = {"race-result": "race_result.html", "qualifying": "qualifying.html"}
+REPEATS = 10
+
+
+def main():
+    pages = {mode: utils.load_fixture(file_name) for mode, file_name in PAGES.items()}
+    n_pages = len(SEASONS) * N_VENUES * len(pages)
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for _ in range(len(SEASONS) * N_VENUES):
+            for content in pages.values():
+                data.parse_event_data(content)
+    parse = (time.perf_counter() - start) / REPEATS
+
+    with tempfile.TemporaryDirectory() as directory:
+        with warehouse.ResultsWarehouse(os.path.join(directory, "results.sqlite3")) as results_warehouse:
+            start = time.perf_counter()
+            for season in SEASONS:
+                for venue in range(N_VENUES):
+                    for mode, content in pages.items():
+                        results_warehouse.add_event(season=season, venue_id=f"{venue}/venue", mode=mode,
+                                                    order=data.parse_event_data(content))
+            ingest = time.perf_counter() - start
+            timings = {}
+            for name, query in (("season_results", lambda: results_warehouse.season_results(SEASONS[-1])),
+                                ("orders", lambda: results_warehouse.orders(modes=["race-result"])),
+                                ("driver_results", lambda: results_warehouse.driver_results("Max Verstappen"))):
+                start = time.perf_counter()
+                for _ in range(REPEATS):
+                    query()
+                timings[name] = (time.perf_counter() - start) / REPEATS
+
+    print(f"parsing all {n_pages} pages: {1000 * parse:.1f} ms, storing them: {1000 * ingest:.1f} ms")
+    for name, t in timings.items():
+        print(f"{name + ' query':>22}: {1000 * t:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
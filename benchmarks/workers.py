@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the CP-SAT engine with different numbers of search workers, reported from `solver.SolveMetrics`.
+
+Run with `python -m benchmarks.workers`.
+"""
+import os
+import statistics
+
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tests.utils as utils
+
+WORKERS = (1, 2, 4, 8)
+REPETITIONS = 10
+# Pools of picks: the test data and larger random pools as (drivers, constructors)
+POOLS = (None, (60, 20), (120, 40))
+
+
+def main():
+    print(f"{os.cpu_count()} CPU cores")
+    print(f"{'picks':>6} {'workers':>8} {'build [ms]':>11} {'solve [ms]':>11} {'branches':>9} {'conflicts':>10}")
+    for pool in POOLS:
+        pick_data = utils.get_pick_data() if pool is None else \
+            utils.get_random_pick_data(0, n_drivers=pool[0], n_constructors=pool[1])
+        for workers in WORKERS:
+            options = solver.SolverOptions(workers=workers)
+            runs = [solver.solve_with_metrics(pick_data, options=options)[1] for _ in range(REPETITIONS)]
+            print(f"{len(pick_data):>6} {workers:>8} {1000 * statistics.median(m.build_time for m in runs):>11.2f} "
+                  f"{1000 * statistics.median(m.solve_time for m in runs):>11.2f} "
+                  f"{statistics.median(m.branches for m in runs):>9.0f} "
+                  f"{statistics.median(m.conflicts for m in runs):>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,29 @@
 #!/usr/bin/env python3
 import argparse
 
+import f1fantasyoptimizer
+
 
 def main():
-    arg_parser = argparse.ArgumentParser()
+    # The options handled here are parsed first, all further arguments are passed to the CLI, which prints the help
+    arg_parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
     arg_parser.add_argument("--gui", action='store_true')
-    args = arg_parser.parse_args()
-    if args.gui:
+    arg_parser.add_argument("--version", action="version",
+                            version=f"f1fantasyoptimizer {f1fantasyoptimizer.__version__}")
+    arg_parser.add_argument("--list-venues", type=int, metavar="SEASON",
+                            help="print the names and IDs of all venues of a season and exit")
+    args, remaining = arg_parser.parse_known_args()
+    # Only the modules required by the selected action are imported, which keeps the startup time short
+    if args.list_venues is not None:
+        import f1fantasyoptimizer.data as data
+        for venue_name, venue_id in data.download_venues(args.list_venues).items():
+            print(f"{venue_name}\t{venue_id}")
+    elif args.gui:
         import f1fantasyoptimizer.ui.gui as gui
         gui.main()
     else:
         import f1fantasyoptimizer.ui.cli as cli
-        cli.main()
+        cli.main(remaining)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,276 @@
+import abc
+import concurrent.futures
+import os
+import time
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.rules as rules
+import f1fantasyoptimizer.simulator as simulator
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tracing as tracing
+import f1fantasyoptimizer.warehouse as warehouse
+
+
+class Strategy(abc.ABC):
+    """
+    Rule choosing the team of a round.
+
+    Strategies are sent to worker processes, so they must be picklable.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @abc.abstractmethod
+    def select(self, table: data.PickTable, history: np.ndarray, actual: np.ndarray) -> tuple[list[int], int]:
+        """
+        Choose a team.
+        :param table: all possible picks with the points of the fantasy game
+        :param history: matrix of shape (previous rounds, picks) containing the points of every pick in every previous
+            round of the season
+        :param actual: the points of every pick in this round; only strategies defining an upper bound may use them
+        :return: the rows of the selected picks in `table` and the row of the turbo driver
+        """
+        raise NotImplementedError
+
+
+def _best_team(table: data.PickTable, points: np.ndarray, engine: str) -> tuple[list[int], int]:
+    table = table.copy()
+    table.points = np.asarray(points, dtype=np.float64)
+    return solver.get_engine(engine).solve(table)
+
+
+class Hindsight(Strategy):
+    """
+    Picks the best team for the actual points of every round, which no strategy can beat.
+    """
+
+    def __init__(self, *, engine: str = solver.DEFAULT_ENGINE):
+        super().__init__("hindsight")
+        self.engine = engine
+
+    def select(self, table: data.PickTable, history: np.ndarray, actual: np.ndarray) -> tuple[list[int], int]:
+        return _best_team(table, actual, self.engine)
+
+
+class FixedTeam(Strategy):
+    """
+    Keeps the same team in every round.
+    """
+
+    def __init__(self, picks: list[str], td: str, *, name: str = "fixed"):
+        """
+        :param picks: the names of the drivers and constructors
+        :param td: the name of the turbo driver
+        :param name: the name of the strategy
+        """
+        super().__init__(name)
+        self.picks = picks
+        self.td = td
+
+    def select(self, table: data.PickTable, history: np.ndarray, actual: np.ndarray) -> tuple[list[int], int]:
+        rows = [table.find(name) for name in self.picks + [self.td]]
+        if None in rows:
+            raise KeyError(f"Unknown pick `{(self.picks + [self.td])[rows.index(None)]}`.")
+        return rows[:-1], rows[-1]
+
+
+class RecentForm(Strategy):
+    """
+    Picks the best team for the mean points of the previous rounds.
+
+    The points of the fantasy game are used in the first round of the season.
+    """
+
+    def __init__(self, *, window: Optional[int] = None, engine: str = solver.DEFAULT_ENGINE,
+                 name: Optional[str] = None):
+        """
+        :param window: number of previous rounds which are averaged, `None` for all previous rounds
+        :param engine: the engine which finds the best team
+        :param name: the name of the strategy, by default derived from `window`
+        """
+        super().__init__(name or ("season form" if window is None else f"form of last {window}"))
+        self.window = window
+        self.engine = engine
+
+    def select(self, table: data.PickTable, history: np.ndarray, actual: np.ndarray) -> tuple[list[int], int]:
+        if not len(history):
+            return _best_team(table, table.points, self.engine)
+        recent = history if self.window is None else history[-self.window:]
+        return _best_team(table, recent.mean(axis=0), self.engine)
+
+
+class BacktestResult:
+    """
+    Teams and points of several strategies in every round of a season.
+    """
+
+    def __init__(self, strategies: list[str], venue_ids: list[data.Venue.Id], teams: list[list[data.Team]],
+                 scores: np.ndarray, timings: dict[str, float]):
+        self.strategies = strategies
+        self.venue_ids = venue_ids
+        # teams[s][r] is the team of strategy `s` in round `r`; the picks have the actual points of the round
+        self.teams = teams
+        # Matrix of shape (strategies, rounds) containing the points of every strategy in every round
+        self.scores = scores
+        # Seconds spent in each phase; `select <strategy>` is summed over all worker processes
+        self.timings = timings
+
+    @property
+    def cumulative(self) -> np.ndarray:
+        """
+        Matrix of shape (strategies, rounds) containing the total points of every strategy after every round.
+        """
+        return np.cumsum(self.scores, axis=1)
+
+    @property
+    def totals(self) -> dict[str, float]:
+        """
+        The total points of every strategy in the season.
+        """
+        return {name: float(total) for name, total in zip(self.strategies, self.scores.sum(axis=1))}
+
+    def to_records(self) -> list[dict]:
+        """
+        Convert the result to one record per strategy and round, e.g. to write it as JSON Lines.
+        :return: the records
+        """
+        cumulative = self.cumulative
+        return [{"strategy": name, "round": r, "venue_id": venue_id, "points": float(self.scores[s, r]),
+                 "total": float(cumulative[s, r]), "team": [pick.name for pick in self.teams[s][r]],
+                 "td": next(pick.name for pick in self.teams[s][r] if pick.td)}
+                for s, name in enumerate(self.strategies) for r, venue_id in enumerate(self.venue_ids)]
+
+    def report(self) -> str:
+        """
+        Summarize the total points of every strategy and the time spent in each phase.
+        :return: the summary as text
+        """
+        width = max(len(name) for name in [*self.strategies, *self.timings])
+        lines = [f"{'strategy':<{width}} {'total':>8} {'mean':>7} {'best':>7} {'worst':>7}"]
+        for name, scores in zip(self.strategies, self.scores):
+            lines.append(f"{name:<{width}} {scores.sum():>8.1f} {scores.mean():>7.1f} {scores.max():>7.1f} "
+                         f"{scores.min():>7.1f}")
+        lines.append("")
+        lines.append(f"{'phase':<{width}} {'time [s]':>8}")
+        lines.extend(f"{name:<{width}} {seconds:>8.3f}" for name, seconds in self.timings.items())
+        return "\n".join(lines)
+
+
+def load_season(season: data.Season, *, results_warehouse: Optional[warehouse.ResultsWarehouse] = None,
+                modes: Optional[list[data.Mode.Id]] = None) -> data.SeasonData:
+    """
+    Get the results of a season from the results warehouse, downloading only results which are not stored yet.
+    :param season: the season
+    :param results_warehouse: the warehouse, `None` for the warehouse at the default path
+    :param modes: the modes for which to get placement data, `None` for all modes
+    :return: dictionary containing the placement data of all venues of the season in the order of the rounds
+    """
+    if results_warehouse is None:
+        with warehouse.ResultsWarehouse() as results_warehouse:
+            return load_season(season, results_warehouse=results_warehouse, modes=modes)
+    results_warehouse.ingest(season)
+    return results_warehouse.season_results(season, modes=modes)
+
+
+def event_points(table: data.PickTable, event_data: data.EventData, modes: Sequence[data.Mode.Id]) -> np.ndarray:
+    """
+    Calculate the points of all picks in the given modes of an event.
+
+    Drivers who are not part of `table` are skipped, so results of past seasons can be scored with current picks.
+    :param table: all possible picks
+    :param event_data: the placement data of the event
+    :param modes: the modes whose points are added up; modes without results are skipped
+    :return: the points of every pick
+    """
+    points = np.zeros(len(table))
+    for mode in modes:
+        if mode in event_data:
+            points += simulator.score(table, event_data[mode], ignore_unknown=True)
+    return points
+
+
+_worker_state: Optional[tuple[data.PickTable, np.ndarray, Sequence[Strategy]]] = None
+
+
+def _init_worker(table: data.PickTable, points: np.ndarray, strategies: Sequence[Strategy]):
+    # The inputs are sent to every worker process once instead of with every round
+    global _worker_state
+    _worker_state = (table, points, strategies)
+
+
+def _select_round(r: int) -> list[tuple[list[int], int, float]]:
+    table, points, strategies = _worker_state
+    selections = []
+    for strategy in strategies:
+        start = time.perf_counter()
+        rows, td = strategy.select(table, points[:r], points[r])
+        selections.append((list(rows), td, time.perf_counter() - start))
+    return selections
+
+
+def backtest(pick_data: Union[data.PickData, data.PickTable], season_data: data.SeasonData,
+             strategies: Sequence[Strategy], *, modes: Optional[Sequence[data.Mode.Id]] = None,
+             rule_set: Optional[rules.RuleSet] = None, max_workers: Optional[int] = None) -> BacktestResult:
+    """
+    Evaluate how several strategies would have done in a season.
+
+    The points of every round are calculated from its results, then every strategy chooses a team for every round and
+    the team is scored with the actual points of the round. Rounds are evaluated in parallel by a process pool. The
+    costs of the picks are their current costs, because past costs are not available.
+    :param pick_data: object containing all information about all possible picks or a table of them
+    :param season_data: the placement data of all venues of the season in the order of the rounds, e.g. from
+        `load_season`
+    :param strategies: the strategies to compare
+    :param modes: the modes which score points, `None` for all modes; venues without results in any of them are skipped
+    :param rule_set: the rules scoring the results, `None` for the rules of `simulator.simulate`; reference modes of
+        positions gained must be part of `season_data`
+    :param max_workers: maximum number of processes, `None` for the number of CPUs, `1` to evaluate in this process
+    :return: the teams and points of all strategies in all rounds
+    """
+    if not strategies:
+        raise ValueError("At least one strategy is required.")
+    timings = dict()
+    start = time.perf_counter()
+    table = data.as_pick_table(pick_data)
+    venue_ids = [venue_id for venue_id, event_data in season_data.items()
+                 if any(modes is None or mode in modes for mode in event_data)]
+    if not venue_ids:
+        raise ValueError("The season does not contain any results of the given modes.")
+    if rule_set is None:
+        points = np.vstack([event_points(table, season_data[venue_id], list(season_data[venue_id] if modes is None
+                                                                             else modes))
+                            for venue_id in venue_ids])
+    else:
+        points = rules.score_season(table, {venue_id: season_data[venue_id] for venue_id in venue_ids}, rule_set,
+                                    modes=modes)
+    timings["simulate"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # Spans of worker processes are not recorded, so this span shows the time of the whole selection
+    with tracing.span("backtest.select", tracing.SOLVE, rounds=len(venue_ids)):
+        if max_workers == 1 or len(venue_ids) == 1:
+            _init_worker(table, points, strategies)
+            selections = [_select_round(r) for r in range(len(venue_ids))]
+        else:
+            max_workers = min(max_workers or os.cpu_count() or 1, len(venue_ids))
+            with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                                        initargs=(table, points, strategies)) as executor:
+                selections = list(executor.map(_select_round, range(len(venue_ids))))
+    timings["select (wall)"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    teams = [[] for _ in strategies]
+    scores = np.zeros((len(strategies), len(venue_ids)))
+    round_table = table.copy()
+    for r, round_selections in enumerate(selections):
+        round_table.points = points[r]
+        for s, (rows, td, seconds) in enumerate(round_selections):
+            teams[s].append(round_table.team(rows, td))
+            scores[s, r] = points[r, rows].sum() + points[r, td]
+            timings[f"select {strategies[s].name}"] = timings.get(f"select {strategies[s].name}", 0) + seconds
+    timings["score"] = time.perf_counter() - start
+    return BacktestResult([strategy.name for strategy in strategies], venue_ids, teams, scores, timings)
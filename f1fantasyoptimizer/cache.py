@@ -0,0 +1,321 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Callable, Optional
+
+CACHE_DIR_ENV_VAR: str = "F1FANTASYOPTIMIZER_CACHE_DIR"
+OFFLINE_ENV_VAR: str = "F1FANTASYOPTIMIZER_OFFLINE"
+
+DEFAULT_MAX_SIZE: int = 64 * 1024 * 1024  # bytes
+
+# Opens a request and returns a response object like `urllib.request.urlopen` does
+Opener = Callable[[urllib.request.Request], object]
+
+
+class CacheMissError(OSError):
+    """
+    Raised in offline mode if a requested URL is not contained in the cache.
+
+    Like a failed download, it is an `OSError`, so callers handling network failures handle it as well.
+    """
+
+
+class CacheEntry:
+    """
+    Metadata of a cached response.
+    """
+
+    def __init__(self, url: str, *, size: int, fetched_at: float, accessed_at: float,
+                 etag: Optional[str] = None, last_modified: Optional[str] = None):
+        self.url = url
+        self.size = size
+        self.fetched_at = fetched_at
+        self.accessed_at = accessed_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_fresh(self, ttl: Optional[float], now: float) -> bool:
+        """
+        Check whether the entry may be served without revalidation.
+        :param ttl: time to live in seconds, `None` if the entry never expires
+        :param now: the current time as returned by `time.time()`
+        :return: `True` if the entry has not expired yet
+        """
+        return ttl is None or now - self.fetched_at < ttl
+
+    def to_json(self) -> dict:
+        return {
+            "url": self.url,
+            "size": self.size,
+            "fetched_at": self.fetched_at,
+            "accessed_at": self.accessed_at,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+        }
+
+    @staticmethod
+    def from_json(value: dict) -> "CacheEntry":
+        return CacheEntry(value["url"], size=value["size"], fetched_at=value["fetched_at"],
+                          accessed_at=value["accessed_at"], etag=value.get("etag"),
+                          last_modified=value.get("last_modified"))
+
+
+def default_cache_dir() -> str:
+    """
+    Get the directory in which responses are cached by default.
+
+    The directory can be overridden by setting the environment variable `F1FANTASYOPTIMIZER_CACHE_DIR`.
+    :return: path of the default cache directory
+    """
+    directory = os.environ.get(CACHE_DIR_ENV_VAR)
+    if directory:
+        return directory
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "f1fantasyoptimizer", "Cache")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "f1fantasyoptimizer")
+
+
+def offline_from_env() -> bool:
+    """
+    Check whether offline mode was requested by setting the environment variable `F1FANTASYOPTIMIZER_OFFLINE`.
+    :return: `True` if only cached responses should be served
+    """
+    return os.environ.get(OFFLINE_ENV_VAR, "").lower() in ("1", "true", "yes", "on")
+
+
+class ResponseCache:
+    """
+    Persistent on-disk cache of HTTP responses keyed by URL.
+
+    Expired entries are revalidated using their `ETag` and `Last-Modified` headers. If the total size of all cached
+    responses exceeds `max_size`, the least recently used entries are evicted. In offline mode, cached responses are
+    served regardless of their age and no network requests are made at all.
+
+    Cache hits only update the access times in memory; they are written to the index together with the next change of
+    the entries or by `flush`, which `close` calls.
+    """
+    INDEX_FILE = "index.json"
+    BODY_SUFFIX = ".body"
+
+    def __init__(self, directory: str, *, max_size: int = DEFAULT_MAX_SIZE, offline: bool = False,
+                 opener: Opener = urllib.request.urlopen):
+        self.directory = directory
+        self.max_size = max_size
+        self.offline = offline
+        self.opener = opener
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self._entries: dict[str, CacheEntry] = self._load_index()
+        # Whether access times were changed since the index was written
+        self._dirty = False
+
+    @staticmethod
+    def key(url: str) -> str:
+        """
+        Get the key under which the response for `url` is stored.
+        :param url: the requested URL
+        :return: the cache key
+        """
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    @property
+    def size(self) -> int:
+        """
+        Total size of all cached responses in bytes.
+        """
+        with self._lock:
+            return sum(entry.size for entry in self._entries.values())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return self.key(url) in self._entries
+
+    def fetch(self, url: str, *, ttl: Optional[float]) -> bytes:
+        """
+        Get the response body for `url`, either from the cache or from the network.
+
+        If the network cannot be reached, a stale cached response is served instead.
+        :param url: the URL to request
+        :param ttl: number of seconds for which a cached response is served without revalidation, `None` if cached
+            responses never expire
+        :return: the response body
+        :raise CacheMissError: if the cache is in offline mode and does not contain `url`
+        """
+        key = self.key(url)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and (self.offline or entry.is_fresh(ttl, now)):
+                body = self._read_body(key)
+                if body is not None:
+                    entry.accessed_at = now
+                    self._dirty = True
+                    return body
+                self._remove(key)
+                entry = None
+        if self.offline:
+            raise CacheMissError(f"`{url}` is not cached and offline mode is enabled.")
+
+        request = urllib.request.Request(url)
+        if entry and entry.etag:
+            request.add_header("If-None-Match", entry.etag)
+        if entry and entry.last_modified:
+            request.add_header("If-Modified-Since", entry.last_modified)
+        try:
+            with self.opener(request) as response:
+                body = response.read()
+                headers = response.headers
+        except urllib.error.HTTPError as e:
+            if e.code != 304 or entry is None:
+                raise
+            return self._revalidated(key, url)
+        except urllib.error.URLError:
+            if entry is None:
+                raise
+            return self._revalidated(key, url, refresh=False)
+        if getattr(response, "status", 200) == 304 and entry is not None:
+            return self._revalidated(key, url)
+        self.put(url, body, etag=headers.get("ETag"), last_modified=headers.get("Last-Modified"))
+        return body
+
+    def get(self, url: str) -> Optional[bytes]:
+        """
+        Get the cached response body for `url` regardless of its age.
+        :param url: the requested URL
+        :return: the cached response body or `None` if `url` is not cached
+        """
+        key = self.key(url)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            body = self._read_body(key)
+            if body is None:
+                self._remove(key)
+            return body
+
+    def put(self, url: str, body: bytes, *, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """
+        Store a response body in the cache.
+        :param url: the requested URL
+        :param body: the response body
+        :param etag: value of the `ETag` header of the response
+        :param last_modified: value of the `Last-Modified` header of the response
+        """
+        key = self.key(url)
+        now = time.time()
+        with self._lock:
+            self._write_file(self._body_path(key), body)
+            self._entries[key] = CacheEntry(url, size=len(body), fetched_at=now, accessed_at=now, etag=etag,
+                                            last_modified=last_modified)
+            self._evict(keep=key)
+            self._save_index()
+
+    def invalidate(self, url: str):
+        """
+        Remove the response for `url` from the cache.
+        :param url: the requested URL
+        """
+        with self._lock:
+            self._remove(self.key(url))
+            self._save_index()
+
+    def clear(self):
+        """
+        Remove all responses from the cache.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+            self._save_index()
+
+    def flush(self):
+        """
+        Write access times which were changed by cache hits to the index.
+        """
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def close(self):
+        """
+        Write pending changes of the index. The cache can still be used afterwards.
+        """
+        self.flush()
+
+    def __enter__(self) -> "ResponseCache":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _revalidated(self, key: str, url: str, *, refresh: bool = True) -> bytes:
+        with self._lock:
+            body = self._read_body(key)
+            entry = self._entries.get(key)
+            if body is None or entry is None:
+                raise CacheMissError(f"Cached response for `{url}` disappeared during revalidation.")
+            now = time.time()
+            if refresh:
+                entry.fetched_at = now
+            entry.accessed_at = now
+            self._save_index()
+            return body
+
+    def _evict(self, *, keep: str):
+        total = sum(entry.size for entry in self._entries.values())
+        for key, entry in sorted(self._entries.items(), key=lambda item: item[1].accessed_at):
+            if total <= self.max_size:
+                break
+            if key == keep:
+                continue
+            total -= entry.size
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        self._entries.pop(key, None)
+        try:
+            os.remove(self._body_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ResponseCache.BODY_SUFFIX)
+
+    def _read_body(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._body_path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _load_index(self) -> dict[str, CacheEntry]:
+        try:
+            with open(os.path.join(self.directory, ResponseCache.INDEX_FILE), "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return dict()
+        return {key: CacheEntry.from_json(value) for key, value in index.items()}
+
+    def _save_index(self):
+        index = {key: entry.to_json() for key, entry in self._entries.items()}
+        self._write_file(os.path.join(self.directory, ResponseCache.INDEX_FILE), json.dumps(index).encode())
+        self._dirty = False
+
+    @staticmethod
+    def _write_file(path: str, content: bytes):
+        # Write to a temporary file first so that readers never see partially written files
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
@@ -1,12 +1,25 @@
 import abc
+import atexit
+import concurrent.futures
 import enum
-import io
+import functools
+import http.client
 import json
+import threading
+import time
+import unicodedata
+import urllib.error
 import urllib.request
 from datetime import datetime
-from typing import Any, Optional, TypeAlias
+from typing import TYPE_CHECKING, Iterable, Optional, TypeAlias, Union
 
-from lxml import html
+import f1fantasyoptimizer.cache as cache
+import f1fantasyoptimizer.tracing as tracing
+import f1fantasyoptimizer.transport as transport
+
+if TYPE_CHECKING:
+    import numpy as np
+    from lxml import etree
 
 EVENT_DATA_URL: str = "https://www.formula1.com/en/results/jcr:content/resultsarchive.html" \
                       "/{year}/races/{event_link}/{mode}.html"
@@ -15,6 +28,33 @@ EVENTS_OVERVIEW_DATA_URL: str = "https://www.formula1.com/en/results/jcr:content
 
 PICK_DATA_URL: str = "https://fantasy.formula1.com/feeds/drivers/1_en.json"
 
+# Number of seconds for which cached responses are served without revalidation, `None` if they never expire
+PICK_DATA_TTL: Optional[float] = 60 * 60
+SEASONS_TTL: Optional[float] = 24 * 60 * 60
+CURRENT_SEASON_TTL: Optional[float] = 60 * 60
+FINISHED_SEASON_TTL: Optional[float] = None  # results of finished seasons never change
+
+# Retry policy for failed downloads
+DOWNLOAD_RETRIES: int = 2
+DOWNLOAD_BACKOFF: float = 0.5  # seconds, doubled after every failed attempt
+RETRYABLE_HTTP_STATUS_CODES: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+
+# Maximum number of pages which are downloaded concurrently
+DEFAULT_MAX_WORKERS: int = 8
+
+# Spellings of names which are not matched by `normalize_name`, mapped to the names used by the F1Fantasy website
+NAME_ALIASES: dict[str, str] = {
+    "Alex Albon": "Alexander Albon",
+    "Haas": "Haas F1 Team",
+    "Red Bull": "Red Bull Racing",
+}
+
+_response_cache: Optional[cache.ResponseCache] = None
+_response_cache_configured: bool = False
+
+_download_executors: dict[int, concurrent.futures.ThreadPoolExecutor] = dict()
+_download_executors_lock = threading.Lock()
+
 
 def to_float(value: str, *, default: float = 0.0) -> float:
     """
@@ -42,6 +82,8 @@ class Pick:
         def __str__(self):
             return self.name
 
+    __slots__ = ("pick_id", "pick_type", "name", "points", "cost", "team_id", "td")
+
     def __init__(self, pick_id: int, pick_type: PickType, name: str, points: float, cost: float, team_id: int, *,
                  td=False):
         self.pick_id = pick_id
@@ -80,20 +122,296 @@ Modes: TypeAlias = dict[Mode.Name, Mode.Id]
 Venues: TypeAlias = dict[Venue.Name, Venue.Id]
 
 EventData: TypeAlias = dict[Mode.Id, list[tuple[str, str]]]
-PickData: TypeAlias = dict[int, Pick]
+SeasonData: TypeAlias = dict[Venue.Id, EventData]
 Team: TypeAlias = list[Pick]
 
 
-def find_pick_by_name(pick_data: PickData, name: str) -> int:
+@functools.lru_cache(maxsize=4096)
+def normalize_name(name: str) -> str:
+    """
+    Normalize the name of a pick, so that different spellings of the same name are equal.
+
+    Accents and case are ignored, as well as the order of the parts of the name, e.g. "Zhou Guanyu" and "Guanyu Zhou"
+    are equal.
+    :param name: the name to normalize
+    :return: the normalized name
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    tokens = "".join(c if c.isalnum() else " " for c in stripped.casefold()).split()
+    return " ".join(sorted(tokens))
+
+
+def _name_index(names: Iterable[tuple[str, int]], aliases: dict[str, int]) -> dict[str, int]:
+    index = dict()
+    for name, key in names:
+        index.setdefault(normalize_name(name), key)
+    for alias, canonical in NAME_ALIASES.items():
+        if normalize_name(canonical) in index:
+            index.setdefault(normalize_name(alias), index[normalize_name(canonical)])
+    for alias, key in aliases.items():
+        index[normalize_name(alias)] = key
+    return index
+
+
+class PickData(dict[int, Pick]):
+    """
+    Dictionary of all possible picks by their ID with indexes for looking up picks by name, team and type.
+
+    The indexes are built on first use and rebuilt after picks have been added or removed. The name, team and type of
+    a pick must not be changed while it is contained in the dictionary.
+    """
+
+    def __init__(self, picks: Union[dict[int, Pick], Iterable[tuple[int, Pick]]] = (),
+                 aliases: Optional[dict[str, int]] = None):
+        """
+        :param picks: the picks by their ID
+        :param aliases: further names of picks mapped to their IDs
+        """
+        super().__init__(picks)
+        self._aliases: dict[str, int] = dict(aliases or {})
+        self._names: Optional[dict[str, int]] = None
+        self._teams: Optional[dict[int, list[Pick]]] = None
+        self._types: Optional[dict[Pick.PickType, list[Pick]]] = None
+
+    def __reduce__(self):
+        # Copies and pickles rebuild their indexes instead of copying them
+        return self.__class__, (dict(self), self._aliases)
+
+    def __setitem__(self, key: int, value: Pick):
+        super().__setitem__(key, value)
+        self._invalidate()
+
+    def __delitem__(self, key: int):
+        super().__delitem__(key)
+        self._invalidate()
+
+    def clear(self):
+        super().clear()
+        self._invalidate()
+
+    def pop(self, *args):
+        result = super().pop(*args)
+        self._invalidate()
+        return result
+
+    def popitem(self):
+        result = super().popitem()
+        self._invalidate()
+        return result
+
+    def setdefault(self, key: int, default: Optional[Pick] = None) -> Pick:
+        result = super().setdefault(key, default)
+        self._invalidate()
+        return result
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._invalidate()
+
+    def __ior__(self, other):
+        result = super().__ior__(other)
+        self._invalidate()
+        return result
+
+    def _invalidate(self):
+        self._names = None
+        self._teams = None
+        self._types = None
+
+    def add_alias(self, name: str, pick_id: int):
+        """
+        Make a pick findable by another name.
+        :param name: the other name of the pick
+        :param pick_id: the ID of the pick
+        """
+        self._aliases[name] = pick_id
+        self._names = None
+
+    def find(self, name: str) -> Optional[int]:
+        """
+        Find the ID of a pick by their name.
+
+        Names are compared after `normalize_name`, aliases of this object and `NAME_ALIASES` are taken into account.
+        :param name: the name of the pick to find
+        :return: the ID of the pick or `None` if there is no pick with this name
+        """
+        if self._names is None:
+            self._names = _name_index(((pick.name, pick_id) for pick_id, pick in self.items()), self._aliases)
+        return self._names.get(normalize_name(name))
+
+    def by_team(self, team_id: int) -> list[Pick]:
+        """
+        Get all picks of a team, i.e. the constructor and its drivers.
+        :param team_id: the ID of the team
+        :return: the picks of the team
+        """
+        if self._teams is None:
+            teams = dict()
+            for pick in self.values():
+                teams.setdefault(pick.team_id, []).append(pick)
+            self._teams = teams
+        return self._teams.get(team_id, [])
+
+    def table(self) -> "PickTable":
+        """
+        Get a columnar copy of all picks in the order of `values()`.
+        :return: the table
+        """
+        return PickTable.from_picks(self.values())
+
+    def by_type(self, pick_type: Pick.PickType) -> list[Pick]:
+        """
+        Get all picks of a type.
+        :param pick_type: the type of the picks
+        :return: all drivers or all constructors
+        """
+        if self._types is None:
+            types = {t: [] for t in Pick.PickType}
+            for pick in self.values():
+                types[pick.pick_type].append(pick)
+            self._types = types
+        return self._types[pick_type]
+
+
+class PickTable:
+    """
+    Columnar store of all possible picks.
+
+    Every pick is a row and every attribute a column, so that calculations over all picks can be vectorized with NumPy.
+    `Pick` objects are only created on demand by `pick` and `team`; they are copies of their rows.
+    """
+
+    def __init__(self, pick_ids: "np.ndarray", pick_types: "np.ndarray", names: list[str], points: "np.ndarray",
+                 costs: "np.ndarray", team_ids: "np.ndarray"):
+        """
+        :param pick_ids: the ID of every pick
+        :param pick_types: the value of the `Pick.PickType` of every pick
+        :param names: the name of every pick
+        :param points: the points of every pick
+        :param costs: the cost of every pick
+        :param team_ids: the ID of the team of every pick
+        """
+        import numpy as np
+
+        self.pick_ids = np.asarray(pick_ids, dtype=np.int64)
+        self.pick_types = np.asarray(pick_types, dtype=np.int8)
+        self.names = list(names)
+        self.points = np.array(points, dtype=np.float64)
+        self.costs = np.asarray(costs, dtype=np.float64)
+        self.team_ids = np.asarray(team_ids, dtype=np.int64)
+        self.rows: dict[int, int] = {pick_id: row for row, pick_id in enumerate(self.pick_ids.tolist())}
+        self.is_driver: np.ndarray = self.pick_types == Pick.PickType.DRIVER.value
+        self.is_constructor: np.ndarray = self.pick_types == Pick.PickType.CONSTRUCTOR.value
+        self.driver_rows: np.ndarray = np.flatnonzero(self.is_driver)
+        # Row of the constructor of every pick, -1 if the constructor is not part of the table
+        self.constructor_rows: np.ndarray = np.array([self.rows.get(team_id, -1) for team_id in self.team_ids.tolist()],
+                                                     dtype=np.int64)
+        self._names: Optional[dict[str, int]] = None
+
+    @staticmethod
+    def from_picks(picks: Iterable[Pick]) -> "PickTable":
+        """
+        Create a table from pick objects.
+        :param picks: the picks in the order of the rows
+        :return: the table
+        """
+        import numpy as np
+
+        picks = list(picks)
+        return PickTable(
+            pick_ids=np.fromiter((pick.pick_id for pick in picks), dtype=np.int64, count=len(picks)),
+            pick_types=np.fromiter((pick.pick_type.value for pick in picks), dtype=np.int8, count=len(picks)),
+            names=[pick.name for pick in picks],
+            points=np.fromiter((pick.points for pick in picks), dtype=np.float64, count=len(picks)),
+            costs=np.fromiter((pick.cost for pick in picks), dtype=np.float64, count=len(picks)),
+            team_ids=np.fromiter((pick.team_id for pick in picks), dtype=np.int64, count=len(picks)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.pick_ids)
+
+    def copy(self) -> "PickTable":
+        """
+        Copy the table, so that its points can be changed independently.
+        :return: the copy
+        """
+        return PickTable(self.pick_ids, self.pick_types, self.names, self.points, self.costs, self.team_ids)
+
+    def find(self, name: str) -> Optional[int]:
+        """
+        Find the row of a pick by their name like `PickData.find`.
+        :param name: the name of the pick to find
+        :return: the row of the pick or `None` if there is no pick with this name
+        """
+        if self._names is None:
+            self._names = _name_index(zip(self.names, range(len(self))), dict())
+        return self._names.get(normalize_name(name))
+
+    def pick(self, row: int, *, td: bool = False) -> Pick:
+        """
+        Create a pick object from a row.
+        :param row: the row of the pick
+        :param td: whether the pick is the turbo driver
+        :return: the pick
+        """
+        return Pick(int(self.pick_ids[row]), Pick.PickType(int(self.pick_types[row])), self.names[row],
+                    float(self.points[row]), float(self.costs[row]), int(self.team_ids[row]), td=td)
+
+    def team(self, rows: Iterable[int], td_row: Optional[int] = None) -> Team:
+        """
+        Create a team from rows.
+        :param rows: the rows of the picks of the team
+        :param td_row: the row of the turbo driver
+        :return: the team
+        """
+        return [self.pick(row, td=row == td_row) for row in rows]
+
+    def to_pick_data(self) -> PickData:
+        """
+        Create pick objects from all rows.
+        :return: the picks by their ID
+        """
+        return PickData((pick_id, self.pick(row)) for pick_id, row in self.rows.items())
+
+    def write_points(self, pick_data: dict[int, Pick]):
+        """
+        Copy the points of all rows to the respective pick objects.
+        :param pick_data: the picks by their ID
+        """
+        for pick_id, points in zip(self.pick_ids.tolist(), self.points.tolist()):
+            pick_data[pick_id].points = points
+
+
+def as_pick_table(pick_data: Union[dict[int, Pick], PickTable]) -> PickTable:
+    """
+    Get a `PickTable` for a dictionary of picks.
+    :param pick_data: the picks by their ID or a table
+    :return: `pick_data` if it is a table already, otherwise a table of its picks
+    """
+    return pick_data if isinstance(pick_data, PickTable) else PickTable.from_picks(pick_data.values())
+
+
+def as_pick_data(pick_data: dict[int, Pick]) -> PickData:
+    """
+    Get a `PickData` object for a dictionary of picks.
+    :param pick_data: the picks by their ID
+    :return: `pick_data` if it is a `PickData` object already, otherwise a `PickData` object sharing its picks
+    """
+    return pick_data if isinstance(pick_data, PickData) else PickData(pick_data)
+
+
+def find_pick_by_name(pick_data: dict[int, Pick], name: str) -> Optional[int]:
     """
     Find the ID of a pick by their name.
+
+    Different spellings of the name are matched like in `PickData.find`. For repeated lookups, pass a `PickData` object
+    so that its index is reused.
     :param pick_data: object containing all information about all possible picks
     :param name: the name of the pick to find
-    :return: the ID of the pick
+    :return: the ID of the pick or `None` if there is no pick with this name
     """
-    for k, v in pick_data.items():
-        if v.name == name:
-            return k
+    return as_pick_data(pick_data).find(name)
 
 
 def create_team_from_names(pick_names: tuple[list[str], str], pick_data: PickData) -> Team:
@@ -106,10 +424,15 @@ def create_team_from_names(pick_names: tuple[list[str], str], pick_data: PickDat
     :param pick_data: object containing all information about all possible picks
     :return: the team consisting of picks described by `pick_names`
     """
+    pick_data = as_pick_data(pick_data)
+    td_id = pick_data.find(pick_names[1])
     team = []
     for name in pick_names[0]:
-        pick = pick_data[find_pick_by_name(pick_data, name)]
-        pick.td = name == pick_names[1]
+        pick_id = pick_data.find(name)
+        if pick_id is None:
+            raise KeyError(f"Unknown pick `{name}`.")
+        pick = pick_data[pick_id]
+        pick.td = pick_id == td_id
         if pick.td and pick.pick_type == Pick.PickType.CONSTRUCTOR:
             raise ValueError("The turbo driver cannot be a constructor, but `{}` was specified.".format(pick_names[1]))
         team.append(pick)
@@ -125,61 +448,195 @@ def reset_points(pick_data: PickData):
         pick.points = 0
 
 
+def get_response_cache() -> Optional[cache.ResponseCache]:
+    """
+    Get the cache used by all `download_*` functions.
+
+    Unless configured otherwise using `set_response_cache`, a cache in `cache.default_cache_dir()` is created on first
+    use.
+    :return: the response cache or `None` if caching is disabled
+    """
+    global _response_cache, _response_cache_configured
+    if not _response_cache_configured:
+        _response_cache = cache.ResponseCache(cache.default_cache_dir(), offline=cache.offline_from_env(),
+                                              opener=transport.default_opener())
+        # Access times of cache hits are only written when the process exits
+        atexit.register(_response_cache.close)
+        _response_cache_configured = True
+    return _response_cache
+
+
+def set_response_cache(response_cache: Optional[cache.ResponseCache]):
+    """
+    Set the cache used by all `download_*` functions.
+    :param response_cache: the response cache to use or `None` to disable caching
+    """
+    global _response_cache, _response_cache_configured
+    _response_cache = response_cache
+    _response_cache_configured = True
+
+
+def download_executor(max_workers: int = DEFAULT_MAX_WORKERS) -> concurrent.futures.ThreadPoolExecutor:
+    """
+    Get the thread pool which runs concurrent downloads.
+
+    The pools are shared by all calls and their threads live as long as the process, so the connections which each
+    thread keeps alive in `transport.default_opener()` are reused by later downloads. Tasks must not wait for other
+    tasks of the same pool, because all of its threads could be waiting then.
+    :param max_workers: maximum number of pages which are downloaded concurrently
+    :return: the thread pool with `max_workers` threads
+    """
+    with _download_executors_lock:
+        executor = _download_executors.get(max_workers)
+        if executor is None:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                             thread_name_prefix="f1fantasyoptimizer-download")
+            _download_executors[max_workers] = executor
+        return executor
+
+
+def season_ttl(season: Season) -> Optional[float]:
+    """
+    Get the time to live of cached responses containing data of a given season.
+    :param season: the season of the requested data
+    :return: number of seconds for which responses are served without revalidation, `None` if they never expire
+    """
+    return FINISHED_SEASON_TTL if season < datetime.today().year else CURRENT_SEASON_TTL
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code in RETRYABLE_HTTP_STATUS_CODES
+    return isinstance(error, (urllib.error.URLError, http.client.HTTPException, ConnectionError, TimeoutError))
+
+
+def fetch(url: str, *, ttl: Optional[float], retries: int = DOWNLOAD_RETRIES, backoff: float = DOWNLOAD_BACKOFF) \
+        -> bytes:
+    """
+    Download the content of `url` using the response cache if it is enabled.
+
+    Transient failures are retried with exponential backoff.
+    :param url: the URL to download
+    :param ttl: number of seconds for which a cached response is served without revalidation, `None` if cached
+        responses never expire
+    :param retries: number of times a failed download is retried
+    :param backoff: number of seconds to wait before the first retry, doubled after every further failed attempt
+    :return: the response body
+    """
+    response_cache = get_response_cache()
+    with tracing.span("data.fetch", tracing.NETWORK, url=url):
+        for attempt in range(retries + 1):
+            try:
+                if response_cache is not None:
+                    return response_cache.fetch(url, ttl=ttl)
+                with transport.default_opener()(urllib.request.Request(url)) as response:
+                    return response.read()
+            except Exception as e:
+                if attempt == retries or not _is_retryable(e):
+                    raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+@tracing.traced("data.download_pick_data", tracing.DOWNLOAD)
 def download_pick_data() -> PickData:
     """
     Download information about all possible picks from the F1Fantasy website.
     :return: object containing all information about all possible picks
     """
-    with urllib.request.urlopen(PICK_DATA_URL) as response:
-        entries = json.loads(response.read())["Data"]["Value"]
-        pick_data = dict()
-        for entry in entries:
-            pick_id = int(entry["PlayerId"])
-            pick_data[pick_id] = Pick(
-                pick_id=pick_id,
-                pick_type=Pick.PickType[entry["PositionName"].upper()],
-                name=entry["FUllName"],  # [sic]
-                points=to_float(entry["OverallPpints"]),  # [sic]
-                cost=to_float(entry["Value"]),
-                team_id=int(entry["TeamId"]),
-            )
-        return pick_data
+    return parse_pick_data(fetch(PICK_DATA_URL, ttl=PICK_DATA_TTL))
 
 
+@tracing.traced("data.parse_pick_data", tracing.PARSE)
+def parse_pick_data(content: bytes) -> PickData:
+    """
+    Parse the picks of the feed of the F1Fantasy website.
+    :param content: the downloaded feed
+    :return: object containing all information about all possible picks
+    """
+    entries = json.loads(content)["Data"]["Value"]
+    pick_data = PickData()
+    for entry in entries:
+        pick_id = int(entry["PlayerId"])
+        pick_data[pick_id] = Pick(
+            pick_id=pick_id,
+            pick_type=Pick.PickType[entry["PositionName"].upper()],
+            name=entry["FUllName"],  # [sic]
+            points=to_float(entry["OverallPpints"]),  # [sic]
+            cost=to_float(entry["Value"]),
+            team_id=int(entry["TeamId"]),
+        )
+    return pick_data
+
+
+# XPath queries of the results pages
+_SEASON_OPTIONS: str = "//select[@class='resultsarchive-filter-form-select' and @name='year']/option/text()"
+_VENUE_OPTIONS: str = "//select[@class='resultsarchive-filter-form-select' and @name='meetingKey']" \
+                      "/option[string(@value)]"
+_MODE_OPTIONS: str = "//select[@class='resultsarchive-filter-form-select' and @name='resultType']/option"
+_RESULT_ROWS: str = "//table[@class='resultsarchive-table']/tbody/tr"
+_PLACEMENT: str = "td[2]/text()"
+_DRIVER_NAME: str = "td[4]/descendant::*/text()"
+# Markup delimiting the results table of a results page
+_RESULTS_TABLE_START: bytes = b'<table class="resultsarchive-table"'
+_RESULTS_TABLE_END: bytes = b"</table>"
+
+
+@functools.lru_cache(maxsize=None)
+def _xpath(expression: str) -> "etree.XPath":
+    # lxml is imported and the queries are compiled on first use, which keeps importing this module fast
+    from lxml import etree
+
+    return etree.XPath(expression)
+
+
+def _parse_html(content: bytes) -> "etree._Element":
+    from lxml import etree
+
+    # Parsers must not be shared between threads, creating one is cheap
+    root = etree.fromstring(content, etree.HTMLParser(encoding="utf-8"))
+    if root is None:
+        raise ValueError("The HTML document is empty.")
+    return root
+
+
+@tracing.traced("data.download_seasons", tracing.DOWNLOAD)
 def download_seasons() -> list[Season]:
     """
     Download all seasons for which information is provided by the website.
     :return: a list of all seasons
     """
-    with urllib.request.urlopen(EVENTS_OVERVIEW_DATA_URL.format(year=datetime.today().year)) as response:
-        s = response.read()
-        sio = io.StringIO(s.decode())
-        tree = html.parse(sio)
-        years = tree.xpath("//select[@class='resultsarchive-filter-form-select' and @name='year']"
-                           "/option/text()")
-        return [Season(y) for y in years]
+    s = fetch(EVENTS_OVERVIEW_DATA_URL.format(year=datetime.today().year), ttl=SEASONS_TTL)
+    with tracing.span("data.parse_seasons", tracing.PARSE):
+        years = _xpath(_SEASON_OPTIONS)(_parse_html(s))
+    return [Season(y) for y in years]
 
 
+@tracing.traced("data.download_venues", tracing.DOWNLOAD)
 def download_venues(season: Season) -> Venues:
     """
     Download all venues for a given season.
     :param season: the season for which to download the list of venues
     :return: a dictionary consisting of all venues and their IDs for a given season
     """
+    return parse_venues(fetch(EVENTS_OVERVIEW_DATA_URL.format(year=season), ttl=season_ttl(season)))
+
+
+@tracing.traced("data.parse_venues", tracing.PARSE)
+def parse_venues(content: bytes) -> Venues:
+    """
+    Parse the venues of an overview page of a season.
+    :param content: the downloaded overview page
+    :return: a dictionary consisting of all venues and their IDs
+    """
     venues: Venues = dict()
-    with urllib.request.urlopen(EVENTS_OVERVIEW_DATA_URL.format(year=season)) as response:
-        s = response.read()
-        sio = io.StringIO(s.decode())
-        tree = html.parse(sio)
-        venues_html = tree.xpath("//select[@class='resultsarchive-filter-form-select' and @name='meetingKey']"
-                                 "/option[string(@value)]")
-        for venue in venues_html:
-            venue_name: Venue.Name = venue.text
-            venue_id: Venue.Id = venue.attrib["value"]
-            venues[venue_name] = venue_id
+    for venue in _xpath(_VENUE_OPTIONS)(_parse_html(content)):
+        venue_name: Venue.Name = venue.text
+        venue_id: Venue.Id = venue.attrib["value"]
+        venues[venue_name] = venue_id
     return venues
 
 
+@tracing.traced("data.download_event_modes", tracing.DOWNLOAD)
 def download_event_modes(*, season: Season, venue_id: Venue.Id) \
         -> dict[Mode.Name, Mode.Id]:
     """
@@ -189,36 +646,100 @@ def download_event_modes(*, season: Season, venue_id: Venue.Id) \
     :return: a dictionary consisting of all modes and their IDs for a given venue in a given season
     """
     modes: Modes = dict()
-    with urllib.request.urlopen(EVENT_DATA_URL.format(year=season, event_link=venue_id, mode="race")) as response:
-        s = response.read()
-        sio = io.StringIO(s.decode())
-        tree = html.parse(sio)
-        for mode in tree.xpath("//select[@class='resultsarchive-filter-form-select' and @name='resultType']/option"):
+    s = fetch(EVENT_DATA_URL.format(year=season, event_link=venue_id, mode="race"), ttl=season_ttl(season))
+    with tracing.span("data.parse_event_modes", tracing.PARSE):
+        for mode in _xpath(_MODE_OPTIONS)(_parse_html(s)):
             modes[mode.text] = mode.attrib["value"]
     return modes
 
 
-def download_event_data(*, season: Season, venue_id: Venue.Id, modes: list[Mode.Id]) \
-        -> EventData:
+@tracing.traced("data.parse_event_data", tracing.PARSE)
+def parse_event_data(content: bytes) -> list[tuple[str, str]]:
+    """
+    Parse the placement data of a results page.
+    :param content: the downloaded results page
+    :return: a list of the placement of a driver and their name
+    """
+    # Only the markup of the results table is parsed, the rest of the page is skipped
+    start = content.find(_RESULTS_TABLE_START)
+    if start >= 0:
+        end = content.find(_RESULTS_TABLE_END, start)
+        if end >= 0:
+            content = content[start:end + len(_RESULTS_TABLE_END)]
+    placement, driver_name = _xpath(_PLACEMENT), _xpath(_DRIVER_NAME)
+    mode_data = []
+    for entry in _xpath(_RESULT_ROWS)(_parse_html(content)):
+        pos = placement(entry)[0]
+        name_fields = driver_name(entry)
+        name = " ".join(filter(None, [name_fields[0], name_fields[1]]))
+        mode_data.append((pos, name))
+    return mode_data
+
+
+@tracing.traced("data.download_mode_data", tracing.DOWNLOAD)
+def download_mode_data(*, season: Season, venue_id: Venue.Id, mode: Mode.Id, retries: int = DOWNLOAD_RETRIES,
+                       backoff: float = DOWNLOAD_BACKOFF) -> list[tuple[str, str]]:
+    """
+    Download placement data for a single mode of a given venue in a given season.
+    :param season: the season for which to download the data
+    :param venue_id: the venue for which to download the data
+    :param mode: the mode for which to download placement data
+    :param retries: number of times a failed download is retried
+    :param backoff: number of seconds to wait before the first retry, doubled after every further failed attempt
+    :return: a list of the placement of a driver and their name
+    """
+    s = fetch(EVENT_DATA_URL.format(year=season, event_link=venue_id, mode=mode), ttl=season_ttl(season),
+              retries=retries, backoff=backoff)
+    return parse_event_data(s)
+
+
+@tracing.traced("data.download_event_data", tracing.DOWNLOAD)
+def download_event_data(*, season: Season, venue_id: Venue.Id, modes: list[Mode.Id],
+                        max_workers: int = DEFAULT_MAX_WORKERS) -> EventData:
     """
     Download placement data for a given list of modes of a given venue in a given season.
+
+    The results pages of all modes are downloaded concurrently.
     :param season: the season for which to download the data
     :param venue_id: the venue for which to download the data
     :param modes: a list of modes for which to download placement data
+    :param max_workers: maximum number of pages which are downloaded concurrently
     :return: dictionary containing all specified modes and for each specified mode a list of the placement of a driver
         and their name
     """
-    event_data: EventData = dict()
-    for mode in modes:
-        with urllib.request.urlopen(EVENT_DATA_URL.format(year=season, event_link=venue_id, mode=mode)) as response:
-            s = response.read()
-            sio = io.StringIO(s.decode())
-            tree = html.parse(sio)
-            mode_data = []
-            for entry in tree.xpath("//table[@class='resultsarchive-table']/tbody/tr"):
-                pos = entry.xpath("td[2]/text()")[0]
-                name_fields = entry.xpath("td[4]/descendant::*/text()")
-                name = " ".join(filter(None, [name_fields[0], name_fields[1]]))
-                mode_data.append((pos, name))
-            event_data[mode] = mode_data
-    return event_data
+    executor = download_executor(max_workers)
+    futures = {mode: executor.submit(download_mode_data, season=season, venue_id=venue_id, mode=mode)
+               for mode in modes}
+    return {mode: future.result() for mode, future in futures.items()}
+
+
+@tracing.traced("data.download_season_results", tracing.DOWNLOAD)
+def download_season_results(season: Season, *, modes: Optional[list[Mode.Id]] = None,
+                            max_workers: int = DEFAULT_MAX_WORKERS, retries: int = DOWNLOAD_RETRIES,
+                            backoff: float = DOWNLOAD_BACKOFF) -> SeasonData:
+    """
+    Download placement data for all venues of a given season.
+
+    All pages are downloaded concurrently.
+    :param season: the season for which to download the data
+    :param modes: a list of modes for which to download placement data, `None` to download all modes available for
+        each venue
+    :param max_workers: maximum number of pages which are downloaded concurrently
+    :param retries: number of times a failed download is retried
+    :param backoff: number of seconds to wait before the first retry, doubled after every further failed attempt
+    :return: dictionary containing the placement data of all venues of the season
+    """
+    venues = download_venues(season)
+    executor = download_executor(max_workers)
+    if modes is None:
+        mode_futures = {venue_id: executor.submit(download_event_modes, season=season, venue_id=venue_id)
+                        for venue_id in venues.values()}
+        venue_modes = {venue_id: list(future.result().values()) for venue_id, future in mode_futures.items()}
+    else:
+        venue_modes = {venue_id: modes for venue_id in venues.values()}
+    futures = {venue_id: {mode: executor.submit(download_mode_data, season=season, venue_id=venue_id, mode=mode,
+                                                retries=retries, backoff=backoff)
+                          for mode in venue_modes[venue_id]}
+               for venue_id in venues.values()}
+    return {venue_id: {mode: future.result() for mode, future in mode_futures.items()}
+            for venue_id, mode_futures in futures.items()}
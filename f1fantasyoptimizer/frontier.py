@@ -0,0 +1,154 @@
+from typing import Any, Iterable, Optional, Union
+
+import numpy as np
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.lineups as lineups
+import f1fantasyoptimizer.solver as solver
+
+# Budgets of the default budget sweep in mil. Dollars
+SWEEP_MIN_BUDGET: float = 90
+SWEEP_MAX_BUDGET: float = 110
+SWEEP_STEP: float = 0.1
+
+
+def _pareto(costs: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """
+    Find the Pareto-optimal elements by a sorted dominance sweep.
+    :param costs: the cost of every element
+    :param points: the points of every element
+    :return: the indices of all elements scoring more points than every cheaper element, sorted by their cost; of
+        elements with equal cost and points only the first is kept
+    """
+    order = np.lexsort((-points, costs))
+    sorted_points = points[order]
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = sorted_points[1:] > np.maximum.accumulate(sorted_points)[:-1]
+    return order[keep]
+
+
+class ParetoFrontier:
+    """
+    All teams which are Pareto-optimal in points against cost, sorted by their cost.
+
+    Every team of the frontier scores more points than all cheaper teams, so the best team for any budget is the most
+    expensive team of the frontier which is affordable. The costs of the teams are the budgets at which the best team
+    changes.
+    """
+
+    def __init__(self, table: data.PickTable, costs: np.ndarray, points: np.ndarray, teams: list[list[int]],
+                 td_rows: list[int]):
+        """
+        :param table: all possible picks
+        :param costs: the cost of every team in ascending order
+        :param points: the total points of every team in ascending order
+        :param teams: the rows of the picks of every team in `table`
+        :param td_rows: the row of the turbo driver of every team
+        """
+        self.table = table
+        self.costs = costs
+        self.points = points
+        self.teams = teams
+        self.td_rows = td_rows
+
+    def __len__(self) -> int:
+        return len(self.teams)
+
+    def index(self, budget: float) -> Optional[int]:
+        """
+        Find the best team for a budget.
+        :param budget: the maximum cost of the team
+        :return: the index of the team in the frontier, `None` if no team is affordable
+        """
+        # Costs are compared on a 0.1 grid like in the solver
+        i = int(np.searchsorted(np.round(self.costs * 10), round(budget * 10), side="right")) - 1
+        return i if i >= 0 else None
+
+    def team(self, i: int) -> data.Team:
+        """
+        Create the picks of a team of the frontier.
+        :param i: the index of the team
+        :return: the team; the picks are copies
+        """
+        return self.table.team(self.teams[i], self.td_rows[i])
+
+    def best(self, budget: float) -> data.Team:
+        """
+        Get the best team for a budget.
+        :param budget: the maximum cost of the team
+        :return: the team; the picks are copies
+        """
+        i = self.index(budget)
+        if i is None:
+            raise RuntimeError("No team satisfies all constraints!")
+        return self.team(i)
+
+    def sweep(self, budgets: Iterable[float]) -> dict[float, Optional[data.Team]]:
+        """
+        Get the best team for every budget.
+        :param budgets: the budgets
+        :return: the best team by budget, `None` for budgets which do not allow any team
+        """
+        return {budget: None if (i := self.index(budget)) is None else self.team(i) for budget in budgets}
+
+    def to_records(self) -> list[dict[str, Any]]:
+        """
+        Convert the frontier to one record per team, e.g. to write it as JSON Lines.
+        :return: the records
+        """
+        return [{"cost": float(cost), "points": float(points), "team": [self.table.names[row] for row in team],
+                 "td": self.table.names[td]}
+                for cost, points, team, td in zip(self.costs, self.points, self.teams, self.td_rows)]
+
+
+def pareto_frontier(pick_data: Union[data.PickData, data.PickTable], *, max_budget: float = SWEEP_MAX_BUDGET) \
+        -> ParetoFrontier:
+    """
+    Find all teams which are Pareto-optimal in points against cost in a single pass.
+
+    A team is Pareto-optimal only if its driver set, including the turbo driver, and its constructor pair are
+    Pareto-optimal themselves. So the driver sets and the constructor pairs of `lineups.LineupSpace` are reduced to
+    their frontiers first, and the frontier of the teams is found among all combinations of the remaining ones.
+    :param pick_data: object containing all information about all possible picks or a table of them
+    :param max_budget: the maximum cost of a team
+    :return: the frontier
+    """
+    table = data.as_pick_table(pick_data)
+    space = lineups.LineupSpace(table, budget=max_budget)
+    # Points are compared on a 0.1 grid like in the solver
+    points = np.round(table.points * 10).astype(np.int64)
+
+    driver_points = points[space.driver_sets]
+    # The driver with the most points of each set is the turbo driver, so it counts twice
+    driver_set_points = driver_points.sum(axis=1) + driver_points.max(axis=1)
+    driver_sets = _pareto(space.driver_set_costs, driver_set_points)
+    pair_points = points[space.constructor_pairs].sum(axis=1)
+    pairs = _pareto(space.constructor_pair_costs, pair_points)
+
+    costs = (space.driver_set_costs[driver_sets, None] + space.constructor_pair_costs[None, pairs]).ravel()
+    totals = (driver_set_points[driver_sets, None] + pair_points[None, pairs]).ravel()
+    affordable = np.flatnonzero(costs <= round(max_budget * 10))
+    frontier = affordable[_pareto(costs[affordable], totals[affordable])]
+
+    teams, td_rows = [], []
+    for d, p in zip(*np.unravel_index(frontier, (len(driver_sets), len(pairs)))):
+        driver_set = space.driver_sets[driver_sets[d]]
+        teams.append(sorted(driver_set.tolist() + space.constructor_pairs[pairs[p]].tolist()))
+        td_rows.append(int(driver_set[np.argmax(points[driver_set])]))
+    return ParetoFrontier(table, costs[frontier] / 10, totals[frontier] / 10, teams, td_rows)
+
+
+def budget_sweep(pick_data: Union[data.PickData, data.PickTable], budgets: Optional[Iterable[float]] = None) \
+        -> dict[float, Optional[data.Team]]:
+    """
+    Find the best team for every budget of a range.
+    :param pick_data: object containing all information about all possible picks or a table of them
+    :param budgets: the budgets, `None` for all budgets from `SWEEP_MIN_BUDGET` to `SWEEP_MAX_BUDGET` in steps of
+        `SWEEP_STEP`
+    :return: the best team by budget, `None` for budgets which do not allow any team
+    """
+    if budgets is None:
+        n_steps = int(round((SWEEP_MAX_BUDGET - SWEEP_MIN_BUDGET) / SWEEP_STEP))
+        budgets = [round(SWEEP_MIN_BUDGET + i * SWEEP_STEP, 1) for i in range(n_steps + 1)]
+    budgets = list(budgets)
+    return pareto_frontier(pick_data, max_budget=max(budgets, default=solver.BUDGET)).sweep(budgets)
@@ -0,0 +1,116 @@
+import itertools
+import math
+
+import numpy as np
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.solver as solver
+
+# Maximum number of driver combinations which are enumerated
+MAX_DRIVER_SETS: int = 2_000_000
+# Maximum number of elements of the intermediate arrays when scoring scenarios in chunks
+CHUNK_ELEMENTS: int = 1 << 22
+
+
+class LineupSpace:
+    """
+    All teams satisfying the capacity and budget constraints.
+
+    A team consists of a set of drivers and a pair of constructors. Instead of enumerating all teams explicitly, all
+    driver sets and all constructor pairs are enumerated separately. The constructor pairs are sorted by their cost, so
+    the constructor pairs which are affordable together with a driver set form a prefix of all pairs. None of this
+    depends on points, so a space can be reused to find the best teams for any number of point vectors.
+    """
+
+    def __init__(self, table: data.PickTable, *, budget: float = solver.BUDGET):
+        """
+        :param table: all possible picks; the columns of point matrices refer to the rows of this table
+        :param budget: the maximum cost of a team
+        """
+        self.table = table
+        self.budget = budget
+        # Costs are compared on a 0.1 grid like in the solver
+        costs = np.round(table.costs * 10).astype(np.int64)
+        budget_units = int(round(budget * 10))
+        drivers = np.flatnonzero(table.is_driver).tolist()
+        constructors = np.flatnonzero(table.is_constructor).tolist()
+        if math.comb(len(drivers), solver.NUMBER_OF_DRIVERS) > MAX_DRIVER_SETS:
+            raise ValueError(f"Too many driver combinations to enumerate for {len(drivers)} drivers.")
+
+        pairs = np.array(list(itertools.combinations(constructors, solver.NUMBER_OF_CONSTRUCTORS)),
+                         dtype=np.int64).reshape(-1, solver.NUMBER_OF_CONSTRUCTORS)
+        pair_costs = costs[pairs].sum(axis=1)
+        order = np.argsort(pair_costs, kind="stable")
+        # Constructor pairs sorted by their cost in ascending order
+        self.constructor_pairs: np.ndarray = pairs[order]
+        self.constructor_pair_costs: np.ndarray = pair_costs[order]
+
+        driver_sets = np.fromiter(itertools.chain.from_iterable(
+            itertools.combinations(drivers, solver.NUMBER_OF_DRIVERS)), dtype=np.int64).reshape(
+            -1, solver.NUMBER_OF_DRIVERS)
+        driver_set_costs = costs[driver_sets].sum(axis=1)
+        # Number of constructor pairs which are affordable together with each driver set
+        n_affordable = np.searchsorted(self.constructor_pair_costs, budget_units - driver_set_costs, side="right")
+        feasible = n_affordable > 0
+        self.driver_sets: np.ndarray = driver_sets[feasible]
+        self.driver_set_costs: np.ndarray = driver_set_costs[feasible]
+        self.n_affordable_pairs: np.ndarray = n_affordable[feasible]
+
+    def __len__(self) -> int:
+        """
+        Number of feasible teams.
+        """
+        return int(self.n_affordable_pairs.sum())
+
+    def best(self, points: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find the best team for every row of a point matrix.
+        :param points: matrix of shape (scenarios, picks) containing the points of every pick in every scenario
+        :return: for every scenario the index of the driver set, the index of the constructor pair, the index of the
+            turbo driver in `table` and the total points of the best team
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        if points.shape[1] != len(self.table):
+            raise ValueError(f"Expected {len(self.table)} columns, got {points.shape[1]}.")
+        if not len(self.driver_sets):
+            raise RuntimeError("No team satisfies all constraints!")
+        n_scenarios = points.shape[0]
+        best_driver_sets = np.empty(n_scenarios, dtype=np.int64)
+        best_scores = np.empty(n_scenarios, dtype=np.float64)
+        chunk = max(1, CHUNK_ELEMENTS // len(self.driver_sets))
+        for start in range(0, n_scenarios, chunk):
+            p = points[start:start + chunk]
+            # Best affordable constructor pair for every prefix of the sorted pairs
+            pair_points = p[:, self.constructor_pairs].sum(axis=2)
+            best_pair_points = np.maximum.accumulate(pair_points, axis=1)
+            # The driver with the most points of each set is the turbo driver, so it counts twice
+            driver_points = p[:, self.driver_sets[:, 0]]
+            turbo_points = driver_points.copy()
+            for k in range(1, solver.NUMBER_OF_DRIVERS):
+                column = p[:, self.driver_sets[:, k]]
+                driver_points += column
+                np.maximum(turbo_points, column, out=turbo_points)
+            scores = driver_points + turbo_points + best_pair_points[:, self.n_affordable_pairs - 1]
+            best = np.argmax(scores, axis=1)
+            best_driver_sets[start:start + chunk] = best
+            best_scores[start:start + chunk] = scores[np.arange(len(p)), best]
+
+        # Recover the constructor pairs and turbo drivers of the winning driver sets
+        best_pairs = np.empty(n_scenarios, dtype=np.int64)
+        turbo_drivers = np.empty(n_scenarios, dtype=np.int64)
+        for s in range(n_scenarios):
+            j = best_driver_sets[s]
+            pair_points = points[s, self.constructor_pairs[:self.n_affordable_pairs[j]]].sum(axis=1)
+            best_pairs[s] = np.argmax(pair_points)
+            driver_set = self.driver_sets[j]
+            turbo_drivers[s] = driver_set[np.argmax(points[s, driver_set])]
+        return best_driver_sets, best_pairs, turbo_drivers, best_scores
+
+    def team(self, driver_set: int, constructor_pair: int) -> list[int]:
+        """
+        Get the indices of all picks of a team.
+        :param driver_set: index of the driver set
+        :param constructor_pair: index of the constructor pair
+        :return: rows of the picks in `table`
+        """
+        return sorted(self.driver_sets[driver_set].tolist() + self.constructor_pairs[constructor_pair].tolist())
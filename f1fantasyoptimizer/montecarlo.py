@@ -0,0 +1,205 @@
+import concurrent.futures
+import copy
+import os
+from typing import Optional, Sequence
+
+import numpy as np
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.simulator as simulator
+import f1fantasyoptimizer.tracing as tracing
+
+DEFAULT_CHUNK_SIZE: int = 10_000
+# Placements in results which mean that a driver did not finish or was disqualified
+DNF_PLACEMENTS: frozenset[str] = frozenset({"NC", "DNF", "DNS", "RET"})
+DQ_PLACEMENTS: frozenset[str] = frozenset({"DQ", "DSQ", "EX"})
+
+
+class PositionDistribution:
+    """
+    Probability distribution of the finishing positions of each driver.
+
+    The probabilities of each driver to be classified in each position are independent of the other drivers. A
+    finishing order is sampled by drawing a position for every driver and ranking the drivers by these positions.
+    Drivers who did not finish or were disqualified are ranked behind all classified drivers.
+    """
+
+    def __init__(self, drivers: Sequence[str], positions: np.ndarray, *, dnf: Optional[np.ndarray] = None,
+                 dq: Optional[np.ndarray] = None):
+        """
+        :param drivers: the names of the drivers
+        :param positions: matrix of shape (drivers, positions) containing the relative probabilities of each driver
+            to be classified in each position; rows are normalized
+        :param dnf: the probability of each driver not to finish
+        :param dq: the probability of each driver to be disqualified
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        if positions.ndim != 2 or positions.shape[0] != len(drivers):
+            raise ValueError("`positions` must contain one row per driver.")
+        if np.any(positions < 0) or np.any(positions.sum(axis=1) <= 0):
+            raise ValueError("`positions` must contain non-negative weights and at least one positive weight per row.")
+        self.drivers = list(drivers)
+        self.positions = positions / positions.sum(axis=1, keepdims=True)
+        self.dnf = np.zeros(len(drivers)) if dnf is None else np.asarray(dnf, dtype=np.float64)
+        self.dq = np.zeros(len(drivers)) if dq is None else np.asarray(dq, dtype=np.float64)
+        if np.any(self.dnf + self.dq > 1):
+            raise ValueError("The probabilities not to finish and to be disqualified must not exceed 1 in total.")
+
+    @staticmethod
+    def from_order(order: list[tuple[str, str]]) -> "PositionDistribution":
+        """
+        Create a distribution which always yields the given finishing order.
+        :param order: list of the placement of a driver and their name
+        :return: the distribution
+        """
+        return PositionDistribution([name for _, name in order], np.eye(len(order)))
+
+    @staticmethod
+    def from_results(orders: list[list[tuple[str, str]]], *, smoothing: float = 0.5) -> "PositionDistribution":
+        """
+        Estimate a distribution from past results.
+        :param orders: the results of several events, each a list of the placement of a driver and their name
+        :param smoothing: weight added to every position of every driver, so that no position is impossible
+        :return: the distribution
+        """
+        drivers = list(dict.fromkeys(name for order in orders for _, name in order))
+        index = {name: i for i, name in enumerate(drivers)}
+        n_positions = max(len(order) for order in orders)
+        positions = np.full((len(drivers), n_positions), smoothing, dtype=np.float64)
+        dnf = np.zeros(len(drivers))
+        dq = np.zeros(len(drivers))
+        events = np.zeros(len(drivers))
+        for order in orders:
+            for i, (placement, name) in enumerate(order):
+                row = index[name]
+                events[row] += 1
+                if placement.upper() in DNF_PLACEMENTS:
+                    dnf[row] += 1
+                elif placement.upper() in DQ_PLACEMENTS:
+                    dq[row] += 1
+                else:
+                    positions[row, i] += 1
+        # Drivers who were never classified may finish anywhere
+        positions[positions.sum(axis=1) == 0] = 1
+        return PositionDistribution(drivers, positions, dnf=dnf / np.maximum(events, 1),
+                                    dq=dq / np.maximum(events, 1))
+
+    def sample(self, rng: np.random.Generator, n_samples: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sample finishing orders.
+        :param rng: the random number generator
+        :param n_samples: the number of finishing orders to sample
+        :return: matrices of shape (samples, drivers) containing the index of each driver in each finishing order and
+            flags whether each driver did not finish or was disqualified
+        """
+        n_drivers = len(self.drivers)
+        cdf = np.cumsum(self.positions, axis=1)
+        u = rng.random((n_samples, n_drivers))
+        sampled = (u[:, :, np.newaxis] > cdf[np.newaxis, :, :-1]).sum(axis=2)
+        outcome = rng.random((n_samples, n_drivers))
+        dnf = outcome < self.dnf
+        dq = ~dnf & (outcome < self.dnf + self.dq)
+        # Ties are broken randomly, drivers who did not finish or were disqualified are ranked last
+        keys = sampled + rng.random((n_samples, n_drivers)) + (dnf | dq) * (2 * sampled.shape[1] + 2)
+        ranks = np.argsort(np.argsort(keys, axis=1), axis=1)
+        return ranks, dnf, dq
+
+
+class SimulationResult:
+    """
+    Points of all picks aggregated over many simulated events.
+    """
+
+    def __init__(self, pick_ids: list[int], mean: np.ndarray, variance: np.ndarray, n_samples: int,
+                 samples: Optional[np.ndarray] = None):
+        self.pick_ids = pick_ids
+        self.mean = mean
+        self.variance = variance
+        self.n_samples = n_samples
+        # Matrix of shape (samples, picks) with the points of each pick in each event if it was requested
+        self.samples = samples
+
+    def expected_pick_data(self, pick_data: data.PickData) -> data.PickData:
+        """
+        Create a copy of `pick_data` whose points are the expected points, e.g. to pass it to `solver.solve`.
+        :param pick_data: object containing all information about all possible picks
+        :return: a copy of `pick_data` with the expected points of all picks
+        """
+        pick_data = copy.deepcopy(pick_data)
+        for pick_id, mean in zip(self.pick_ids, self.mean):
+            pick_data[pick_id].points = float(mean)
+        return pick_data
+
+
+def _scoring_tables(n_drivers: int) -> tuple[np.ndarray, np.ndarray]:
+    qualifying = np.zeros(n_drivers)
+    n = min(n_drivers, len(simulator.QUALIFYING_POINTS))
+    qualifying[:n] = simulator.QUALIFYING_POINTS[:n]
+    race = np.array([simulator.RACE_POINTS.get(str(i), 0) for i in range(n_drivers)], dtype=np.float64)
+    return qualifying, race
+
+
+def _simulate_chunk(distribution: PositionDistribution, assignment: np.ndarray, seed: np.random.SeedSequence,
+                    n_samples: int, keep_samples: bool) -> tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    rng = np.random.default_rng(seed)
+    ranks, dnf, dq = distribution.sample(rng, n_samples)
+    qualifying, race = _scoring_tables(len(distribution.drivers))
+    driver_points = qualifying[ranks] + np.where(dnf, simulator.RACE_POINTS["DNF"],
+                                                 np.where(dq, simulator.RACE_POINTS["DQ"], race[ranks]))
+    # Drivers score for themselves and for their constructors
+    points = driver_points @ assignment
+    return points.sum(axis=0), np.square(points).sum(axis=0), points if keep_samples else None
+
+
+def simulate(pick_data: data.PickData, distribution: PositionDistribution, n_samples: int, *,
+             seed: Optional[int] = None, max_workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+             keep_samples: bool = False) -> SimulationResult:
+    """
+    Simulate many events by sampling finishing orders and calculate the points of all picks.
+
+    Points are calculated like in `simulator.simulate`, except that drivers who did not finish or were disqualified
+    score the respective race points. The samples are split into chunks which are simulated in parallel by a process
+    pool. Every chunk has its own random number stream derived from `seed`, so the result only depends on `seed` and
+    `chunk_size`, but not on the number of processes.
+    :param pick_data: object containing all information about all possible picks
+    :param distribution: the distribution of the finishing positions
+    :param n_samples: the number of events to simulate
+    :param seed: seed of the random number generator, `None` for a random seed
+    :param max_workers: maximum number of processes, `None` for the number of CPUs, `1` to simulate in this process
+    :param chunk_size: the number of events simulated at once by a process
+    :param keep_samples: whether the points of all picks in all events should be returned as well
+    :return: mean and variance of the points of all picks in the order of `pick_data.keys()`
+    """
+    if n_samples <= 0:
+        raise ValueError("At least one event must be simulated.")
+    pick_data = data.as_pick_data(pick_data)
+    pick_ids = list(pick_data.keys())
+    column = {pick_id: i for i, pick_id in enumerate(pick_ids)}
+    # assignment[d, p] is 1 if driver `d` scores points for pick `p`
+    assignment = np.zeros((len(distribution.drivers), len(pick_ids)))
+    for d, name in enumerate(distribution.drivers):
+        pick_id = pick_data.find(name)
+        if pick_id is None:
+            raise KeyError(f"Unknown driver `{name}`.")
+        assignment[d, column[pick_id]] = 1
+        if pick_data[pick_id].team_id in column:
+            assignment[d, column[pick_data[pick_id].team_id]] = 1
+
+    sizes = [min(chunk_size, n_samples - start) for start in range(0, n_samples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(distribution, assignment, s, size, keep_samples) for s, size in zip(seeds, sizes)]
+    # Spans of worker processes are not recorded, so this span shows the time of all chunks
+    with tracing.span("montecarlo.simulate", tracing.SIMULATE, samples=n_samples):
+        if max_workers == 1 or len(args) <= 1:
+            results = [_simulate_chunk(*a) for a in args]
+        else:
+            max_workers = min(max_workers or os.cpu_count() or 1, len(args))
+            with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_simulate_chunk, *zip(*args)))
+
+    total = sum(r[0] for r in results)
+    total_squares = sum(r[1] for r in results)
+    mean = total / n_samples
+    variance = np.maximum(total_squares / n_samples - np.square(mean), 0)
+    samples = np.concatenate([r[2] for r in results]) if keep_samples else None
+    return SimulationResult(pick_ids, mean, variance, n_samples, samples)
@@ -0,0 +1,246 @@
+from typing import TYPE_CHECKING, Iterable, Optional, Union
+
+import numpy as np
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.simulator as simulator
+import f1fantasyoptimizer.solver as solver
+
+if TYPE_CHECKING:
+    from ortools.sat.python import cp_model
+
+# Number of transfers per round which do not cost any points
+FREE_TRANSFERS: int = 2
+# Maximum number of unused free transfers which are carried over to the next round
+MAX_BANKED_TRANSFERS: int = 1
+# Points deducted for every transfer exceeding the free transfers
+TRANSFER_PENALTY: float = 10
+# Number of rounds planned ahead by `plan_rolling`
+DEFAULT_HORIZON: int = 3
+
+
+class Plan:
+    """
+    Teams and transfers for consecutive rounds.
+    """
+
+    def __init__(self, teams: list[data.Team], transfers_in: list[list[int]], transfers_out: list[list[int]],
+                 penalized_transfers: list[int], banked_transfers: list[int], points: float):
+        # The team of every round; the picks are copies with the points and costs of the round
+        self.teams = teams
+        # IDs of the picks which are transferred in and out before every round
+        self.transfers_in = transfers_in
+        self.transfers_out = transfers_out
+        # Number of transfers exceeding the free transfers in every round
+        self.penalized_transfers = penalized_transfers
+        # Number of unused free transfers carried over after every round
+        self.banked_transfers = banked_transfers
+        # Total points of all rounds including penalties
+        self.points = points
+
+    def __len__(self) -> int:
+        return len(self.teams)
+
+
+def _as_matrix(values: Optional[np.ndarray], column: np.ndarray, n_rounds: int) -> np.ndarray:
+    if values is None:
+        return np.tile(column, (n_rounds, 1))
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    if values.shape != (n_rounds, len(column)):
+        raise ValueError(f"Expected a matrix of shape {(n_rounds, len(column))}, got {values.shape}.")
+    return values
+
+
+def plan(pick_data: Union[data.PickData, data.PickTable], points: np.ndarray, *, costs: Optional[np.ndarray] = None,
+         initial_team: Optional[Iterable[int]] = None, banked: int = 0, free_transfers: int = FREE_TRANSFERS,
+         max_banked: int = MAX_BANKED_TRANSFERS, penalty: float = TRANSFER_PENALTY,
+         time_limit: Optional[float] = None) -> Plan:
+    """
+    Plan the teams of several consecutive rounds with the most points in total.
+
+    Every round, up to `free_transfers` picks may be exchanged for free, unused free transfers are carried over up to
+    `max_banked`. Every further transfer costs `penalty` points. Each team must be affordable at the costs of its round.
+    All rounds are planned in one CP-SAT model, so giving up points in one round to save transfers later is taken into
+    account.
+    :param pick_data: object containing all information about all possible picks or a table of them
+    :param points: matrix of shape (rounds, picks) containing the projected points of every pick in every round; the
+        columns refer to the picks in the order of `pick_data.values()`
+    :param costs: matrix of the same shape containing the cost of every pick in every round, `None` to use the current
+        costs in all rounds
+    :param initial_team: IDs of the picks of the current team, `None` if the team of the first round can be picked
+        freely
+    :param banked: number of free transfers carried over into the first round
+    :param free_transfers: number of free transfers per round
+    :param max_banked: maximum number of unused free transfers carried over to the next round
+    :param penalty: points deducted for every transfer exceeding the free transfers
+    :param time_limit: maximum number of seconds to search, the best plan found so far is returned afterwards
+    :return: the plan
+    """
+    from ortools.sat.python import cp_model
+
+    table = data.as_pick_table(pick_data)
+    n_rounds = len(np.atleast_2d(points))
+    points = _as_matrix(points, table.points, n_rounds)
+    costs = _as_matrix(costs, table.costs, n_rounds)
+    n_picks = len(table)
+    # Multiply by 10 to convert the values to int
+    scaled_points = np.round(points * 10).astype(np.int64)
+    scaled_costs = np.round(costs * 10).astype(np.int64)
+    scaled_penalty = int(round(penalty * 10))
+    drivers = np.flatnonzero(table.is_driver).tolist()
+    constructors = np.flatnonzero(table.is_constructor).tolist()
+    current = None
+    if initial_team is not None:
+        current = np.zeros(n_picks, dtype=bool)
+        current[[table.rows[pick_id] for pick_id in initial_team]] = True
+
+    model = cp_model.CpModel()
+    d_select, t_select = [], []
+    objective = []
+    previous_banked = min(banked, max_banked)
+    for r in range(n_rounds):
+        d = [model.NewBoolVar("d") for _ in range(n_picks)]
+        t = [model.NewBoolVar("t") for _ in range(n_picks)]
+        model.Add(sum(d) == solver.CAPACITY)
+        model.Add(sum(d[i] for i in constructors) == solver.NUMBER_OF_CONSTRUCTORS)
+        model.Add(cp_model.LinearExpr.WeightedSum(d, scaled_costs[r].tolist()) <= int(round(solver.BUDGET * 10)))
+        model.Add(sum(t[i] for i in drivers) == 1)
+        model.Add(sum(t[i] for i in constructors) == 0)
+        for i in range(n_picks):
+            model.AddImplication(t[i], d[i])
+        objective.append(cp_model.LinearExpr.WeightedSum(d + t, scaled_points[r].tolist() * 2))
+
+        # Transfers are picks which are selected in this round, but were not selected in the previous round
+        if r > 0 or current is not None:
+            incoming = []
+            for i in range(n_picks):
+                if r == 0:
+                    if not current[i]:
+                        incoming.append(d[i])
+                else:
+                    x = model.NewBoolVar("in")
+                    model.Add(x >= d[i] - d_select[-1][i])
+                    incoming.append(x)
+            n_in = sum(incoming)
+            available = free_transfers + previous_banked
+            extra = model.NewIntVar(0, solver.CAPACITY, "extra")
+            model.Add(extra >= n_in - available)
+            objective.append(-scaled_penalty * extra)
+            # Unused free transfers are carried over. Banking more than the unused free transfers by paying for extra
+            # transfers is allowed to keep the model linear, but it never pays off, because every banked transfer
+            # saves at most one penalty later on.
+            next_banked = model.NewIntVar(0, max_banked, "banked")
+            model.Add(next_banked <= available - n_in + extra)
+            previous_banked = next_banked
+        d_select.append(d)
+        t_select.append(t)
+
+    model.Maximize(sum(objective))
+    _add_hint(model, table, scaled_points, costs, d_select, t_select)
+
+    cp_solver = cp_model.CpSolver()
+    # The LP relaxation of the transfer constraints is tight, using it to bound the search speeds up solving by orders
+    # of magnitude for longer horizons
+    cp_solver.parameters.linearization_level = 2
+    if time_limit is not None:
+        cp_solver.parameters.max_time_in_seconds = time_limit
+    status = cp_solver.Solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        raise RuntimeError(f"Model solving failed: {status}!")
+
+    teams = []
+    for r in range(n_rounds):
+        selected = [i for i in range(n_picks) if cp_solver.Value(d_select[r][i]) == 1]
+        td = next(i for i in selected if cp_solver.Value(t_select[r][i]) == 1)
+        team = table.team(selected, td)
+        for pick, i in zip(team, selected):
+            pick.points = float(points[r, i])
+            pick.cost = float(costs[r, i])
+        teams.append(team)
+    initial_ids = None if current is None else table.pick_ids[current].tolist()
+    return _replay(teams, initial_ids, banked=banked, free_transfers=free_transfers, max_banked=max_banked,
+                   penalty=penalty)
+
+
+def _replay(teams: list[data.Team], initial_team: Optional[list[int]], *, banked: int, free_transfers: int,
+            max_banked: int, penalty: float) -> Plan:
+    # Apply the transfer rules to a sequence of teams
+    ins, outs, extras, banks = [], [], [], []
+    previous = None if initial_team is None else set(initial_team)
+    banked = min(banked, max_banked)
+    for team in teams:
+        selected = {pick.pick_id for pick in team}
+        if previous is None:
+            ins.append([])
+            outs.append([])
+            extras.append(0)
+        else:
+            ins.append(sorted(selected - previous))
+            outs.append(sorted(previous - selected))
+            available = free_transfers + banked
+            extras.append(max(0, len(ins[-1]) - available))
+            banked = min(max_banked, max(0, available - len(ins[-1])))
+        banks.append(banked)
+        previous = selected
+    total = sum(simulator.calculate_team_totals(team)["points"] for team in teams) - penalty * sum(extras)
+    return Plan(teams, ins, outs, extras, banks, total)
+
+
+def _add_hint(model: "cp_model.CpModel", table: data.PickTable, scaled_points: np.ndarray, costs: np.ndarray,
+              d_select: list[list["cp_model.IntVar"]], t_select: list[list["cp_model.IntVar"]]):
+    # Keep the best team of the first round in all rounds, which is feasible unless prices rise above the budget
+    round_table = table.copy()
+    round_table.points = scaled_points[0] / 10
+    round_table.costs = costs[0]
+    try:
+        selected, td = solver.DynamicProgrammingEngine().solve(round_table)
+    except RuntimeError:
+        return
+    for d, t in zip(d_select, t_select):
+        for i in range(len(table)):
+            model.AddHint(d[i], i in selected)
+            model.AddHint(t[i], i == td)
+
+
+def plan_rolling(pick_data: Union[data.PickData, data.PickTable], points: np.ndarray, *,
+                 costs: Optional[np.ndarray] = None, horizon: int = DEFAULT_HORIZON,
+                 initial_team: Optional[Iterable[int]] = None, banked: int = 0,
+                 free_transfers: int = FREE_TRANSFERS, max_banked: int = MAX_BANKED_TRANSFERS,
+                 penalty: float = TRANSFER_PENALTY, time_limit: Optional[float] = None) -> Plan:
+    """
+    Plan the teams of many rounds by repeatedly planning a few rounds ahead.
+
+    For every round, the next `horizon` rounds are planned with `plan` and only the team of the first of them is kept,
+    just like re-planning every week with updated projections. The runtime grows linearly with the number of rounds,
+    but transfers paying off only after more than `horizon` rounds are not found.
+    :param pick_data: object containing all information about all possible picks or a table of them
+    :param points: matrix of shape (rounds, picks) containing the projected points of every pick in every round
+    :param costs: matrix of the same shape containing the cost of every pick in every round, `None` to use the current
+        costs in all rounds
+    :param horizon: number of rounds planned ahead
+    :param initial_team: IDs of the picks of the current team, `None` if the team of the first round can be picked
+        freely
+    :param banked: number of free transfers carried over into the first round
+    :param free_transfers: number of free transfers per round
+    :param max_banked: maximum number of unused free transfers carried over to the next round
+    :param penalty: points deducted for every transfer exceeding the free transfers
+    :param time_limit: maximum number of seconds to search per round
+    :return: the plan
+    """
+    if horizon < 1:
+        raise ValueError("`horizon` must be at least 1.")
+    table = data.as_pick_table(pick_data)
+    points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+    costs = _as_matrix(costs, table.costs, len(points))
+    initial_team = None if initial_team is None else list(initial_team)
+    teams = []
+    team_ids, window_banked = initial_team, banked
+    for r in range(len(points)):
+        window = plan(table, points[r:r + horizon], costs=costs[r:r + horizon], initial_team=team_ids,
+                      banked=window_banked, free_transfers=free_transfers, max_banked=max_banked, penalty=penalty,
+                      time_limit=time_limit)
+        teams.append(window.teams[0])
+        team_ids = [pick.pick_id for pick in window.teams[0]]
+        window_banked = window.banked_transfers[0]
+    return _replay(teams, initial_team, banked=banked, free_transfers=free_transfers, max_banked=max_banked,
+                   penalty=penalty)
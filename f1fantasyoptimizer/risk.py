@@ -0,0 +1,210 @@
+import math
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.solver as solver
+
+if TYPE_CHECKING:
+    from ortools.sat.python import cp_model
+
+# Number of scenarios whose best teams are evaluated to find a good initial solution
+N_HINT_SCENARIOS: int = 200
+
+
+def team_scores(pick_data: data.PickData, team: data.Team, samples: np.ndarray) -> np.ndarray:
+    """
+    Calculate the total points of a team in every scenario.
+    :param pick_data: object containing all information about all possible picks
+    :param team: the team to evaluate
+    :param samples: matrix of shape (scenarios, picks) containing the points of every pick in every scenario; the
+        columns refer to the picks in the order of `pick_data.keys()`
+    :return: the total points of the team in every scenario
+    """
+    column = {pick_id: i for i, pick_id in enumerate(pick_data.keys())}
+    weights = np.zeros(len(column))
+    for pick in team:
+        weights[column[pick.pick_id]] = 2 if pick.td else 1
+    return np.asarray(samples, dtype=np.float64) @ weights
+
+
+def _n_tail(n_scenarios: int, alpha: float) -> int:
+    if not 0 < alpha <= 1:
+        raise ValueError("`alpha` must be in (0, 1].")
+    return max(1, math.ceil(alpha * n_scenarios - 1e-9))
+
+
+def cvar(scores: np.ndarray, alpha: float) -> float:
+    """
+    Calculate the conditional value at risk, i.e. the mean of the `alpha` fraction of the worst scores.
+    :param scores: the scores in all scenarios
+    :param alpha: fraction of the worst scenarios to average
+    :return: the conditional value at risk
+    """
+    return float(np.sort(scores)[:_n_tail(len(scores), alpha)].mean())
+
+
+def value_at_risk(scores: np.ndarray, q: float) -> float:
+    """
+    Calculate the highest score which is reached in at least a `1 - q` fraction of all scenarios.
+    :param scores: the scores in all scenarios
+    :param q: fraction of scenarios which may score less
+    :return: the `q` quantile of the scores
+    """
+    if not 0 <= q < 1:
+        raise ValueError("`q` must be in [0, 1).")
+    return float(np.sort(scores)[int(math.floor(q * len(scores)))])
+
+
+def beat_probability(scores: np.ndarray, rival_scores: np.ndarray) -> float:
+    """
+    Calculate the fraction of scenarios in which a team scores more points than a rival team.
+    :param scores: the scores of the team in all scenarios
+    :param rival_scores: the scores of the rival team in all scenarios
+    :return: the fraction of scenarios won
+    """
+    return float(np.mean(np.asarray(scores) > np.asarray(rival_scores)))
+
+
+class _ScenarioModel:
+    """
+    CP-SAT model of a team whose total points are linked to every scenario.
+
+    Identical scenarios are merged and weighted by their number of occurrences to reduce the size of the model.
+    """
+
+    def __init__(self, pick_data: data.PickData, samples: np.ndarray, extra_column: Optional[np.ndarray] = None):
+        from ortools.sat.python import cp_model
+
+        self.pick_data = pick_data
+        self.table = data.as_pick_table(pick_data)
+        samples = np.atleast_2d(np.asarray(samples, dtype=np.float64))
+        if samples.shape[1] != len(self.table):
+            raise ValueError(f"Expected {len(self.table)} columns, got {samples.shape[1]}.")
+        self.samples = samples
+        # Multiply by 10 to convert the values to int
+        scaled = np.round(samples * 10).astype(np.int64)
+        if extra_column is not None:
+            scaled = np.column_stack([scaled, np.round(np.asarray(extra_column) * 10).astype(np.int64)])
+        unique, counts = np.unique(scaled, axis=0, return_counts=True)
+        self.points = unique[:, :len(self.table)]
+        self.extra = unique[:, len(self.table)] if extra_column is not None else None
+        self.counts = counts.astype(np.int64)
+        self.n_scenarios = len(samples)
+
+        self.model = cp_model.CpModel()
+        self.d_select, self.t_select = solver._add_team_constraints(self.model, self.table)
+        # score[k] = sum of points of selected picks and the turbo driver in scenario `k`
+        self.scores = []
+        variables = self.d_select + self.t_select
+        for row in self.points:
+            bound = 2 * int(np.abs(row).sum())
+            score = self.model.NewIntVar(-bound, bound, "s")
+            coefficients = row.tolist()
+            self.model.Add(score == cp_model.LinearExpr.WeightedSum(variables, coefficients + coefficients))
+            self.scores.append(score)
+        self.bound = max(2 * int(np.abs(self.points).sum(axis=1).max()), 1)
+
+    def hint(self, objective):
+        """
+        Use the best team of several scenarios and of the expected points as initial solution.
+        :param objective: function calculating the objective value of a team from its scores in all scenarios
+        """
+        hint_rows = self.samples[np.linspace(0, self.n_scenarios - 1, min(N_HINT_SCENARIOS, self.n_scenarios),
+                                             dtype=np.int64)]
+        candidates = solver.solve_batch(self.pick_data, np.vstack([self.samples.mean(axis=0), hint_rows]))
+        best = max(candidates, key=lambda team: objective(team_scores(self.pick_data, team, self.samples)))
+        selected = {pick.pick_id: pick.td for pick in best}
+        for pick_id, d, t in zip(self.table.pick_ids.tolist(), self.d_select, self.t_select):
+            self.model.AddHint(d, pick_id in selected)
+            self.model.AddHint(t, selected.get(pick_id, False))
+
+    def solve(self, time_limit: Optional[float]) -> data.Team:
+        from ortools.sat.python import cp_model
+
+        cp_solver = cp_model.CpSolver()
+        if time_limit is not None:
+            cp_solver.parameters.max_time_in_seconds = time_limit
+        status = cp_solver.Solve(self.model)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            raise RuntimeError(f"Model solving failed: {status}!")
+        selected = [i for i in range(len(self.table)) if cp_solver.Value(self.d_select[i]) == 1]
+        td = next(i for i in selected if cp_solver.Value(self.t_select[i]) == 1)
+        return self.table.team(selected, td)
+
+
+def solve_cvar(pick_data: data.PickData, samples: np.ndarray, *, alpha: float = 0.1,
+               time_limit: Optional[float] = None) -> data.Team:
+    """
+    Find the team with the highest conditional value at risk, i.e. the best mean of the `alpha` fraction of its worst
+    scenarios.
+
+    Uses the linear formulation of Rockafellar and Uryasev:
+    `max m * eta - sum(z[k])` with `z[k] >= eta - score[k]` and `z[k] >= 0`, where `m` is the number of tail scenarios.
+    :param pick_data: object containing all information about all possible picks
+    :param samples: matrix of shape (scenarios, picks) containing the points of every pick in every scenario, e.g.
+        `montecarlo.SimulationResult.samples`; the columns refer to the picks in the order of `pick_data.keys()`
+    :param alpha: fraction of the worst scenarios to average
+    :param time_limit: maximum number of seconds to search, the best team found so far is returned afterwards
+    :return: the team; the picks are copies
+    """
+    model = _ScenarioModel(pick_data, samples)
+    m = _n_tail(model.n_scenarios, alpha)
+    eta = model.model.NewIntVar(-model.bound, model.bound, "eta")
+    shortfalls = []
+    for score, count in zip(model.scores, model.counts):
+        z = model.model.NewIntVar(0, 2 * model.bound, "z")
+        model.model.Add(z >= eta - score)
+        shortfalls.append((z, int(count)))
+    model.model.Maximize(m * eta - sum(count * z for z, count in shortfalls))
+    model.hint(lambda scores: cvar(scores, alpha))
+    return model.solve(time_limit)
+
+
+def solve_value_at_risk(pick_data: data.PickData, samples: np.ndarray, *, q: float = 0.1,
+                        time_limit: Optional[float] = None) -> data.Team:
+    """
+    Find the team with the highest score which is reached in at least a `1 - q` fraction of all scenarios.
+    :param pick_data: object containing all information about all possible picks
+    :param samples: matrix of shape (scenarios, picks) containing the points of every pick in every scenario; the
+        columns refer to the picks in the order of `pick_data.keys()`
+    :param q: fraction of scenarios which may score less
+    :param time_limit: maximum number of seconds to search, the best team found so far is returned afterwards
+    :return: the team; the picks are copies
+    """
+    model = _ScenarioModel(pick_data, samples)
+    n_required = model.n_scenarios - int(math.floor(q * model.n_scenarios))
+    eta = model.model.NewIntVar(-model.bound, model.bound, "eta")
+    reached = []
+    for score, count in zip(model.scores, model.counts):
+        y = model.model.NewBoolVar("y")
+        model.model.Add(score >= eta).OnlyEnforceIf(y)
+        reached.append(int(count) * y)
+    model.model.Add(sum(reached) >= n_required)
+    model.model.Maximize(eta)
+    model.hint(lambda scores: value_at_risk(scores, q))
+    return model.solve(time_limit)
+
+
+def solve_beat_rival(pick_data: data.PickData, samples: np.ndarray, rival: data.Team, *,
+                     time_limit: Optional[float] = None) -> data.Team:
+    """
+    Find the team with the highest probability to score more points than a rival team.
+    :param pick_data: object containing all information about all possible picks
+    :param samples: matrix of shape (scenarios, picks) containing the points of every pick in every scenario; the
+        columns refer to the picks in the order of `pick_data.keys()`
+    :param rival: the rival team
+    :param time_limit: maximum number of seconds to search, the best team found so far is returned afterwards
+    :return: the team; the picks are copies
+    """
+    rival_scores = team_scores(pick_data, rival, samples)
+    model = _ScenarioModel(pick_data, samples, extra_column=rival_scores)
+    won = []
+    for score, rival_score, count in zip(model.scores, model.extra, model.counts):
+        y = model.model.NewBoolVar("y")
+        model.model.Add(score >= int(rival_score) + 1).OnlyEnforceIf(y)
+        won.append(int(count) * y)
+    model.model.Maximize(sum(won))
+    model.hint(lambda scores: beat_probability(scores, rival_scores))
+    return model.solve(time_limit)
@@ -0,0 +1,296 @@
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.simulator as simulator
+
+# Placements in results which are not positions, e.g. drivers who did not finish or were disqualified
+STATUSES: tuple[str, ...] = ("NC", "DNF", "DNS", "RET", "DQ", "DSQ", "EX")
+
+
+class ModeRules:
+    """
+    How drivers score points in one mode of an event, e.g. the race.
+
+    Constructors score the total points of their drivers in every mode plus bonuses depending on how many of their
+    drivers finished within a number of positions.
+    """
+
+    def __init__(self, position_points: Sequence[float], *, status_points: Optional[dict[str, float]] = None,
+                 gained_points: float = 0, gained_reference: Optional[data.Mode.Id] = None,
+                 constructor_bonuses: Optional[Sequence[tuple[int, Sequence[float]]]] = None):
+        """
+        :param position_points: the points of every position starting with the winner, all further positions score no
+            points
+        :param status_points: the points of drivers by their placement if it is not a position, e.g. `NC` or `DQ`;
+            they replace the points of the position
+        :param gained_points: the points for every position gained compared to `gained_reference`, lost positions
+            score the negative points
+        :param gained_reference: the mode containing the starting positions, e.g. the starting grid
+        :param constructor_bonuses: pairs of a number of positions and the bonus points of a constructor by the number
+            of their drivers within these positions; the bonuses of all pairs are added up
+        """
+        if gained_points and gained_reference is None:
+            raise ValueError("Points for gained positions require a reference mode.")
+        unknown = set(status_points or ()) - set(STATUSES)
+        if unknown:
+            raise ValueError(f"Unknown placements {', '.join(sorted(unknown))}, expected one of {', '.join(STATUSES)}.")
+        self.position_points = [float(points) for points in position_points]
+        self.status_points = dict(status_points or dict())
+        self.gained_points = float(gained_points)
+        self.gained_reference = gained_reference
+        self.constructor_bonuses = [(int(top), [float(points) for points in bonus])
+                                    for top, bonus in constructor_bonuses or ()]
+
+    @staticmethod
+    def from_dict(rules: dict[str, Any]) -> "ModeRules":
+        """
+        Create rules from their JSON representation.
+        :param rules: the rules, containing the keys of the arguments of the constructor
+        :return: the rules
+        """
+        rules = dict(rules)
+        try:
+            position_points = rules.pop("position_points")
+        except KeyError:
+            raise ValueError("The rules lack the key `position_points`.") from None
+        return ModeRules(position_points, **rules)
+
+
+class RuleSet:
+    """
+    The scoring rules of all modes of an event, e.g. of one season of the fantasy game.
+
+    A rule set is compiled for a table of picks into dense arrays, which score the results of many events at once.
+    """
+
+    def __init__(self, name: str, modes: dict[data.Mode.Id, ModeRules], *, default: Optional[ModeRules] = None):
+        """
+        :param name: the name of the rule set
+        :param modes: the rules of every mode which scores points
+        :param default: the rules of all other modes, `None` if they do not score points
+        """
+        self.name = name
+        self.modes = modes
+        self.default = default
+
+    @staticmethod
+    def from_dict(name: str, definition: dict[str, Any]) -> "RuleSet":
+        """
+        Create a rule set from its declarative representation like `RULE_DEFINITIONS`.
+        :param name: the name of the rule set
+        :param definition: dictionary containing the rules of every mode, and the key `*` for the rules of all other
+            modes
+        :return: the rule set
+        """
+        modes = {mode: ModeRules.from_dict(rules) for mode, rules in definition.items() if mode != "*"}
+        default = ModeRules.from_dict(definition["*"]) if "*" in definition else None
+        return RuleSet(name, modes, default=default)
+
+    def rules(self, mode: data.Mode.Id) -> Optional[ModeRules]:
+        return self.modes.get(mode, self.default)
+
+    def compile(self, table: data.PickTable, modes: Sequence[data.Mode.Id]) -> "CompiledRules":
+        """
+        Compile the rules of the given modes for a table of picks.
+        :param table: all possible picks
+        :param modes: the modes which are scored; reference modes of positions gained are added if necessary
+        :return: the compiled rules
+        """
+        return CompiledRules(self, table, modes)
+
+
+class CompiledRules:
+    """
+    A rule set compiled into lookup arrays for a fixed table of picks and fixed modes.
+
+    Results are encoded as arrays of shape (events, modes, drivers), so the points of all drivers in all modes of all
+    events are calculated with a few vectorized operations.
+    """
+
+    def __init__(self, rule_set: RuleSet, table: data.PickTable, modes: Sequence[data.Mode.Id]):
+        """
+        :param rule_set: the rules
+        :param table: all possible picks
+        :param modes: the modes which are scored
+        """
+        scored_modes = list(dict.fromkeys(modes))
+        modes = list(scored_modes)
+        for mode in scored_modes:
+            rules = rule_set.rules(mode)
+            if rules is not None and rules.gained_reference is not None and rules.gained_reference not in modes:
+                modes.append(rules.gained_reference)
+        self.rule_set = rule_set
+        self.table = table
+        # The scored modes followed by the reference modes of positions gained, which do not score themselves
+        self.modes = modes
+        mode_rules = [rule_set.rules(mode) if mode in scored_modes else None for mode in modes]
+        scored = [rules for rules in mode_rules if rules is not None]
+
+        self.driver_rows = table.driver_rows
+        constructor_rows = table.constructor_rows[self.driver_rows]
+        if np.any(constructor_rows < 0):
+            raise KeyError(f"Unknown team `{table.team_ids[self.driver_rows[np.argmin(constructor_rows)]]}`.")
+        # Matrix of shape (drivers, picks) adding the points of every driver to themselves and to their constructor
+        self.assignment = np.zeros((len(self.driver_rows), len(table)))
+        self.assignment[np.arange(len(self.driver_rows)), self.driver_rows] = 1
+        self.assignment[np.arange(len(self.driver_rows)), constructor_rows] = 1
+        # Matrix of shape (drivers, picks) selecting the constructor of every driver
+        self.membership = np.zeros_like(self.assignment)
+        self.membership[np.arange(len(self.driver_rows)), constructor_rows] = 1
+
+        # The points of every position of every mode; the last column is for drivers without a result
+        n_positions = max([len(rules.position_points) for rules in scored], default=0) + 1
+        self.position_points = np.zeros((len(modes), n_positions))
+        # The points of every placement of `STATUSES`; column 0 is for positions
+        self.status_points = np.zeros((len(modes), len(STATUSES) + 1))
+        self.has_status_points = np.zeros((len(modes), len(STATUSES) + 1), dtype=bool)
+        self.gained_points = np.zeros(len(modes))
+        self.gained_reference = np.full(len(modes), -1)
+        n_bonuses = max([len(rules.constructor_bonuses) for rules in scored], default=0)
+        max_drivers = int(np.max(self.membership.sum(axis=0), initial=0))
+        # The number of positions and the bonus by the number of drivers of every constructor bonus of every mode
+        self.bonus_top = np.zeros((len(modes), n_bonuses), dtype=np.int64)
+        self.bonus_points = np.zeros((len(modes), n_bonuses, max_drivers + 1))
+        for m, rules in enumerate(mode_rules):
+            if rules is None:
+                continue
+            self.position_points[m, :len(rules.position_points)] = rules.position_points
+            for status, points in rules.status_points.items():
+                self.status_points[m, STATUSES.index(status) + 1] = points
+                self.has_status_points[m, STATUSES.index(status) + 1] = True
+            if rules.gained_reference is not None:
+                self.gained_points[m] = rules.gained_points
+                self.gained_reference[m] = modes.index(rules.gained_reference)
+            for b, (top, bonus) in enumerate(rules.constructor_bonuses):
+                self.bonus_top[m, b] = top
+                bonus = bonus[:max_drivers + 1]
+                self.bonus_points[m, b, :len(bonus)] = bonus
+
+    def encode(self, events: Sequence[data.EventData]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Encode the results of several events.
+
+        Drivers who are not part of the table are skipped; the positions of all other drivers are not changed. The
+        encoding does not depend on the rules, so encoded results can be scored by any rules compiled for the same table
+        and modes.
+        :param events: the placement data of every event
+        :return: the position of every driver in every mode of every event starting with 0, -1 if the driver has no
+            result; and the placement of every driver as index into `STATUSES` plus 1, 0 for positions and unknown
+            placements; both of shape (events, modes, drivers)
+        """
+        ranks = np.full((len(events), len(self.modes), len(self.driver_rows)), -1, dtype=np.int64)
+        statuses = np.zeros_like(ranks)
+        columns = {int(row): column for column, row in enumerate(self.driver_rows.tolist())}
+        status_codes = {status: code for code, status in enumerate(STATUSES, start=1)}
+        # The columns of the names as they are spelled in the results, which repeat in every event
+        name_columns: dict[str, Optional[int]] = dict()
+        indices, values = [], []
+        for e, event_data in enumerate(events):
+            for m, mode in enumerate(self.modes):
+                for position, (placement, name) in enumerate(event_data.get(mode, ())):
+                    if name not in name_columns:
+                        name_columns[name] = columns.get(self.table.find(name))
+                    column = name_columns[name]
+                    if column is not None:
+                        indices.append((e, m, column))
+                        values.append((position, status_codes.get(placement, 0)))
+        if indices:
+            e, m, column = np.array(indices).T
+            ranks[e, m, column], statuses[e, m, column] = np.array(values).T
+        return ranks, statuses
+
+    def driver_points(self, ranks: np.ndarray, statuses: np.ndarray) -> np.ndarray:
+        """
+        Calculate the points of every driver in every mode.
+        :param ranks: the encoded positions as returned by `encode`
+        :param statuses: the encoded placements as returned by `encode`
+        :return: array of shape (events, modes, drivers)
+        """
+        modes = np.arange(len(self.modes))[None, :, None]
+        n_positions = self.position_points.shape[1]
+        # Positions without points and missing results use the last column, which is zero
+        points = self.position_points[modes, np.where((ranks >= 0) & (ranks < n_positions - 1), ranks, -1)]
+        points = np.where(self.has_status_points[modes, statuses], self.status_points[modes, statuses], points)
+
+        references = self.gained_reference
+        if np.any(references >= 0):
+            reference_ranks = ranks[:, np.maximum(references, 0), :]
+            reference_statuses = statuses[:, np.maximum(references, 0), :]
+            gained = (references >= 0)[None, :, None] & (ranks >= 0) & (statuses == 0) & (reference_ranks >= 0) \
+                & (reference_statuses == 0)
+            points = points + np.where(gained, self.gained_points[modes] * (reference_ranks - ranks), 0)
+        return points
+
+    def score(self, ranks: np.ndarray, statuses: np.ndarray) -> np.ndarray:
+        """
+        Calculate the points of all picks in every event.
+        :param ranks: the encoded positions as returned by `encode`
+        :param statuses: the encoded placements as returned by `encode`
+        :return: array of shape (events, picks) in the order of the rows of the table
+        """
+        points = self.driver_points(ranks, statuses).sum(axis=1) @ self.assignment
+        if self.bonus_top.size:
+            # Number of drivers of every constructor within the positions of every bonus
+            within = (ranks[:, :, None, :] >= 0) & (ranks[:, :, None, :] < self.bonus_top[None, :, :, None])
+            counts = np.rint(within @ self.membership).astype(np.int64)
+            modes = np.arange(len(self.modes))[None, :, None, None]
+            bonuses = np.arange(self.bonus_top.shape[1])[None, None, :, None]
+            # Modes without results, e.g. a qualifying which did not take place, do not score bonuses
+            held = np.any(ranks >= 0, axis=2)[:, :, None, None]
+            bonus = np.where(held, self.bonus_points[modes, bonuses, counts], 0).sum(axis=(1, 2))
+            points += np.where(self.table.is_constructor, bonus, 0)
+        return points
+
+
+# The rules of `simulator.simulate`: every mode scores the qualifying and the race points of the positions
+LEGACY_RULES: RuleSet = RuleSet("legacy", dict(), default=ModeRules(
+    [points + simulator.RACE_POINTS.get(str(i), 0) for i, points in enumerate(simulator.QUALIFYING_POINTS)]))
+
+# Declarative rule sets of the fantasy game by the first season in which they apply
+RULE_DEFINITIONS: dict[data.Season, dict[str, Any]] = {
+    2023: {
+        "qualifying": {"position_points": [10, 9, 8, 7, 6, 5, 4, 3, 2, 1],
+                       "status_points": {"NC": -5, "DQ": -15},
+                       # Q2 are the first 15 and Q3 the first 10 positions, e.g. constructors score 10 points if both
+                       # drivers reach Q3 and 5 points if one driver reaches Q3 and the other one is out in Q1
+                       "constructor_bonuses": [(15, [-1, 1, 3]), (10, [0, 4, 7])]},
+        "sprint-results": {"position_points": [8, 7, 6, 5, 4, 3, 2, 1],
+                           "status_points": {"NC": -20, "DQ": -20},
+                           "gained_points": 1, "gained_reference": "sprint-grid"},
+        "race-result": {"position_points": [25, 18, 15, 12, 10, 8, 6, 4, 2, 1],
+                        "status_points": {"NC": -20, "DQ": -20},
+                        "gained_points": 1, "gained_reference": "starting-grid"},
+        "fastest-laps": {"position_points": [10]},
+    },
+}
+
+
+def for_season(season: data.Season) -> RuleSet:
+    """
+    Get the rules of the fantasy game in a season.
+    :param season: the season
+    :return: the latest rule set of `RULE_DEFINITIONS` which applies to the season, `LEGACY_RULES` if there is none
+    """
+    seasons = [first for first in RULE_DEFINITIONS if first <= season]
+    if not seasons:
+        return LEGACY_RULES
+    return RuleSet.from_dict(str(max(seasons)), RULE_DEFINITIONS[max(seasons)])
+
+
+def score_season(table: data.PickTable, season_data: data.SeasonData, rule_set: RuleSet, *,
+                 modes: Optional[Sequence[data.Mode.Id]] = None) -> np.ndarray:
+    """
+    Calculate the points of all picks in all events of a season in one batched pass.
+    :param table: all possible picks
+    :param season_data: the placement data of all venues of the season
+    :param rule_set: the rules
+    :param modes: the modes which score points, `None` for all modes of the season
+    :return: array of shape (venues, picks) in the order of `season_data` and of the rows of the table
+    """
+    if modes is None:
+        modes = list(dict.fromkeys(mode for event_data in season_data.values() for mode in event_data))
+    compiled = rule_set.compile(table, modes)
+    ranks, statuses = compiled.encode(list(season_data.values()))
+    return compiled.score(ranks, statuses)
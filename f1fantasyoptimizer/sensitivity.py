@@ -0,0 +1,235 @@
+import math
+from typing import Any, Optional, Union
+
+import numpy as np
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.lineups as lineups
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tracing as tracing
+
+
+class PickSensitivity:
+    """
+    The ranges of the points and the cost of a pick within which the best team does not change.
+
+    The points thresholds are the values at which another team scores as many points as the best team; beyond them the
+    other team is better. The cost thresholds are the values at which a better team becomes affordable or the best team
+    becomes too expensive. Thresholds which do not exist are infinite.
+    """
+
+    def __init__(self, pick: data.Pick, *, in_team: bool, points_lower: float, points_upper: float,
+                 below: Optional[data.Team], above: Optional[data.Team], cost_lower: float, cost_upper: float):
+        """
+        :param pick: the pick; its `td` flag tells whether it is the turbo driver of the best team
+        :param in_team: whether the pick is part of the best team
+        :param points_lower: the points below which the best team changes
+        :param points_upper: the points above which the best team changes
+        :param below: the team which is best once the points fall below `points_lower`
+        :param above: the team which is best once the points rise above `points_upper`
+        :param cost_lower: the cost at or below which a better team becomes affordable
+        :param cost_upper: the cost above which the best team becomes too expensive
+        """
+        self.pick = pick
+        self.in_team = in_team
+        self.points_lower = points_lower
+        self.points_upper = points_upper
+        self.below = below
+        self.above = above
+        self.cost_lower = cost_lower
+        self.cost_upper = cost_upper
+
+    @property
+    def points_margin(self) -> float:
+        """
+        The smallest change of the points of the pick which changes the best team.
+        """
+        return min(self.pick.points - self.points_lower, self.points_upper - self.pick.points)
+
+    def to_dict(self) -> dict[str, Any]:
+        def finite(value: float) -> Optional[float]:
+            # JSON has no infinity
+            return round(value, 2) if math.isfinite(value) else None
+
+        def names(team: Optional[data.Team]) -> Optional[list[str]]:
+            return None if team is None else [pick.name for pick in team]
+
+        return {"name": self.pick.name, "points": self.pick.points, "cost": self.pick.cost, "in_team": self.in_team,
+                "td": self.pick.td, "points_lower": finite(self.points_lower),
+                "points_upper": finite(self.points_upper), "below": names(self.below), "above": names(self.above),
+                "cost_lower": finite(self.cost_lower), "cost_upper": finite(self.cost_upper)}
+
+
+class SensitivityReport:
+    """
+    The best team together with the sensitivity of every pick.
+    """
+
+    def __init__(self, team: data.Team, picks: list[PickSensitivity]):
+        """
+        :param team: the best team
+        :param picks: the sensitivity of every pick in the order of the rows of the table
+        """
+        self.team = team
+        self.picks = picks
+
+    def __getitem__(self, name: str) -> PickSensitivity:
+        normalized = data.normalize_name(name)
+        for pick in self.picks:
+            if data.normalize_name(pick.pick.name) == normalized:
+                return pick
+        raise KeyError(f"Unknown pick `{name}`.")
+
+    def report(self) -> str:
+        """
+        Summarize the ranges of the picks of the best team and of the picks closest to entering it.
+        :return: the summary as text
+        """
+        def interval(lower: float, upper: float) -> str:
+            return f"{lower:>8.1f} {upper:>8.1f}"
+
+        names = [pick.pick.name + (" (TD)" if pick.pick.td else "") for pick in self.picks]
+        width = max(len(name) for name in names)
+        lines = [f"{'pick':<{width}} {'points':>7} {'from':>8} {'to':>8} {'cost':>6} {'from':>8} {'to':>8}"]
+        for name, pick in sorted(zip(names, self.picks), key=lambda p: (not p[1].in_team, p[1].points_margin)):
+            lines.append(f"{name:<{width}} {pick.pick.points:>7.1f} {interval(pick.points_lower, pick.points_upper)} "
+                         f"{pick.pick.cost:>6.1f} {interval(pick.cost_lower, pick.cost_upper)}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"picks": [pick.to_dict() for pick in self.picks]}
+
+
+def _best_per_group(values: np.ndarray, groups: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Find the maximum of a matrix of shape (groups, items) in every row.
+    :return: the maximum of every row, `-inf` for empty rows, and the column of the maximum
+    """
+    masked = np.where(groups, values, -np.inf)
+    best = np.argmax(masked, axis=1)
+    return masked[np.arange(len(masked)), best], best
+
+
+@tracing.traced("sensitivity.analyze", tracing.SOLVE)
+def analyze(pick_data: Union[data.PickData, data.PickTable], *, budget: float = solver.BUDGET) -> SensitivityReport:
+    """
+    Find the best team and the ranges of the points and the cost of every pick within which it stays the best team.
+
+    Changing the points of a pick by `x` changes the points of a team by `k * x`, where `k` is 0 if the pick is not part
+    of the team, 2 if it is the turbo driver and 1 otherwise. So for every pick and every `k` only the best team with
+    this multiplicity is relevant, and all of them are found with one sweep over the driver sets and constructor pairs
+    of a `lineups.LineupSpace`. Costs are handled likewise by finding the cheapest team containing the pick which scores
+    more points than the best team.
+    :param pick_data: object containing all information about all possible picks or a table of them
+    :param budget: the maximum cost of a team
+    :return: the best team and the sensitivity of every pick
+    """
+    table = data.as_pick_table(pick_data)
+    points = table.points
+    n_picks = len(table)
+    space = lineups.LineupSpace(table, budget=budget)
+    if not len(space.driver_sets):
+        raise RuntimeError("No team satisfies all constraints!")
+    driver_sets, pairs = space.driver_sets, space.constructor_pairs
+    n_affordable = space.n_affordable_pairs
+
+    # Points of the driver sets: their sum and the two best drivers, one of whom is the turbo driver
+    driver_points = points[driver_sets]
+    order = np.argsort(-driver_points, axis=1, kind="stable")
+    top1_column, top2_column = order[:, 0], order[:, 1]
+    top1 = driver_points[np.arange(len(driver_sets)), top1_column]
+    top2 = driver_points[np.arange(len(driver_sets)), top2_column]
+    pair_points = points[pairs].sum(axis=1)
+    best_pair_points = np.maximum.accumulate(pair_points)[n_affordable - 1]
+    base = driver_points.sum(axis=1) + best_pair_points
+    scores = base + top1
+    best = int(np.argmax(scores))
+    best_score = float(scores[best])
+
+    # best_points[k, i]: the points of the best team in which pick `i` counts `k` times; best_sets[k, i]: its driver set
+    best_points = np.full((3, n_picks), -np.inf)
+    best_sets = np.zeros((3, n_picks), dtype=np.int64)
+    best_pair_masks: dict[tuple[int, int], np.ndarray] = dict()
+    drivers = np.flatnonzero(table.is_driver)
+    contains = (driver_sets[None, :, :] == drivers[:, None, None]).any(axis=2)
+    is_top1 = driver_sets[np.arange(len(driver_sets)), top1_column][None, :] == drivers[:, None]
+    best_points[2, drivers], best_sets[2, drivers] = _best_per_group(np.broadcast_to(base, contains.shape), contains)
+    best_points[2, drivers] += points[drivers]
+    best_points[1, drivers], best_sets[1, drivers] = _best_per_group(base + np.where(is_top1, top2, top1), contains)
+    best_points[0, drivers], best_sets[0, drivers] = _best_per_group(np.broadcast_to(scores, contains.shape),
+                                                                     ~contains)
+    constructors = np.flatnonzero(table.is_constructor)
+    for c in constructors.tolist():
+        has = (pairs == c).any(axis=1)
+        for k, mask in ((1, has), (0, ~has)):
+            prefix = np.maximum.accumulate(np.where(mask, pair_points, -np.inf))[n_affordable - 1]
+            totals = driver_points.sum(axis=1) + top1 + prefix
+            best_sets[k, c] = int(np.argmax(totals))
+            best_points[k, c] = totals[best_sets[k, c]]
+            best_pair_masks[(k, c)] = mask
+
+    def team(k: int, row: int) -> data.Team:
+        j = int(best_sets[k, row])
+        driver_set = driver_sets[j]
+        allowed = best_pair_masks.get((k, row), np.ones(len(pairs), dtype=bool))[:n_affordable[j]]
+        pair = pairs[int(np.argmax(np.where(allowed, pair_points[:n_affordable[j]], -np.inf)))]
+        if table.is_driver[row] and k == 2:
+            td = row
+        elif table.is_driver[row] and k == 1:
+            td = int(driver_set[top2_column[j] if driver_set[top1_column[j]] == row else top1_column[j]])
+        else:
+            td = int(driver_set[top1_column[j]])
+        return table.team(sorted(driver_set.tolist() + pair.tolist()), td)
+
+    best_team_set = driver_sets[best]
+    best_pair = int(np.argmax(pair_points[:n_affordable[best]]))
+    team_rows = sorted(best_team_set.tolist() + pairs[best_pair].tolist())
+    td_row = int(best_team_set[top1_column[best]])
+    team_cost = round(float(table.costs[team_rows].sum()), 1)
+    cheapest = _cheapest_better_teams(table, best_score)
+
+    picks = []
+    for row in range(n_picks):
+        k = (2 if row == td_row else 1) if row in team_rows else 0
+        lower, upper, below, above = -math.inf, math.inf, None, None
+        for other in range(3):
+            if other == k or not np.isfinite(best_points[other, row]):
+                continue
+            threshold = (best_score - best_points[other, row]) / (other - k)
+            if other > k and threshold < upper:
+                upper, above = threshold, other
+            elif other < k and threshold > lower:
+                lower, below = threshold, other
+        cost = float(table.costs[row])
+        # A better team only becomes affordable if the cost of the pick may fall far enough without becoming negative
+        cost_lower = round(cost - (cheapest[row] - budget), 1)
+        picks.append(PickSensitivity(
+            table.pick(row, td=row == td_row), in_team=k > 0, points_lower=float(points[row] + lower),
+            points_upper=float(points[row] + upper), below=None if below is None else team(below, row),
+            above=None if above is None else team(above, row),
+            cost_lower=cost_lower if cost_lower >= 0 else -math.inf,
+            cost_upper=round(cost + budget - team_cost, 1) if k > 0 else math.inf))
+    return SensitivityReport(table.team(team_rows, td_row), picks)
+
+
+def _cheapest_better_teams(table: data.PickTable, score: float) -> np.ndarray:
+    """
+    Find the cost of the cheapest team containing each pick which scores more points than a given score, regardless of
+    the budget.
+    :return: the cost for every pick, `inf` if no team containing the pick scores more
+    """
+    space = lineups.LineupSpace(table, budget=float(table.costs.sum()))
+    driver_sets, pairs = space.driver_sets, space.constructor_pairs
+    driver_points = table.points[driver_sets]
+    driver_set_points = driver_points.sum(axis=1) + driver_points.max(axis=1)
+    pair_points = table.points[pairs].sum(axis=1)
+    cheapest = np.full(len(table), np.inf)
+    chunk = max(1, lineups.CHUNK_ELEMENTS // max(1, len(pairs)))
+    for start in range(0, len(driver_sets), chunk):
+        sets = slice(start, start + chunk)
+        # Scores are compared on a 0.1 grid like in the solver
+        better = np.round((driver_set_points[sets, None] + pair_points[None, :]) * 10) > round(score * 10)
+        costs = np.where(better, space.driver_set_costs[sets, None] + space.constructor_pair_costs[None, :], np.inf)
+        np.minimum.at(cheapest, driver_sets[sets].ravel(), np.repeat(costs.min(axis=1), driver_sets.shape[1]))
+        np.minimum.at(cheapest, pairs.ravel(), np.repeat(costs.min(axis=0), pairs.shape[1]))
+    return cheapest / 10
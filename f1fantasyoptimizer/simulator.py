@@ -1,4 +1,14 @@
+import functools
+from typing import TYPE_CHECKING, Optional, Sequence, Union
+
 import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.tracing as tracing
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Points for the qualifying positions starting with pole position, all further positions score no points
+QUALIFYING_POINTS: list[int] = [10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
 
 RACE_POINTS: dict[str, int] = {
     "0": 25,
@@ -16,23 +26,201 @@ RACE_POINTS: dict[str, int] = {
 }
 
 
-def simulate(pick_data: data.PickData, order: list[tuple[str, str]]):
+@tracing.traced("simulator.simulate", tracing.SIMULATE)
+def simulate(pick_data: Union[data.PickData, data.PickTable], order: list[tuple[str, str]], *,
+             ignore_unknown: bool = False):
+    """
+    Add the points scored in an event to all picks.
+    :param pick_data: object containing all information about all possible picks or a table of them; its points are
+        updated in place
+    :param order: list of the placement of a driver and their name
+    :param ignore_unknown: whether drivers who are not part of `pick_data` are skipped, e.g. in results of past seasons;
+        the positions of all other drivers are not changed
+    """
+    if isinstance(pick_data, data.PickTable):
+        _simulate_table(pick_data, order, ignore_unknown)
+        return
+
+    pick_data = data.as_pick_data(pick_data)
     # Calculate drivers' points
-    points = 10
     for i, (_, driver) in enumerate(order):
-        pick_id = data.find_pick_by_name(pick_data, driver)
+        pick_id = pick_data.find(driver)
+        if pick_id is None:
+            if ignore_unknown:
+                continue
+            raise KeyError(f"Unknown driver `{driver}`.")
         # Qualifying
-        pick_data[pick_id].points += points
-        if points > 0:
-            points -= 1
+        pick_data[pick_id].points += QUALIFYING_POINTS[i] if i < len(QUALIFYING_POINTS) else 0
         # Race
         pick_data[pick_id].points += RACE_POINTS.get(str(i), 0)
 
     # Calculate constructors' points by adding points of their drivers
-    for pick_id, pick in pick_data.items():
-        if pick.pick_type == data.Pick.PickType.DRIVER:
-            constructor_id = pick_data[pick.team_id].pick_id
-            pick_data[constructor_id].points += pick.points
+    for pick in pick_data.by_type(data.Pick.PickType.DRIVER):
+        pick_data[pick.team_id].points += pick.points
+
+
+@functools.lru_cache
+def _position_points(n_positions: int) -> "np.ndarray":
+    import numpy as np
+
+    # Points of the qualifying and the race for every position
+    points = np.array([RACE_POINTS.get(str(i), 0) for i in range(n_positions)], dtype=np.float64)
+    points[:len(QUALIFYING_POINTS)] += QUALIFYING_POINTS[:n_positions]
+    return points
+
+
+def _order_rows(table: data.PickTable, order: list[tuple[str, str]], ignore_unknown: bool) \
+        -> tuple[list[int], "np.ndarray"]:
+    """
+    Look up the rows of the drivers of an order.
+    :return: the row of every driver and the points of their position; drivers who are not part of `table` are left
+        out if `ignore_unknown` is set
+    """
+    rows = [table.find(driver) for _, driver in order]
+    position_points = _position_points(len(order))
+    if None in rows:
+        if not ignore_unknown:
+            raise KeyError(f"Unknown driver `{order[rows.index(None)][1]}`.")
+        positions = [i for i, row in enumerate(rows) if row is not None]
+        rows = [rows[i] for i in positions]
+        position_points = position_points[positions]
+    return rows, position_points
+
+
+def _simulate_table(table: data.PickTable, order: list[tuple[str, str]], ignore_unknown: bool):
+    import numpy as np
+
+    rows, position_points = _order_rows(table, order, ignore_unknown)
+
+    # Calculate drivers' points
+    np.add.at(table.points, rows, position_points)
+
+    # Calculate constructors' points by adding points of their drivers
+    drivers = table.driver_rows
+    constructor_rows = table.constructor_rows[drivers]
+    if np.any(constructor_rows < 0):
+        raise KeyError(f"Unknown team `{table.team_ids[drivers[np.argmin(constructor_rows)]]}`.")
+    table.points += np.bincount(constructor_rows, weights=table.points[drivers], minlength=len(table))
+
+
+@tracing.traced("simulator.score", tracing.SIMULATE)
+def score(table: data.PickTable, order: list[tuple[str, str]], *, ignore_unknown: bool = False) -> "np.ndarray":
+    """
+    Calculate the points scored in an event without changing `table`.
+
+    Unlike `simulate`, constructors only score the points their drivers scored in this event, so the points of several
+    events or modes can simply be added up.
+    :param table: all possible picks
+    :param order: list of the placement of a driver and their name
+    :param ignore_unknown: whether drivers who are not part of `table` are skipped
+    :return: the points of every row of `table`
+    """
+    import numpy as np
+
+    rows, position_points = _order_rows(table, order, ignore_unknown)
+    constructor_rows = table.constructor_rows[rows]
+    if np.any(constructor_rows < 0):
+        raise KeyError(f"Unknown team of `{table.names[rows[int(np.argmin(constructor_rows))]]}`.")
+    points = np.bincount(rows, weights=position_points, minlength=len(table))
+    # Segmented sum of the drivers' points by their constructor
+    points += np.bincount(constructor_rows, weights=position_points, minlength=len(table))
+    return points
+
+
+class OrderScorer:
+    """
+    Points of all picks for an order of drivers, updated incrementally when drivers change their positions.
+
+    Moving drivers only changes the points of these drivers and of their constructors, so a search over orders can
+    evaluate every neighbouring order in constant time instead of scoring all picks again.
+    """
+
+    def __init__(self, table: data.PickTable, rows: Sequence[int], position_points: Optional["np.ndarray"] = None):
+        """
+        :param table: all possible picks
+        :param rows: the rows of the drivers in the order of their positions
+        :param position_points: the points of every position, by default the points of the qualifying and the race
+        """
+        import numpy as np
+
+        # Plain lists, because indexing them is much faster than indexing arrays for single elements
+        self.rows: list[int] = [int(row) for row in rows]
+        self.position_points: list[float] = _position_points(len(self.rows)).tolist() if position_points is None \
+            else [float(points) for points in position_points]
+        if len(self.position_points) != len(self.rows):
+            raise ValueError(f"Expected {len(self.rows)} position points, got {len(self.position_points)}.")
+        if not all(table.is_driver[self.rows]):
+            raise ValueError(f"`{table.names[next(row for row in self.rows if not table.is_driver[row])]}` is not a "
+                             f"driver.")
+        # Row of the constructor of every driver
+        self.constructor_rows: list[int] = table.constructor_rows.tolist()
+        constructors = [self.constructor_rows[row] for row in self.rows]
+        if min(constructors, default=0) < 0:
+            raise KeyError(f"Unknown team of `{table.names[self.rows[constructors.index(min(constructors))]]}`.")
+        self.points = np.bincount(self.rows, weights=self.position_points, minlength=len(table))
+        # Segmented sum of the drivers' points by their constructor
+        self.points += np.bincount(constructors, weights=self.position_points, minlength=len(table))
+
+    @staticmethod
+    def from_order(table: data.PickTable, order: list[tuple[str, str]], *, ignore_unknown: bool = False) \
+            -> "OrderScorer":
+        """
+        Score an order of driver names.
+        :param table: all possible picks
+        :param order: list of the placement of a driver and their name
+        :param ignore_unknown: whether drivers who are not part of `table` are skipped; their positions are left out, so
+            the positions of all other drivers are not changed
+        :return: the scorer
+        """
+        rows, position_points = _order_rows(table, order, ignore_unknown)
+        return OrderScorer(table, rows, position_points)
+
+    def _add(self, row: int, points: float):
+        self.points[row] += points
+        self.points[self.constructor_rows[row]] += points
+
+    def swap(self, i: int, j: int):
+        """
+        Swap the drivers at two positions.
+        :param i: the index of the first position in `rows`
+        :param j: the index of the second position in `rows`
+        """
+        rows = self.rows
+        difference = self.position_points[j] - self.position_points[i]
+        if difference:
+            points, constructor_rows = self.points, self.constructor_rows
+            points[rows[i]] += difference
+            points[constructor_rows[rows[i]]] += difference
+            points[rows[j]] -= difference
+            points[constructor_rows[rows[j]]] -= difference
+        rows[i], rows[j] = rows[j], rows[i]
+
+    def reorder(self, positions: Sequence[int], rows: Sequence[int]):
+        """
+        Place drivers at several positions at once. The drivers which are placed must be the drivers which were at
+        these positions before, i.e. the positions are permuted.
+        :param positions: the indices of the changed positions in `rows`
+        :param rows: the rows of the drivers at these positions after the change
+        """
+        previous = [self.rows[position] for position in positions]
+        if sorted(previous) != sorted(rows):
+            raise ValueError("The drivers at the given positions must only be permuted.")
+        for position, old_row, new_row in zip(positions, previous, rows):
+            if old_row != new_row:
+                points = self.position_points[position]
+                self._add(old_row, -points)
+                self._add(new_row, points)
+                self.rows[position] = new_row
+
+    def team_points(self, rows: Sequence[int], td_row: int) -> float:
+        """
+        Calculate the points of a team for the current order.
+        :param rows: the rows of the picks of the team
+        :param td_row: the row of the turbo driver, whose points count twice
+        :return: the points of the team
+        """
+        points = self.points
+        return float(sum(points[row] for row in rows) + points[td_row])
 
 
 def calculate_team_totals(team: data.Team) -> dict[str, float]:
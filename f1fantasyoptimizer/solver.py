@@ -1,6 +1,15 @@
-from ortools.sat.python import cp_model
+import abc
+import os
+import time
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+import numpy as np
 
 import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.tracing as tracing
+
+if TYPE_CHECKING:
+    from ortools.sat.python import cp_model
 
 # constants
 BUDGET: float = 100  # mil. Dollars
@@ -10,14 +19,16 @@ CAPACITY: int = NUMBER_OF_DRIVERS + NUMBER_OF_CONSTRUCTORS
 
 MAX_POINTS_PER_PICK: float = 500
 
+DEFAULT_ENGINE: str = "cpsat"
 
-def solve(pick_data: data.PickData) -> data.Team:
-    # Preprocess pick data
-    pick_data_list = list(pick_data.values())
-    n_pick_data = len(pick_data_list)
 
-    # Create model
-    model = cp_model.CpModel()
+def _add_team_constraints(model: "cp_model.CpModel", table: data.PickTable, budget: float = BUDGET) \
+        -> tuple[list["cp_model.IntVar"], list["cp_model.IntVar"]]:
+    n_pick_data = len(table)
+    # Multiply by 10 to convert the values to int
+    costs = np.round(table.costs * 10).astype(np.int64).tolist()
+    drivers = np.flatnonzero(table.is_driver).tolist()
+    constructors = np.flatnonzero(table.is_constructor).tolist()
 
     # Input variables
     # Flag indicating whether each driver is picked for the team or not
@@ -25,26 +36,11 @@ def solve(pick_data: data.PickData) -> data.Team:
     # Flag indicating which driver is the turbo driver
     t_select = [model.NewBoolVar('t') for _ in range(n_pick_data)]
 
-    # Auxiliary variables
-    # u = x * pts(x)
-    u = [model.NewIntVar(-MAX_POINTS_PER_PICK * 10, MAX_POINTS_PER_PICK * 10, "u") for _ in range(n_pick_data)]
-    # v = t * pts(x)
-    v = [model.NewIntVar(-MAX_POINTS_PER_PICK * 10, MAX_POINTS_PER_PICK * 10, "v") for _ in range(n_pick_data)]
-
-    for i in range(n_pick_data):
-        # Multiply by 10 to convert the values to int
-        model.AddMultiplicationEquality(u[i], [d_select[i], int(round(pick_data_list[i].points * 10))])
-
-    for i in range(n_pick_data):
-        # Multiply by 10 to convert the values to int
-        model.AddMultiplicationEquality(v[i], [t_select[i], int(round(pick_data_list[i].points * 10))])
-
     # Team capacity constraint
     model.Add(sum(d_select) == CAPACITY)
 
     # Budget constraint
-    # Multiply by 10 to convert the values to int
-    model.Add(sum([d_select[i] * int(round(pick_data_list[i].cost * 10)) for i in range(n_pick_data)]) <= BUDGET * 10)
+    model.Add(sum([d_select[i] * costs[i] for i in range(n_pick_data)]) <= int(round(budget * 10)))
 
     # Turbo driver constraint:
     # Selected turbo driver must be one of the selected drivers
@@ -52,15 +48,40 @@ def solve(pick_data: data.PickData) -> data.Team:
         model.AddImplication(t_select[i], d_select[i])
 
     # Turbo driver can't be a constructor
-    model.Add(sum([t_select[i] for i in range(n_pick_data) if
-                   pick_data_list[i].pick_type == data.Pick.PickType.CONSTRUCTOR]) == 0)
+    model.Add(sum([t_select[i] for i in constructors]) == 0)
     # Turbo driver must be exactly 1 driver
-    model.Add(
-        sum([t_select[i] for i in range(n_pick_data) if pick_data_list[i].pick_type == data.Pick.PickType.DRIVER]) == 1)
+    model.Add(sum([t_select[i] for i in drivers]) == 1)
 
     # Constructor constraint
-    model.Add(sum([d_select[i] for i in range(n_pick_data)
-                   if pick_data_list[i].pick_type == data.Pick.PickType.CONSTRUCTOR]) == NUMBER_OF_CONSTRUCTORS)
+    model.Add(sum([d_select[i] for i in constructors]) == NUMBER_OF_CONSTRUCTORS)
+    return d_select, t_select
+
+
+def _build_model(table: data.PickTable, budget: float = BUDGET) \
+        -> tuple["cp_model.CpModel", list["cp_model.IntVar"], list["cp_model.IntVar"]]:
+    # ortools is imported lazily because importing it takes a significant amount of time
+    from ortools.sat.python import cp_model
+
+    n_pick_data = len(table)
+    # Multiply by 10 to convert the values to int
+    points = np.round(table.points * 10).astype(np.int64).tolist()
+
+    # Create model
+    model = cp_model.CpModel()
+
+    d_select, t_select = _add_team_constraints(model, table, budget)
+
+    # Auxiliary variables
+    # u = x * pts(x)
+    u = [model.NewIntVar(-MAX_POINTS_PER_PICK * 10, MAX_POINTS_PER_PICK * 10, "u") for _ in range(n_pick_data)]
+    # v = t * pts(x)
+    v = [model.NewIntVar(-MAX_POINTS_PER_PICK * 10, MAX_POINTS_PER_PICK * 10, "v") for _ in range(n_pick_data)]
+
+    for i in range(n_pick_data):
+        model.AddMultiplicationEquality(u[i], [d_select[i], points[i]])
+
+    for i in range(n_pick_data):
+        model.AddMultiplicationEquality(v[i], [t_select[i], points[i]])
 
     # Maximize sum of points of selected drivers and selected turbo driver
     # u: Int = x * pts(x)  # points of selected drivers
@@ -68,22 +89,476 @@ def solve(pick_data: data.PickData) -> data.Team:
     # t => x  # selected turbo driver must be one of the selected drivers
     # max(u + v)
     model.Maximize(sum([u[i] + v[i] for i in range(n_pick_data)]))
-
-    # Create solver
-    solver = cp_model.CpSolver()
-    # solver.parameters.log_search_progress = True
     model.Proto().objective.scaling_factor = -1. / 10  # Inverse scaling for solver logging output
-    # Solve model
-    status = solver.Solve(model)
-
-    if status == cp_model.OPTIMAL:
-        # Create list of selected drivers
-        picks = []
-        for i in range(n_pick_data):
-            if solver.Value(d_select[i]) == 1:
-                pick = pick_data_list[i]
-                pick.td = solver.Value(t_select[i]) == 1
-                picks.append(pick)
-        return picks
-    else:
+    return model, d_select, t_select
+
+
+class SolverOptions:
+    """
+    Parameters of the CP-SAT solver.
+    """
+
+    def __init__(self, *, workers: Optional[int] = None, time_limit: Optional[float] = None,
+                 accept_feasible: bool = True, log_search_progress: bool = False):
+        """
+        :param workers: number of parallel search workers, `None` for one per CPU core
+        :param time_limit: maximum number of seconds to search, `None` for no limit
+        :param accept_feasible: whether the best team found so far is returned if the time limit is reached before
+            optimality is proven, otherwise an error is raised
+        :param log_search_progress: whether the solver logs its search progress to stdout
+        """
+        self.workers = workers
+        self.time_limit = time_limit
+        self.accept_feasible = accept_feasible
+        self.log_search_progress = log_search_progress
+
+    def apply(self, solver: "cp_model.CpSolver"):
+        """
+        Set the parameters of a solver.
+        :param solver: the solver to configure
+        """
+        if self.workers is not None:
+            solver.parameters.num_workers = self.workers
+        if self.time_limit is not None:
+            solver.parameters.max_time_in_seconds = self.time_limit
+        solver.parameters.log_search_progress = self.log_search_progress
+
+    def check_status(self, status: int):
+        """
+        Raise an error if a status of the solver does not provide a team.
+        :param status: the status returned by the solver
+        """
+        from ortools.sat.python import cp_model
+
+        if status == cp_model.OPTIMAL or (status == cp_model.FEASIBLE and self.accept_feasible):
+            return
         raise RuntimeError(f"Model solving failed: {status}!")
+
+
+class SolveMetrics:
+    """
+    Measurements of a single solve.
+    """
+
+    def __init__(self, *, engine: str, status: str, build_time: float, solve_time: float, objective: float,
+                 best_bound: float, branches: Optional[int] = None, conflicts: Optional[int] = None,
+                 workers: Optional[int] = None):
+        self.engine = engine
+        # Name of the status of the solver, e.g. `OPTIMAL` or `FEASIBLE`
+        self.status = status
+        # Wall time in seconds to build the model and to solve it
+        self.build_time = build_time
+        self.solve_time = solve_time
+        # Total points of the team found and the upper bound on the total points of the best team
+        self.objective = objective
+        self.best_bound = best_bound
+        # Search statistics of the CP-SAT solver, `None` for other engines
+        self.branches = branches
+        self.conflicts = conflicts
+        self.workers = workers
+
+    @staticmethod
+    def from_cp_solver(solver: "cp_model.CpSolver", status: int, *, build_time: float, solve_time: float) \
+            -> "SolveMetrics":
+        """
+        Collect the measurements of a CP-SAT solve.
+        :param solver: the solver after solving
+        :param status: the status returned by the solver
+        :param build_time: wall time in seconds to build the model
+        :param solve_time: wall time in seconds to solve the model
+        :return: the measurements
+        """
+        return SolveMetrics(engine="cpsat", status=solver.StatusName(status), build_time=build_time,
+                            solve_time=solve_time, objective=solver.ObjectiveValue(),
+                            best_bound=solver.BestObjectiveBound(), branches=solver.NumBranches(),
+                            conflicts=solver.NumConflicts(), workers=solver.parameters.num_workers or os.cpu_count())
+
+    @property
+    def optimal(self) -> bool:
+        return self.status == "OPTIMAL"
+
+    @property
+    def gap(self) -> float:
+        """
+        Relative difference between the objective and the bound, `0` if the team is optimal.
+        """
+        return abs(self.best_bound - self.objective) / max(abs(self.best_bound), 1e-9)
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(vars(self))
+
+    def __str__(self):
+        text = f"{self.engine}: {self.status}, {self.objective:.1f} Pts (bound {self.best_bound:.1f}), " \
+               f"build {1000 * self.build_time:.1f} ms, solve {1000 * self.solve_time:.1f} ms"
+        if self.branches is not None:
+            text += f", {self.branches} branches, {self.conflicts} conflicts, {self.workers} workers"
+        return text
+
+
+class Engine(abc.ABC):
+    """
+    Algorithm finding the best team.
+    """
+
+    def __init__(self, options: Optional[SolverOptions] = None, *, budget: float = BUDGET):
+        """
+        :param options: parameters of the solver, engines without a solver ignore them
+        :param budget: the maximum cost of a team
+        """
+        self.options = options or SolverOptions()
+        self.budget = budget
+
+    def solve(self, table: data.PickTable) -> tuple[list[int], int]:
+        """
+        Find the best team.
+        :param table: all possible picks
+        :return: the rows of the selected picks in `table` and the row of the turbo driver
+        """
+        selected, td, _ = self.solve_with_metrics(table)
+        return selected, td
+
+    @abc.abstractmethod
+    def solve_with_metrics(self, table: data.PickTable) -> tuple[list[int], int, SolveMetrics]:
+        """
+        Find the best team and measure the solve.
+        :param table: all possible picks
+        :return: the rows of the selected picks in `table`, the row of the turbo driver and the measurements
+        """
+        raise NotImplementedError
+
+
+class CpSatEngine(Engine):
+    """
+    Finds the best team by solving a constraint programming model with the OR-Tools CP-SAT solver.
+    """
+
+    def solve_with_metrics(self, table: data.PickTable) -> tuple[list[int], int, SolveMetrics]:
+        from ortools.sat.python import cp_model
+
+        n_pick_data = len(table)
+        start = time.perf_counter()
+        with tracing.span("solver.build_model", tracing.SOLVE, picks=n_pick_data):
+            model, d_select, t_select = _build_model(table, self.budget)
+        build_time = time.perf_counter() - start
+
+        # Create solver
+        solver = cp_model.CpSolver()
+        self.options.apply(solver)
+        # Solve model
+        start = time.perf_counter()
+        with tracing.span("solver.search", tracing.SOLVE, engine="cpsat"):
+            status = solver.Solve(model)
+        solve_time = time.perf_counter() - start
+        self.options.check_status(status)
+
+        selected = [i for i in range(n_pick_data) if solver.Value(d_select[i]) == 1]
+        td = next(i for i in selected if solver.Value(t_select[i]) == 1)
+        return selected, td, SolveMetrics.from_cp_solver(solver, status, build_time=build_time, solve_time=solve_time)
+
+
+class DynamicProgrammingEngine(Engine):
+    """
+    Finds the best team by exact dynamic programming over the budget.
+
+    Points and costs are scaled to integers on a 0.1 grid like in the CP-SAT model. The table holds the maximum points
+    for every number of drivers, turbo driver flag, number of constructors and exact total cost, and is updated with
+    NumPy for one pick at a time, so the runtime grows linearly with the number of picks.
+    """
+    # Value of unreachable states
+    UNREACHABLE = np.iinfo(np.int64).min // 4
+
+    # The table is filled while searching, so there is no separate build step
+    @tracing.traced("solver.search", tracing.SOLVE)
+    def solve_with_metrics(self, table: data.PickTable) -> tuple[list[int], int, SolveMetrics]:
+        start = time.perf_counter()
+        budget = int(round(self.budget * 10))
+        n_drivers = NUMBER_OF_DRIVERS
+        n_constructors = NUMBER_OF_CONSTRUCTORS
+        all_points = np.round(table.points * 10).astype(np.int64).tolist()
+        all_costs = np.round(table.costs * 10).astype(np.int64).tolist()
+        is_driver = table.is_driver.tolist()
+
+        # table[d, t, c, x]: maximum points of `d` drivers, `t` turbo drivers and `c` constructors costing exactly `x`
+        states = np.full((n_drivers + 1, 2, n_constructors + 1, budget + 1), self.UNREACHABLE, dtype=np.int64)
+        states[0, 0, 0, 0] = 0
+        # choices[i, d, t, c, x]: 0 if pick `i` is not selected in the state, 1 if it is selected, 2 if it is the
+        # turbo driver
+        choices = np.zeros((len(table),) + states.shape, dtype=np.uint8)
+
+        for i, (points, cost) in enumerate(zip(all_points, all_costs)):
+            if cost > budget:
+                continue
+            free = budget + 1 - cost
+            if is_driver[i]:
+                selected = states[:-1, :, :, :free] + points
+                turbo = states[:-1, 0, :, :free] + 2 * points
+                target = states[1:, :, :, cost:]
+                choices[i, 1:, :, :, cost:] = selected > target
+                np.maximum(target, selected, out=target)
+                target = states[1:, 1, :, cost:]
+                np.putmask(choices[i, 1:, 1, :, cost:], turbo > target, 2)
+                np.maximum(target, turbo, out=target)
+            else:
+                selected = states[:, :, :-1, :free] + points
+                target = states[:, :, 1:, cost:]
+                choices[i, :, :, 1:, cost:] = selected > target
+                np.maximum(target, selected, out=target)
+
+        final = states[n_drivers, 1, n_constructors]
+        x = int(np.argmax(final))
+        if final[x] <= self.UNREACHABLE // 2:
+            raise RuntimeError("No team satisfies all constraints!")
+
+        # Reconstruct the team by walking back through the choices
+        d, t, c = n_drivers, 1, n_constructors
+        selected_picks = []
+        td = -1
+        for i in range(len(table) - 1, -1, -1):
+            choice = choices[i, d, t, c, x]
+            if choice == 0:
+                continue
+            selected_picks.append(i)
+            x -= all_costs[i]
+            if is_driver[i]:
+                d -= 1
+                if choice == 2:
+                    t -= 1
+                    td = i
+            else:
+                c -= 1
+        objective = float(final.max()) / 10
+        metrics = SolveMetrics(engine="dp", status="OPTIMAL", build_time=0.0, solve_time=time.perf_counter() - start,
+                               objective=objective, best_bound=objective)
+        return sorted(selected_picks), td, metrics
+
+
+ENGINES: dict[str, type[Engine]] = {
+    "cpsat": CpSatEngine,
+    "dp": DynamicProgrammingEngine,
+}
+
+
+def get_engine(engine: Union[str, Engine], options: Optional[SolverOptions] = None) -> Engine:
+    """
+    Get an engine by its name.
+    :param engine: the name of the engine, one of the keys of `ENGINES`, or an engine instance
+    :param options: parameters of the solver of a newly created engine; an engine instance keeps its own options
+    :return: the engine
+    """
+    if isinstance(engine, Engine):
+        return engine
+    try:
+        return ENGINES[engine](options)
+    except KeyError:
+        raise ValueError(f"Unknown engine `{engine}`, expected one of {', '.join(ENGINES)}.") from None
+
+
+def solve(pick_data: Union[data.PickData, data.PickTable], *, engine: Union[str, Engine] = DEFAULT_ENGINE,
+          options: Optional[SolverOptions] = None) -> data.Team:
+    """
+    Find the best team.
+    :param pick_data: object containing all information about all possible picks or a table of them
+    :param engine: the engine used to find the team, either a name from `ENGINES` or an engine instance
+    :param options: parameters of the solver if `engine` is a name
+    :return: the best team; the picks are copies, so the picks of `pick_data` are not modified
+    """
+    return solve_with_metrics(pick_data, engine=engine, options=options)[0]
+
+
+@tracing.traced("solver.solve", tracing.SOLVE)
+def solve_with_metrics(pick_data: Union[data.PickData, data.PickTable], *,
+                       engine: Union[str, Engine] = DEFAULT_ENGINE, options: Optional[SolverOptions] = None) \
+        -> tuple[data.Team, SolveMetrics]:
+    """
+    Find the best team and measure how long it took.
+    :param pick_data: object containing all information about all possible picks or a table of them
+    :param engine: the engine used to find the team, either a name from `ENGINES` or an engine instance
+    :param options: parameters of the solver if `engine` is a name
+    :return: the best team, whose picks are copies, and the measurements
+    """
+    table = data.as_pick_table(pick_data)
+    selected, td, metrics = get_engine(engine, options).solve_with_metrics(table)
+    return table.team(selected, td), metrics
+
+
+@tracing.traced("solver.solve_batch", tracing.SOLVE)
+def solve_batch(pick_data: Union[data.PickData, data.PickTable], points: np.ndarray) -> list[data.Team]:
+    """
+    Find the best team for each of many point scenarios.
+
+    All teams satisfying the budget and capacity constraints are enumerated once, independently of points, and every
+    scenario is then scored with vectorized NumPy operations.
+    :param pick_data: object containing all information about all possible picks or a table of them
+    :param points: matrix of shape (scenarios, picks) containing the points of every pick in every scenario; the columns
+        refer to the picks in the order of `pick_data.values()`
+    :return: the best team of every scenario; the picks are copies whose points are set to the points of the scenario
+    """
+    import f1fantasyoptimizer.lineups as lineups
+
+    table = data.as_pick_table(pick_data)
+    points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+    space = lineups.LineupSpace(table)
+    driver_sets, constructor_pairs, turbo_drivers, _ = space.best(points)
+    teams = []
+    for s in range(len(points)):
+        team = table.team(space.team(driver_sets[s], constructor_pairs[s]), int(turbo_drivers[s]))
+        for pick in team:
+            pick.points = float(points[s, table.rows[pick.pick_id]])
+        teams.append(team)
+    return teams
+
+
+@tracing.traced("solver.solve_top_k", tracing.SOLVE)
+def solve_top_k(pick_data: Union[data.PickData, data.PickTable], k: int, *,
+                options: Optional[SolverOptions] = None) -> list[data.Team]:
+    """
+    Find the `k` best distinct teams.
+
+    Teams are distinct if they differ in at least one pick. Each team uses its best possible turbo driver. The teams are
+    found by solving the same model repeatedly and excluding every team found from further solutions, so the model is
+    built only once.
+    :param pick_data: object containing all information about all possible picks or a table of them
+    :param k: the maximum number of teams to find
+    :param options: parameters of the solver; the time limit applies to each team, and since the order of the teams is
+        only guaranteed if every team is optimal, a team which is not proven optimal within it raises an error even if
+        `accept_feasible` is set
+    :return: up to `k` teams ordered by their total points in descending order; the picks are copies, so that the turbo
+        driver flag of each team is independent of the other teams
+    """
+    from ortools.sat.python import cp_model
+
+    table = data.as_pick_table(pick_data)
+    n_pick_data = len(table)
+
+    options = options or SolverOptions()
+    model, d_select, t_select = _build_model(table)
+    solver = cp_model.CpSolver()
+    options.apply(solver)
+
+    teams = []
+    while len(teams) < k:
+        status = solver.Solve(model)
+        if status == cp_model.INFEASIBLE:
+            # All feasible teams have been found
+            break
+        if status != cp_model.OPTIMAL:
+            raise RuntimeError(f"Model solving failed: team {len(teams) + 1} is not proven optimal, "
+                               f"{solver.StatusName(status)}!")
+        selected = [i for i in range(n_pick_data) if solver.Value(d_select[i]) == 1]
+        td = next(i for i in selected if solver.Value(t_select[i]) == 1)
+        teams.append(table.team(selected, td))
+        # Exclude the team from all further solutions
+        model.Add(sum(d_select[i] for i in selected) <= CAPACITY - 1)
+    return teams
+
+
+class SolverSession:
+    """
+    Persistent model for finding the best team repeatedly while the points of some picks change.
+
+    The model is built once. When points change, only the coefficients of the objective are updated and the previous
+    best team is passed to the solver as a hint. Solving is skipped entirely if the points of the previous best team
+    increase at least as much as the points of any other team possibly could, because then it is still the best team.
+    """
+
+    def __init__(self, pick_data: Union[data.PickData, data.PickTable], *, options: Optional[SolverOptions] = None):
+        """
+        :param pick_data: object containing all information about all possible picks or a table of them; it is copied,
+            so later changes do not affect the session
+        :param options: parameters of the solver
+        """
+        from ortools.sat.python import cp_model
+
+        self.table = data.as_pick_table(pick_data).copy()
+        with tracing.span("solver.build_model", tracing.SOLVE, picks=len(self.table)):
+            self.model = cp_model.CpModel()
+            self.d_select, self.t_select = _add_team_constraints(self.model, self.table)
+            # Every pick gets a term in the objective, even if its points are zero, so that the coefficients can be
+            # replaced in place
+            self.model.Maximize(sum(self.d_select + self.t_select))
+            self._objective = self.model.Proto().objective
+            self._objective.vars.clear()
+            self._objective.vars.extend(v.Index() for v in self.d_select + self.t_select)
+            self._objective.scaling_factor = -1. / 10  # Inverse scaling for solver logging output
+        self.options = options or SolverOptions()
+        self.solver = cp_model.CpSolver()
+        self.options.apply(self.solver)
+        # The model is tiny, so presolving it takes longer than solving it
+        self.solver.parameters.cp_model_presolve = False
+        # Multiply by 10 to convert the values to int
+        self._points = np.round(self.table.points * 10).astype(np.int64)
+        self._selected: list[int] = []
+        self._td = -1
+        # Number of calls of `update` which were answered without solving the model
+        self.skipped = 0
+        # Measurements of the last time the model was solved
+        self.metrics: Optional[SolveMetrics] = None
+        self._solve()
+
+    @tracing.traced("solver.update", tracing.SOLVE)
+    def update(self, points: dict[int, float]) -> data.Team:
+        """
+        Change the points of some picks and find the best team.
+        :param points: the new points by pick ID
+        :return: the best team; the picks are copies
+        """
+        old = self._points
+        new = old.copy()
+        for pick_id, value in points.items():
+            row = self.table.rows[pick_id]
+            self.table.points[row] = value
+            new[row] = int(round(value * 10))
+        self._points = new
+        # Solving can only be skipped if the previous team was proven optimal, not if the time limit stopped the search
+        if self.metrics is not None and self.metrics.optimal and self._is_still_optimal(old, new):
+            self.skipped += 1
+            drivers = [i for i in self._selected if self.table.is_driver[i]]
+            self._td = max(drivers, key=lambda i: new[i])
+        else:
+            self._solve()
+        return self.team
+
+    @property
+    def team(self) -> data.Team:
+        """
+        The best team for the current points; the picks are copies.
+        """
+        return self.table.team(self._selected, self._td)
+
+    def _is_still_optimal(self, old: np.ndarray, new: np.ndarray) -> bool:
+        delta = new - old
+        if not delta.any():
+            return True
+        # The points of any team increase by at most the largest increases of as many drivers and constructors as fit in
+        # a team plus the largest increase of a driver again for the turbo driver
+        gains = np.maximum(delta, 0)
+        driver_gains = np.sort(gains[self.table.is_driver])[::-1]
+        constructor_gains = np.sort(gains[self.table.is_constructor])[::-1]
+        max_gain = driver_gains[:NUMBER_OF_DRIVERS].sum() + driver_gains[:1].sum() \
+            + constructor_gains[:NUMBER_OF_CONSTRUCTORS].sum()
+        drivers = [i for i in self._selected if self.table.is_driver[i]]
+        old_score = old[self._selected].sum() + old[drivers].max()
+        new_score = new[self._selected].sum() + new[drivers].max()
+        return new_score - old_score >= max_gain
+
+    def _solve(self):
+        start = time.perf_counter()
+        with tracing.span("solver.update_model", tracing.SOLVE):
+            points = self._points.tolist()
+            # The objective is minimized internally, so maximizing negates the coefficients
+            self._objective.coeffs.clear()
+            self._objective.coeffs.extend(-p for p in points + points)
+            self.model.ClearHints()
+            for i, (d, t) in enumerate(zip(self.d_select, self.t_select)):
+                self.model.AddHint(d, i in self._selected)
+                self.model.AddHint(t, i == self._td)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with tracing.span("solver.search", tracing.SOLVE, engine="cpsat"):
+            status = self.solver.Solve(self.model)
+        solve_time = time.perf_counter() - start
+        self.options.check_status(status)
+        self._selected = [i for i in range(len(self.table)) if self.solver.Value(self.d_select[i]) == 1]
+        self._td = next(i for i in self._selected if self.solver.Value(self.t_select[i]) == 1)
+        self.metrics = SolveMetrics.from_cp_solver(self.solver, status, build_time=build_time, solve_time=solve_time)
@@ -0,0 +1,91 @@
+import concurrent.futures
+import copy
+import threading
+from typing import Callable, Hashable, TypeVar
+
+import f1fantasyoptimizer.data as data
+
+T = TypeVar("T")
+
+
+class DataStore:
+    """
+    Session-level store memoizing all downloaded data.
+
+    Every piece of data is downloaded at most once per session, even if it is requested by several threads at the same
+    time. The store is thread-safe, so it can be queried from background workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures: dict[Hashable, concurrent.futures.Future] = dict()
+
+    def seasons(self) -> list[data.Season]:
+        """
+        Get all seasons for which information is provided by the website.
+        :return: a list of all seasons
+        """
+        return self._memoize(("seasons",), data.download_seasons)
+
+    def venues(self, season: data.Season) -> data.Venues:
+        """
+        Get all venues for a given season.
+        :param season: the season for which to get the list of venues
+        :return: a dictionary consisting of all venues and their IDs for a given season
+        """
+        return self._memoize(("venues", season), lambda: data.download_venues(season))
+
+    def pick_data(self) -> data.PickData:
+        """
+        Get information about all possible picks.
+
+        Returns a copy that can be modified without affecting the stored data, e.g. by `simulator.simulate`.
+        :return: object containing all information about all possible picks
+        """
+        return copy.deepcopy(self._memoize(("pick_data",), data.download_pick_data))
+
+    def event_modes(self, *, season: data.Season, venue_id: data.Venue.Id) -> data.Modes:
+        """
+        Get the modes for a given venue in a given season.
+        :param season: the season for which to get the data
+        :param venue_id: the venue for which to get the data
+        :return: a dictionary consisting of all modes and their IDs for a given venue in a given season
+        """
+        return self._memoize(("event_modes", season, venue_id),
+                             lambda: data.download_event_modes(season=season, venue_id=venue_id))
+
+    def mode_data(self, *, season: data.Season, venue_id: data.Venue.Id, mode: data.Mode.Id) \
+            -> list[tuple[str, str]]:
+        """
+        Get the placement data for a single mode of a given venue in a given season.
+        :param season: the season for which to get the data
+        :param venue_id: the venue for which to get the data
+        :param mode: the mode for which to get placement data
+        :return: a list of the placement of a driver and their name
+        """
+        return self._memoize(("mode_data", season, venue_id, mode),
+                             lambda: data.download_mode_data(season=season, venue_id=venue_id, mode=mode))
+
+    def clear(self):
+        """
+        Forget all stored data.
+        """
+        with self._lock:
+            self._futures.clear()
+
+    def _memoize(self, key: Hashable, load: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = concurrent.futures.Future()
+                self._futures[key] = future
+        if owner:
+            try:
+                future.set_result(load())
+            except BaseException as e:
+                # Do not memoize failures, so that the next request tries again
+                with self._lock:
+                    self._futures.pop(key, None)
+                future.set_exception(e)
+        return future.result()
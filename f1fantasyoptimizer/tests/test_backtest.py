@@ -0,0 +1,78 @@
+import random
+
+import numpy as np
+import pytest
+
+import f1fantasyoptimizer.backtest as backtest
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.simulator as simulator
+import f1fantasyoptimizer.tests.utils as utils
+import f1fantasyoptimizer.warehouse as warehouse
+
+
+def get_season_data(n_rounds: int = 4) -> data.SeasonData:
+    race = data.parse_event_data(utils.load_fixture("race_result.html"))
+    qualifying = data.parse_event_data(utils.load_fixture("qualifying.html"))
+    rng = random.Random(0)
+    season_data = dict()
+    for r in range(n_rounds):
+        names = [name for _, name in race]
+        rng.shuffle(names)
+        season_data[f"{r}/venue"] = {"race-result": [(str(i + 1), name) for i, name in enumerate(names)],
+                                     "qualifying": qualifying}
+    return season_data
+
+
+def get_strategies():
+    names, td = utils.get_team_names()
+    return [backtest.Hindsight(engine="dp"), backtest.FixedTeam(names, td),
+            backtest.RecentForm(window=1, engine="dp"), backtest.RecentForm(engine="dp")]
+
+
+def test_backtest():
+    pick_data = utils.get_pick_data()
+    season_data = get_season_data()
+    result = backtest.backtest(pick_data, season_data, get_strategies(), modes=["race-result", "qualifying"],
+                               max_workers=1)
+    assert result.strategies == ["hindsight", "fixed", "form of last 1", "season form"]
+    assert result.venue_ids == list(season_data)
+    assert result.scores.shape == (4, 4)
+    # No strategy beats the best team in hindsight
+    assert np.all(result.scores[0] >= result.scores[1:] - 1e-9)
+    for s in range(4):
+        for r in range(4):
+            assert simulator.calculate_team_totals(result.teams[s][r])["points"] == pytest.approx(result.scores[s, r])
+            assert simulator.calculate_team_totals(result.teams[s][r])["cost"] <= 100
+    assert result.cumulative[:, -1] == pytest.approx(list(result.totals.values()))
+    assert len(result.to_records()) == 16
+    assert "select hindsight" in result.timings
+    assert "season form" in result.report()
+
+
+def test_backtest_in_parallel():
+    pick_data = utils.get_pick_data()
+    season_data = get_season_data()
+    sequential = backtest.backtest(pick_data, season_data, get_strategies(), max_workers=1)
+    parallel = backtest.backtest(pick_data, season_data, get_strategies(), max_workers=2)
+    assert np.array_equal(sequential.scores, parallel.scores)
+
+
+def test_event_points_skip_unknown_drivers():
+    table = utils.get_pick_data().table()
+    order = [("1", "Kimi Raikkonen"), ("2", "Max Verstappen")]
+    points = backtest.event_points(table, {"race-result": order}, ["race-result", "sprint"])
+    assert points[table.rows[131]] == 9 + 18
+    assert points[table.rows[29]] == 9 + 18
+    with pytest.raises(KeyError):
+        simulator.simulate(table, order)
+
+
+def test_load_season(monkeypatch, tmp_path):
+    monkeypatch.setattr(data, "download_venues", lambda season: {"Bahrain": "1141/bahrain"})
+    monkeypatch.setattr(data, "download_event_modes", lambda season, venue_id: {"Race Result": "race-result"})
+    monkeypatch.setattr(data, "download_mode_data",
+                        lambda season, venue_id, mode: data.parse_event_data(utils.load_fixture("race_result.html")))
+    with warehouse.ResultsWarehouse(str(tmp_path / "results.sqlite3")) as results_warehouse:
+        season_data = backtest.load_season(2023, results_warehouse=results_warehouse)
+    assert list(season_data) == ["1141/bahrain"]
+    assert len(season_data["1141/bahrain"]["race-result"]) == 20
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+import f1fantasyoptimizer.cache as cache
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.tests.utils as utils
+
+
+@pytest.fixture
+def server():
+    with utils.LocalHTTPServer() as server:
+        yield server
+
+
+def test_fetch_serves_fresh_responses_from_cache(tmp_path, server):
+    server.set("/a", b"content a")
+    response_cache = cache.ResponseCache(str(tmp_path))
+    assert response_cache.fetch(server.url("/a"), ttl=60) == b"content a"
+    assert response_cache.fetch(server.url("/a"), ttl=60) == b"content a"
+    assert server.requests["/a"] == 1
+
+
+def test_fetch_revalidates_expired_responses(tmp_path, server):
+    server.set("/a", b"content a")
+    response_cache = cache.ResponseCache(str(tmp_path))
+    assert response_cache.fetch(server.url("/a"), ttl=0) == b"content a"
+    assert response_cache.fetch(server.url("/a"), ttl=0) == b"content a"
+    assert server.requests["/a"] == 2
+    assert server.not_modified["/a"] == 1
+
+    server.set("/a", b"new content a")
+    assert response_cache.fetch(server.url("/a"), ttl=0) == b"new content a"
+    assert server.not_modified["/a"] == 1
+
+
+def test_fetch_never_expires_without_ttl(tmp_path, server):
+    server.set("/a", b"content a")
+    response_cache = cache.ResponseCache(str(tmp_path))
+    response_cache.fetch(server.url("/a"), ttl=None)
+    server.set("/a", b"new content a")
+    assert response_cache.fetch(server.url("/a"), ttl=None) == b"content a"
+    assert server.requests["/a"] == 1
+
+
+def test_cache_is_persistent(tmp_path, server):
+    server.set("/a", b"content a")
+    cache.ResponseCache(str(tmp_path)).fetch(server.url("/a"), ttl=60)
+    response_cache = cache.ResponseCache(str(tmp_path))
+    assert server.url("/a") in response_cache
+    assert response_cache.fetch(server.url("/a"), ttl=60) == b"content a"
+    assert server.requests["/a"] == 1
+
+
+def test_cache_hits_write_the_index_on_flush(tmp_path, server):
+    server.set("/a", b"content a")
+    with cache.ResponseCache(str(tmp_path)) as response_cache:
+        response_cache.fetch(server.url("/a"), ttl=60)
+        index_path = tmp_path / cache.ResponseCache.INDEX_FILE
+        index = index_path.read_bytes()
+        response_cache.fetch(server.url("/a"), ttl=60)
+        assert index_path.read_bytes() == index
+    accessed_at = {entry["accessed_at"] for entry in json.loads(index_path.read_bytes()).values()}
+    assert accessed_at == {response_cache._entries[response_cache.key(server.url("/a"))].accessed_at}
+    assert index_path.read_bytes() != index
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, server):
+    for path in ("/a", "/b", "/c"):
+        server.set(path, b"x" * 10)
+    response_cache = cache.ResponseCache(str(tmp_path), max_size=25)
+    response_cache.fetch(server.url("/a"), ttl=60)
+    response_cache.fetch(server.url("/b"), ttl=60)
+    response_cache.fetch(server.url("/a"), ttl=60)  # /b is now the least recently used entry
+    response_cache.fetch(server.url("/c"), ttl=60)
+    assert server.url("/a") in response_cache
+    assert server.url("/b") not in response_cache
+    assert server.url("/c") in response_cache
+    assert response_cache.size == 20
+
+
+def test_offline_mode(tmp_path, server):
+    server.set("/a", b"content a")
+    cache.ResponseCache(str(tmp_path)).fetch(server.url("/a"), ttl=60)
+    response_cache = cache.ResponseCache(str(tmp_path), offline=True)
+    assert response_cache.fetch(server.url("/a"), ttl=0) == b"content a"
+    with pytest.raises(cache.CacheMissError):
+        response_cache.fetch(server.url("/b"), ttl=0)
+    with pytest.raises(OSError):
+        response_cache.fetch(server.url("/b"), ttl=0)
+    assert server.requests["/a"] == 1
+    assert "/b" not in server.requests
+
+
+def test_stale_response_is_served_if_network_fails(tmp_path, server):
+    server.set("/a", b"content a")
+    url = server.url("/a")
+    response_cache = cache.ResponseCache(str(tmp_path))
+    response_cache.fetch(url, ttl=0)
+    server.close()
+    assert response_cache.fetch(url, ttl=0) == b"content a"
+
+
+def test_download_pick_data_uses_cache(tmp_path, server, monkeypatch):
+    feed = {"Data": {"Value": [{"PlayerId": "131", "PositionName": "Driver", "FUllName": "Max Verstappen",
+                                "OverallPpints": "96", "Value": "26.9", "TeamId": "29"}]}}
+    server.set("/feed.json", json.dumps(feed).encode())
+    monkeypatch.setattr(data, "PICK_DATA_URL", server.url("/feed.json"))
+    monkeypatch.setattr(data, "_response_cache", cache.ResponseCache(str(tmp_path)))
+    monkeypatch.setattr(data, "_response_cache_configured", True)
+    assert data.download_pick_data()[131].name == "Max Verstappen"
+    assert data.download_pick_data()[131].points == 96.0
+    assert server.requests["/feed.json"] == 1
@@ -0,0 +1,175 @@
+import collections
+import io
+import json
+
+import pytest
+
+import f1fantasyoptimizer.cache as cache
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.tests.utils as utils
+import f1fantasyoptimizer.tracing as tracing
+import f1fantasyoptimizer.ui.cli as cli
+
+VENUES = {"Bahrain": "1141/bahrain", "Saudi Arabia": "1142/saudi-arabia"}
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = collections.Counter()
+    results = {"race-result": data.parse_event_data(utils.load_fixture("race_result.html")),
+               "qualifying": data.parse_event_data(utils.load_fixture("qualifying.html"))}
+
+    def download_pick_data():
+        calls["pick_data"] += 1
+        return utils.get_pick_data()
+
+    def download_venues(season):
+        calls["venues"] += 1
+        return VENUES
+
+    def download_mode_data(*, season, venue_id, mode):
+        calls[(venue_id, mode)] += 1
+        return results[mode]
+
+    monkeypatch.setattr(data, "download_pick_data", download_pick_data)
+    monkeypatch.setattr(data, "download_venues", download_venues)
+    monkeypatch.setattr(data, "download_mode_data", download_mode_data)
+    return calls
+
+
+def run(capsys, argv):
+    cli.main(argv)
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def test_solve(calls, capsys):
+    result, = run(capsys, ["solve", "--season", "2023", "--venue", "bahrain", "--modes", "race-result",
+                           "--engine", "dp"])
+    assert result["venue_id"] == "1141/bahrain"
+    assert len(result["team"]["picks"]) == 7
+    assert result["team"]["cost"] <= 100
+    assert result["metrics"]["engine"] == "dp"
+
+
+def test_simulate_and_evaluate(calls, capsys):
+    result, = run(capsys, ["simulate", "--season", "2023", "--venue", "1141/bahrain", "--modes", "qualifying",
+                           "race-result"])
+    assert result["picks"][0] == {"pick_id": 29, "type": "constructor", "name": "Red Bull Racing",
+                                  "points": 2 * (10 + 25 + 9 + 18), "cost": 27.2, "td": False}
+    names, td = utils.get_team_names()
+    result, = run(capsys, ["evaluate", "--season", "2023", "--venue", "Bahrain", "--team", *names, "--td", td])
+    assert result["team"]["points"] == 96.0 * 2 + 62.0 + 64.0 + 3.0 + 21.0 + 173.0 + 75.0
+
+
+def test_batch_shares_downloads_and_reports_errors(calls, capsys, tmp_path):
+    names, td = utils.get_team_names()
+    jobs = [{"command": "solve", "season": 2023, "venue": "Bahrain", "modes": ["qualifying"]},
+            {"command": "solve", "season": 2023, "venue": "Saudi Arabia", "modes": ["qualifying"]},
+            {"command": "evaluate", "season": 2023, "venue": "Bahrain", "modes": ["qualifying"], "team": names,
+             "td": td},
+            {"command": "solve", "season": 2023, "venue": "Monaco"},
+            {"command": "backtest", "season": 2023, "modes": ["race-result"], "team": names, "td": td}]
+    path = tmp_path / "jobs.jsonl"
+    path.write_text("\n".join(json.dumps(job) for job in jobs))
+    with pytest.raises(SystemExit) as e:
+        cli.main(["batch", str(path)])
+    assert e.value.code == 1
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [result["job"] for result in results] == [0, 1, 2, 3, 4, 4]
+    assert "Unknown venue `Monaco`" in results[3]["error"]
+    assert results[0]["team"] == results[1]["team"]
+    assert results[5]["best_total"] == 2 * results[4]["best_total"]
+    assert results[5]["team_total"] >= results[4]["team"]["points"]
+    assert calls["pick_data"] == 1
+    assert calls["venues"] == 1
+    assert calls[("1141/bahrain", "qualifying")] == 1
+
+
+def test_offline_cache_misses_fail_only_their_job(monkeypatch, capsys, tmp_path):
+    monkeypatch.setattr(data, "download_pick_data", utils.get_pick_data)
+    monkeypatch.setattr(data, "download_venues", lambda season: VENUES)
+    monkeypatch.setattr(data, "_response_cache", cache.ResponseCache(str(tmp_path / "cache"), offline=True))
+    monkeypatch.setattr(data, "_response_cache_configured", True)
+    jobs = [{"command": "simulate", "season": 2023, "venue": "Bahrain"},
+            {"command": "simulate", "season": 2023, "venue": "Bahrain", "modes": ["race-result"]},
+            {"command": "simulate", "season": 2023, "venue": "Saudi Arabia"}]
+    path = tmp_path / "jobs.jsonl"
+    path.write_text("\n".join(json.dumps(job) for job in jobs))
+    with pytest.raises(SystemExit) as e:
+        cli.main(["batch", str(path)])
+    assert e.value.code == 1
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [result["job"] for result in results] == [0, 1, 2]
+    assert "offline mode" in results[1]["error"]
+    assert "picks" in results[0] and "picks" in results[2]
+    with pytest.raises(SystemExit) as e:
+        cli.main(["solve", "--season", "2023", "--venue", "Bahrain", "--modes", "race-result", "--engine", "dp"])
+    assert e.value.code == 1
+    assert "offline mode" in json.loads(capsys.readouterr().out)["error"]
+
+
+def test_solver_session_is_reused(calls):
+    runner = cli.Runner()
+    pick_data = runner.pick_data(2023, "1141/bahrain", ["qualifying"])
+    team, metrics = runner.solve(pick_data)
+    assert metrics is not None
+    same_team, metrics = runner.solve(pick_data)
+    assert metrics is None
+    assert [pick.pick_id for pick in same_team] == [pick.pick_id for pick in team]
+
+
+def test_invalid_jobs():
+    with pytest.raises(ValueError, match="line 2"):
+        cli.read_jobs(io.StringIO('{"command": "solve", "season": 2023, "venue": "Bahrain"}\n{"command": "fly"}\n'))
+    with pytest.raises(ValueError):
+        cli.Job.from_dict({"command": "evaluate", "season": 2023, "venue": "Bahrain"})
+
+
+def test_invalid_team_files(calls, capsys, tmp_path):
+    arguments = ["evaluate", "--season", "2023", "--venue", "Bahrain"]
+    path = tmp_path / "team.json"
+    path.write_text(json.dumps({"picks": ["Max Verstappen"]}))
+    for team_file in (str(path), str(tmp_path / "missing.json")):
+        with pytest.raises(SystemExit):
+            cli.main(arguments + ["--team-file", team_file])
+    path.write_text("{")
+    with pytest.raises(SystemExit):
+        cli.main(arguments + ["--team-file", str(path)])
+    assert "Invalid team file" in capsys.readouterr().err
+    names, td = utils.get_team_names()
+    path.write_text(json.dumps({"picks": names, "td": td}))
+    with pytest.raises(SystemExit):
+        cli.main(arguments + ["--team-file", str(path), "--td", td])
+    assert "cannot be combined" in capsys.readouterr().err
+
+
+def test_sensitivity(calls, capsys):
+    result, = run(capsys, ["sensitivity", "--season", "2023", "--venue", "Bahrain"])
+    assert len(result["team"]["picks"]) == 7
+    picks = {pick["name"]: pick for pick in result["picks"]}
+    assert picks["Max Verstappen"]["td"]
+    assert picks["Max Verstappen"]["points_upper"] is None
+    assert picks["Logan Sargeant"]["points_lower"] is None
+
+
+def test_trace_file(calls, capsys, tmp_path):
+    path = tmp_path / "trace.json"
+    run(capsys, ["solve", "--season", "2023", "--venue", "bahrain", "--modes", "race-result", "--engine", "cpsat",
+                 "--trace-file", str(path)])
+    with open(path) as f:
+        names = {event["name"] for event in json.load(f)["traceEvents"]}
+    assert {"cli.run", "simulator.score", "solver.build_model", "solver.search"} <= names
+    cli.main(["simulate", "--season", "2023", "--venue", "bahrain", "--modes", "race-result", "--trace"])
+    assert "simulator.score" in capsys.readouterr().err
+
+
+def test_run_span_ends_with_the_computation(calls):
+    tracer = tracing.enable()
+    try:
+        results = cli.Runner(engine="dp").run(cli.Job.from_dict({"command": "simulate", "season": 2023,
+                                                                  "venue": "bahrain"}))
+        next(results)
+        # The span is recorded before the consumer asks for the end of the results
+        assert [span.name for span in tracer.spans].count("cli.run") == 1
+    finally:
+        tracing.disable()
@@ -1,5 +1,9 @@
+import copy
+
+import numpy as np
 import pytest
 import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.simulator as simulator
 import f1fantasyoptimizer.tests.utils as utils
 
 
@@ -41,3 +45,121 @@ def test_to_float():
     assert data.to_float("131.1", default=3.3) == 131.1
     assert data.to_float("", default=3.3) == 3.3
     assert data.to_float("") == 0.0
+
+
+def test_find_pick_by_name_matches_other_spellings():
+    pick_data = utils.get_pick_data()
+    assert data.find_pick_by_name(pick_data, "Guanyu Zhou") == 134
+    assert data.find_pick_by_name(pick_data, "nico hülkenberg") == 111
+    assert data.find_pick_by_name(pick_data, "Alex Albon") == 11
+    assert data.find_pick_by_name(dict(pick_data), "Guanyu Zhou") == 134
+    assert data.find_pick_by_name(pick_data, "Michael Schumacher") is None
+
+
+def test_pick_data_aliases_and_indexes():
+    pick_data = utils.get_pick_data()
+    pick_data.add_alias("Checo", 121)
+    assert pick_data.find("Checo") == 121
+    assert {pick.pick_id for pick in pick_data.by_team(29)} == {29, 131, 121}
+    assert len(pick_data.by_type(data.Pick.PickType.CONSTRUCTOR)) == 10
+    assert len(pick_data.by_type(data.Pick.PickType.DRIVER)) == 20
+
+
+def test_pick_data_indexes_follow_changes():
+    pick_data = utils.get_pick_data()
+    assert pick_data.find("Daniel Ricciardo") is None
+    pick_data[3] = data.Pick(3, data.Pick.PickType.DRIVER, "Daniel Ricciardo", 0.0, 7.5, 22)
+    assert pick_data.find("Daniel Ricciardo") == 3
+    assert len(pick_data.by_team(22)) == 4
+    del pick_data[3]
+    assert pick_data.find("Daniel Ricciardo") is None
+    copied = copy.deepcopy(pick_data)
+    assert isinstance(copied, data.PickData)
+    assert copied.find("Guanyu Zhou") == 134
+    assert copied[134] is not pick_data[134]
+
+
+def test_simulate_parsed_results():
+    pick_data = utils.get_pick_data()
+    data.reset_points(pick_data)
+    simulator.simulate(pick_data, data.parse_event_data(utils.load_fixture("race_result.html")))
+    assert pick_data[134].points == 0 + 0
+    assert pick_data[131].points == 10 + 25
+    assert pick_data[29].points == (10 + 25) + (9 + 18)
+
+
+def test_parse_event_data():
+    content = utils.load_fixture("race_result.html")
+    order = data.parse_event_data(content)
+    assert len(order) == 20
+    assert order[0] == ("1", "Max Verstappen")
+    assert order[-1] == ("NC", "Oscar Piastri")
+    # The whole page is parsed if the results table cannot be located in the markup
+    content = content.replace(b'<table class="resultsarchive-table">',
+                              b'<table id="results" class="resultsarchive-table">')
+    assert data.parse_event_data(content) == order
+
+
+def test_parse_synthetic_pages():
+    pick_data = utils.get_synthetic_pick_data(300)
+    order = utils.get_random_order(pick_data, 0)
+    assert len(order) == 200
+    assert data.parse_event_data(utils.render_results_page(order)) == order
+    parsed = data.parse_pick_data(utils.render_pick_feed(pick_data))
+    assert [(p.pick_id, p.pick_type, p.name, p.points, p.cost, p.team_id) for p in parsed.values()] == \
+           [(p.pick_id, p.pick_type, p.name, p.points, p.cost, p.team_id) for p in pick_data.values()]
+    assert data.parse_venues(utils.load_fixture("races.html"))
+
+
+def test_pick_table():
+    pick_data = utils.get_pick_data()
+    table = pick_data.table()
+    assert len(table) == len(pick_data)
+    assert table.pick_ids.tolist() == list(pick_data.keys())
+    assert table.find("Guanyu Zhou") == table.rows[134]
+    assert table.constructor_rows[table.rows[131]] == table.rows[29]
+    assert table.is_driver.sum() == 20
+    pick = table.pick(table.rows[131], td=True)
+    assert (pick.name, pick.points, pick.cost, pick.team_id, pick.td) == ("Max Verstappen", 96.0, 26.9, 29, True)
+    copied = table.to_pick_data()
+    assert {pick_id: str(pick) for pick_id, pick in copied.items()} == \
+        {pick_id: str(pick) for pick_id, pick in pick_data.items()}
+
+
+def test_simulate_table():
+    order = data.parse_event_data(utils.load_fixture("race_result.html"))
+    pick_data = utils.get_pick_data()
+    table = pick_data.table()
+    simulator.simulate(pick_data, order)
+    simulator.simulate(table, order)
+    assert table.points.tolist() == [pick.points for pick in pick_data.values()]
+
+
+def test_score_does_not_change_table():
+    order = data.parse_event_data(utils.load_fixture("race_result.html"))
+    pick_data = utils.get_pick_data()
+    table = pick_data.table()
+    points = table.points.copy()
+    scored = simulator.score(table, order)
+    assert np.array_equal(table.points, points)
+    data.reset_points(pick_data)
+    simulator.simulate(pick_data, order)
+    assert scored.tolist() == [pick.points for pick in pick_data.values()]
+
+
+def test_order_scorer_is_updated_incrementally():
+    order = data.parse_event_data(utils.load_fixture("race_result.html"))
+    table = utils.get_pick_data().table()
+    scorer = simulator.OrderScorer.from_order(table, order)
+    rng = np.random.default_rng(0)
+    rows = list(scorer.rows)
+    for _ in range(50):
+        i, j = rng.choice(len(rows), size=2, replace=False)
+        scorer.swap(i, j)
+        rows[i], rows[j] = rows[j], rows[i]
+    positions = [0, 3, 7]
+    scorer.reorder(positions, [rows[7], rows[0], rows[3]])
+    rows[0], rows[3], rows[7] = rows[7], rows[0], rows[3]
+    assert scorer.points == pytest.approx(simulator.OrderScorer(table, rows).points)
+    with pytest.raises(ValueError):
+        scorer.reorder([0], [rows[1]])
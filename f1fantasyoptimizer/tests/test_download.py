@@ -0,0 +1,103 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.tracing as tracing
+import f1fantasyoptimizer.transport as transport
+import f1fantasyoptimizer.tests.utils as utils
+
+VENUE_IDS = ["1141/bahrain", "1142/saudi-arabia", "1143/australia", "1207/azerbaijan", "1208/miami"]
+
+
+@pytest.fixture
+def server(monkeypatch):
+    with utils.LocalHTTPServer() as server:
+        monkeypatch.setattr(data, "EVENT_DATA_URL", server.url("/{year}/races/{event_link}/{mode}.html"))
+        monkeypatch.setattr(data, "EVENTS_OVERVIEW_DATA_URL", server.url("/{year}/races.html"))
+        monkeypatch.setattr(data, "DOWNLOAD_BACKOFF", 0.0)
+        monkeypatch.setattr(data, "_response_cache", None)
+        monkeypatch.setattr(data, "_response_cache_configured", True)
+        server.set("/2023/races.html", utils.load_fixture("races.html"))
+        for venue_id in VENUE_IDS:
+            server.set(f"/2023/races/{venue_id}/race.html", utils.load_fixture("race_result.html"))
+            server.set(f"/2023/races/{venue_id}/race-result.html", utils.load_fixture("race_result.html"))
+            server.set(f"/2023/races/{venue_id}/qualifying.html", utils.load_fixture("qualifying.html"))
+        yield server
+
+
+def test_download_event_data(server):
+    event_data = data.download_event_data(season=2023, venue_id=VENUE_IDS[0], modes=["race-result", "qualifying"],
+                                          max_workers=2)
+    assert list(event_data) == ["race-result", "qualifying"]
+    assert event_data["race-result"][0] == ("1", "Max Verstappen")
+    assert event_data["race-result"][-1] == ("NC", "Oscar Piastri")
+    assert event_data["qualifying"][2] == ("3", "Charles Leclerc")
+    assert len(event_data["qualifying"]) == 20
+
+
+
+def test_download_spans(server):
+    tracer = tracing.enable()
+    try:
+        data.download_event_data(season=2023, venue_id=VENUE_IDS[0], modes=["race-result", "qualifying"],
+                                 max_workers=2)
+    finally:
+        tracing.disable()
+    assert tracer.spans[-1].name == "data.download_event_data"
+    downloads = [span for span in tracer.spans if span.name == "data.download_mode_data"]
+    assert len(downloads) == 2
+    # Every download is split into the time of the request and the time of parsing, which run on its thread
+    for download in downloads:
+        nested = [(span.name, span.category) for span in tracer.spans if span.thread_id == download.thread_id
+                  and download.start <= span.start and span.start + span.duration <= download.start + download.duration
+                  and span is not download]
+        assert nested == [("data.fetch", tracing.NETWORK), ("data.parse_event_data", tracing.PARSE)]
+
+
+def test_download_season_results(server):
+    season_data = data.download_season_results(2023, modes=["race-result", "qualifying"], max_workers=4)
+    assert list(season_data) == VENUE_IDS
+    for venue_id in VENUE_IDS:
+        assert set(season_data[venue_id]) == {"race-result", "qualifying"}
+        assert season_data[venue_id]["race-result"][1] == ("2", "Sergio Perez")
+
+
+def test_downloads_reuse_the_connections_of_earlier_calls(server):
+    data.download_season_results(2023, modes=["race-result"], max_workers=2)
+    connections = len(server.connections)
+    assert connections <= 3
+    data.download_season_results(2023, modes=["qualifying"], max_workers=2)
+    data.download_event_data(season=2023, venue_id=VENUE_IDS[0], modes=["race", "qualifying"], max_workers=2)
+    assert len(server.connections) == connections
+
+
+def test_download_season_results_retries_failed_downloads(server):
+    path = f"/2023/races/{VENUE_IDS[2]}/qualifying.html"
+    server.fail(path, 503, 502)
+    season_data = data.download_season_results(2023, modes=["qualifying"], retries=2)
+    assert season_data[VENUE_IDS[2]]["qualifying"][0] == ("1", "Max Verstappen")
+    assert server.requests[path] == 3
+
+
+def test_download_gives_up_after_retries(server):
+    server.fail(f"/2023/races/{VENUE_IDS[0]}/qualifying.html", 503, 503)
+    with pytest.raises(urllib.error.HTTPError):
+        data.download_mode_data(season=2023, venue_id=VENUE_IDS[0], mode="qualifying", retries=1)
+
+
+def test_download_does_not_retry_client_errors(server):
+    with pytest.raises(urllib.error.HTTPError):
+        data.download_mode_data(season=2023, venue_id=VENUE_IDS[0], mode="unknown", retries=3)
+    assert server.requests[f"/2023/races/{VENUE_IDS[0]}/unknown.html"] == 1
+
+
+def test_keep_alive_opener_reuses_connections(server):
+    opener = transport.KeepAliveOpener()
+    for venue_id in VENUE_IDS:
+        with opener(urllib.request.Request(server.url(f"/2023/races/{venue_id}/qualifying.html"))) as response:
+            assert response.status == 200
+            assert response.read() == utils.load_fixture("qualifying.html")
+    opener.close()
+    assert len(server.connections) == 1
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+import f1fantasyoptimizer.frontier as frontier
+import f1fantasyoptimizer.simulator as simulator
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tests.utils as utils
+
+
+def test_frontier_matches_solver():
+    table = utils.get_pick_data().table()
+    pareto = frontier.pareto_frontier(table, max_budget=110)
+    assert np.all(np.diff(pareto.costs) > 0)
+    assert np.all(np.diff(pareto.points) > 0)
+    for budget in (60, 85.5, 100, 104.7, 110):
+        team = pareto.best(budget)
+        totals = simulator.calculate_team_totals(team)
+        rows, td = solver.DynamicProgrammingEngine(budget=budget).solve(table)
+        assert totals["points"] == pytest.approx(table.points[rows].sum() + table.points[td])
+        assert totals["cost"] <= budget + 1e-9
+        assert len(team) == solver.CAPACITY
+    with pytest.raises(RuntimeError):
+        pareto.best(10)
+
+
+def test_budget_sweep():
+    pick_data = utils.get_pick_data()
+    sweep = frontier.budget_sweep(pick_data)
+    assert len(sweep) == 201
+    assert list(sweep)[:2] == [90, 90.1]
+    points = [simulator.calculate_team_totals(team)["points"] for team in sweep.values()]
+    assert points == sorted(points)
+    assert points[100] == simulator.calculate_team_totals(solver.solve(pick_data, engine="dp"))["points"]
+    assert frontier.budget_sweep(pick_data, [5]) == {5: None}
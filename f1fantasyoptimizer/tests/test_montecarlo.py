@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.montecarlo as montecarlo
+import f1fantasyoptimizer.simulator as simulator
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tests.utils as utils
+
+
+def get_order():
+    drivers = [p.name for p in utils.get_pick_data().values() if p.pick_type == data.Pick.PickType.DRIVER]
+    return [(str(i + 1), name) for i, name in enumerate(drivers)]
+
+
+def test_deterministic_distribution_matches_simulate():
+    pick_data = utils.get_pick_data()
+    order = get_order()
+    result = montecarlo.simulate(pick_data, montecarlo.PositionDistribution.from_order(order), 100, seed=0,
+                                 max_workers=1)
+    data.reset_points(pick_data)
+    simulator.simulate(pick_data, order)
+    assert result.mean == pytest.approx([pick.points for pick in pick_data.values()])
+    assert result.variance == pytest.approx(np.zeros(len(pick_data)))
+
+
+def test_results_are_reproducible_across_processes():
+    pick_data = utils.get_pick_data()
+    distribution = montecarlo.PositionDistribution([name for _, name in get_order()], np.ones((20, 20)),
+                                                   dnf=np.full(20, 0.1), dq=np.full(20, 0.01))
+    single = montecarlo.simulate(pick_data, distribution, 2000, seed=42, chunk_size=500, max_workers=1,
+                                 keep_samples=True)
+    parallel = montecarlo.simulate(pick_data, distribution, 2000, seed=42, chunk_size=500, max_workers=2,
+                                   keep_samples=True)
+    assert np.array_equal(single.samples, parallel.samples)
+    assert single.mean == pytest.approx(parallel.mean)
+    assert single.samples.shape == (2000, len(pick_data))
+    assert np.all(single.variance > 0)
+
+
+def test_dnf_scores_race_penalty():
+    pick_data = utils.get_pick_data()
+    order = get_order()
+    distribution = montecarlo.PositionDistribution([name for _, name in order], np.eye(len(order)),
+                                                   dnf=np.ones(len(order)))
+    result = montecarlo.simulate(pick_data, distribution, 10, seed=0, max_workers=1)
+    verstappen = result.pick_ids.index(131)
+    # Qualifying points are awarded in the sampled order, which is kept for drivers who all did not finish
+    assert result.mean[verstappen] == simulator.QUALIFYING_POINTS[0] + simulator.RACE_POINTS["DNF"]
+
+
+def test_from_results():
+    orders = [[("1", "Max Verstappen"), ("2", "Sergio Perez"), ("NC", "Lewis Hamilton")],
+              [("1", "Sergio Perez"), ("2", "Max Verstappen"), ("DQ", "Lewis Hamilton")]]
+    distribution = montecarlo.PositionDistribution.from_results(orders, smoothing=0)
+    assert distribution.drivers == ["Max Verstappen", "Sergio Perez", "Lewis Hamilton"]
+    assert distribution.positions[0] == pytest.approx([0.5, 0.5, 0])
+    assert distribution.dnf == pytest.approx([0, 0, 0.5])
+    assert distribution.dq == pytest.approx([0, 0, 0.5])
+
+
+def test_expected_points_feed_solver():
+    pick_data = utils.get_pick_data()
+    distribution = montecarlo.PositionDistribution.from_order(get_order())
+    result = montecarlo.simulate(pick_data, distribution, 10, seed=0, max_workers=1)
+    expected = result.expected_pick_data(pick_data)
+    assert pick_data[131].points == 96.0
+    team = solver.solve(expected, engine="dp")
+    assert len(team) == solver.CAPACITY
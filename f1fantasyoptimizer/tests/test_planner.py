@@ -0,0 +1,92 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import f1fantasyoptimizer.planner as planner
+import f1fantasyoptimizer.simulator as simulator
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tests.utils as utils
+from f1fantasyoptimizer.data import Pick
+
+
+def all_pick_sets(pick_data, costs):
+    picks = list(pick_data.values())
+    drivers = [i for i, p in enumerate(picks) if p.pick_type == Pick.PickType.DRIVER]
+    constructors = [i for i, p in enumerate(picks) if p.pick_type == Pick.PickType.CONSTRUCTOR]
+    for driver_set in itertools.combinations(drivers, solver.NUMBER_OF_DRIVERS):
+        for pair in itertools.combinations(constructors, solver.NUMBER_OF_CONSTRUCTORS):
+            rows = driver_set + pair
+            if round(sum(costs[i] for i in rows) * 10) <= solver.BUDGET * 10:
+                yield frozenset(rows), driver_set
+
+
+def brute_force(pick_data, points, costs, initial, free_transfers, penalty):
+    # Best total points of two rounds with `max_banked` = 1
+    round_scores = []
+    for r in range(2):
+        scores = dict()
+        for rows, driver_set in all_pick_sets(pick_data, costs[r]):
+            scores[rows] = sum(points[r, i] for i in rows) + max(points[r, i] for i in driver_set)
+        round_scores.append(scores)
+    best = -np.inf
+    for first, first_score in round_scores[0].items():
+        n_in = len(first - initial)
+        banked = min(1, max(0, free_transfers - n_in))
+        first_total = first_score - penalty * max(0, n_in - free_transfers)
+        for second, second_score in round_scores[1].items():
+            n_in = len(second - first)
+            total = first_total + second_score - penalty * max(0, n_in - free_transfers - banked)
+            best = max(best, total)
+    return best
+
+
+def test_plan_single_round():
+    pick_data = utils.get_pick_data()
+    points = np.array([[pick.points for pick in pick_data.values()]])
+    result = planner.plan(pick_data, points)
+    assert len(result) == 1
+    assert result.points == simulator.calculate_team_totals(solver.solve(pick_data))["points"]
+    assert result.transfers_in == [[]]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_plan_two_rounds(seed):
+    pick_data = utils.get_random_pick_data(seed, n_drivers=8, n_constructors=4)
+    rng = np.random.default_rng(seed)
+    points = np.round(rng.normal(20, 25, size=(2, len(pick_data))))
+    costs = np.array([[pick.cost for pick in pick_data.values()]] * 2)
+    costs[1] = np.round(costs[1] + rng.normal(0, 1, size=len(pick_data)), 1)
+    table = pick_data.table()
+    initial_rows, _ = next(all_pick_sets(pick_data, costs[0]))
+    initial = [int(table.pick_ids[i]) for i in initial_rows]
+    result = planner.plan(pick_data, points, costs=costs, initial_team=initial, free_transfers=1, penalty=10)
+    expected = brute_force(pick_data, points, costs, initial_rows, 1, 10)
+    assert result.points == pytest.approx(expected)
+    for team, round_costs in zip(result.teams, costs):
+        assert len(team) == solver.CAPACITY
+        assert sum(round_costs[table.rows[pick.pick_id]] for pick in team) <= solver.BUDGET + 1e-9
+
+
+def test_plan_without_transfers_keeps_team():
+    pick_data = utils.get_pick_data()
+    rng = np.random.default_rng(0)
+    points = np.round(rng.normal(20, 30, size=(4, len(pick_data))))
+    initial = [pick.pick_id for pick in solver.solve(pick_data)]
+    result = planner.plan(pick_data, points, initial_team=initial, free_transfers=0, max_banked=0, penalty=1000)
+    for team in result.teams:
+        assert {pick.pick_id for pick in team} == set(initial)
+    assert result.penalized_transfers == [0, 0, 0, 0]
+
+
+def test_plan_rolling():
+    pick_data = utils.get_pick_data()
+    rng = np.random.default_rng(1)
+    points = np.round(rng.normal(20, 30, size=(4, len(pick_data))))
+    initial = [pick.pick_id for pick in solver.solve(pick_data)]
+    full = planner.plan(pick_data, points, initial_team=initial)
+    rolling = planner.plan_rolling(pick_data, points, initial_team=initial, horizon=4)
+    assert rolling.points == pytest.approx(full.points)
+    myopic = planner.plan_rolling(pick_data, points, initial_team=initial, horizon=1)
+    assert len(myopic) == 4
+    assert myopic.points <= full.points + 1e-9
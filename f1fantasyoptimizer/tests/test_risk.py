@@ -0,0 +1,69 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import f1fantasyoptimizer.risk as risk
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tests.utils as utils
+from f1fantasyoptimizer.data import Pick
+
+
+def all_teams(pick_data):
+    drivers = [p for p in pick_data.values() if p.pick_type == Pick.PickType.DRIVER]
+    constructors = [p for p in pick_data.values() if p.pick_type == Pick.PickType.CONSTRUCTOR]
+    for driver_set in itertools.combinations(drivers, solver.NUMBER_OF_DRIVERS):
+        for pair in itertools.combinations(constructors, solver.NUMBER_OF_CONSTRUCTORS):
+            if round(sum(p.cost for p in driver_set + pair) * 10) > solver.BUDGET * 10:
+                continue
+            for td in driver_set:
+                team = []
+                for p in driver_set + pair:
+                    p = Pick(p.pick_id, p.pick_type, p.name, p.points, p.cost, p.team_id, td=p is td)
+                    team.append(p)
+                yield team
+
+
+def get_problem(seed):
+    pick_data = utils.get_random_pick_data(seed, n_drivers=8, n_constructors=4)
+    samples = np.round(np.random.default_rng(seed).normal(20, 25, size=(60, len(pick_data))))
+    return pick_data, samples
+
+
+def best_value(pick_data, samples, objective):
+    return max(objective(risk.team_scores(pick_data, team, samples)) for team in all_teams(pick_data))
+
+
+def test_measures():
+    scores = np.array([5.0, 1.0, 3.0, 2.0, 4.0])
+    assert risk.cvar(scores, 0.4) == 1.5
+    assert risk.cvar(scores, 1.0) == 3.0
+    assert risk.value_at_risk(scores, 0.0) == 1.0
+    assert risk.value_at_risk(scores, 0.4) == 3.0
+    assert risk.beat_probability(scores, np.full(5, 3.0)) == 0.4
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_solve_cvar(seed):
+    pick_data, samples = get_problem(seed)
+    team = risk.solve_cvar(pick_data, samples, alpha=0.2)
+    expected = best_value(pick_data, samples, lambda s: risk.cvar(s, 0.2))
+    assert risk.cvar(risk.team_scores(pick_data, team, samples), 0.2) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_solve_value_at_risk(seed):
+    pick_data, samples = get_problem(seed)
+    team = risk.solve_value_at_risk(pick_data, samples, q=0.25)
+    expected = best_value(pick_data, samples, lambda s: risk.value_at_risk(s, 0.25))
+    assert risk.value_at_risk(risk.team_scores(pick_data, team, samples), 0.25) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_solve_beat_rival(seed):
+    pick_data, samples = get_problem(seed)
+    rival = solver.solve(pick_data, engine="dp")
+    rival_scores = risk.team_scores(pick_data, rival, samples)
+    team = risk.solve_beat_rival(pick_data, samples, rival)
+    expected = best_value(pick_data, samples, lambda s: risk.beat_probability(s, rival_scores))
+    assert risk.beat_probability(risk.team_scores(pick_data, team, samples), rival_scores) == pytest.approx(expected)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+import f1fantasyoptimizer.backtest as backtest
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.rules as rules
+import f1fantasyoptimizer.simulator as simulator
+import f1fantasyoptimizer.tests.utils as utils
+
+
+def get_results():
+    return (data.parse_event_data(utils.load_fixture("race_result.html")),
+            data.parse_event_data(utils.load_fixture("qualifying.html")))
+
+
+def test_legacy_rules_match_simulator():
+    table = utils.get_pick_data().table()
+    race, qualifying = get_results()
+    season_data = {"1/a": {"race-result": race, "qualifying": qualifying}, "2/b": {"race-result": qualifying}}
+    points = rules.score_season(table, season_data, rules.LEGACY_RULES)
+    assert points == pytest.approx(np.vstack([simulator.score(table, race) + simulator.score(table, qualifying),
+                                              simulator.score(table, qualifying)]))
+
+
+def test_season_rules():
+    table = utils.get_pick_data().table()
+    race, qualifying = get_results()
+    season_data = {"1/a": {"race-result": race, "qualifying": qualifying, "starting-grid": qualifying}}
+    points = rules.score_season(table, season_data, rules.for_season(2023), modes=["race-result", "qualifying"])
+    assert points.shape == (1, len(table))
+    # Pole position and the win
+    assert points[0, table.find("Max Verstappen")] == 10 + 25
+    # Not classified in the race after starting ninth
+    assert points[0, table.find("Esteban Ocon")] == 2 - 20
+    # Tenth after starting 19th
+    assert points[0, table.find("Pierre Gasly")] == 2 + 10
+    # Both drivers in Q3
+    assert points[0, table.find("Red Bull Racing")] == 35 + 9 + 18 + 10
+    # One driver in Q3 and one out in Q1
+    assert points[0, table.find("Alpine")] == 2 - 20 + 2 + 10 + 5
+    assert rules.for_season(2022) is rules.LEGACY_RULES
+
+
+def test_rule_set_from_dict():
+    rule_set = rules.RuleSet.from_dict("test", {"*": {"position_points": [3, 1], "status_points": {"NC": -2}}})
+    table = utils.get_pick_data().table()
+    points = rules.score_season(table, {"1/a": {"race-result": get_results()[0]}}, rule_set)
+    assert points[0, table.find("Max Verstappen")] == 3
+    assert points[0, table.find("Oscar Piastri")] == -2
+    assert points.sum() == 2 * (3 + 1 - 3 * 2)
+    with pytest.raises(ValueError):
+        rules.ModeRules.from_dict({"position_points": [1], "gained_points": 1})
+
+
+def test_backtest_with_rule_set():
+    pick_data = utils.get_pick_data()
+    race, qualifying = get_results()
+    season_data = {"1/a": {"race-result": race}, "2/b": {"race-result": qualifying}}
+    strategies = [backtest.Hindsight(engine="dp")]
+    legacy = backtest.backtest(pick_data, season_data, strategies, rule_set=rules.LEGACY_RULES, max_workers=1)
+    default = backtest.backtest(pick_data, season_data, strategies, max_workers=1)
+    assert np.array_equal(legacy.scores, default.scores)
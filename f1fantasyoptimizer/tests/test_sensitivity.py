@@ -0,0 +1,55 @@
+import math
+
+import pytest
+
+import f1fantasyoptimizer.sensitivity as sensitivity
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tests.utils as utils
+
+
+def best_team(table):
+    rows, td = solver.DynamicProgrammingEngine().solve(table)
+    return sorted(rows), td
+
+
+@pytest.mark.parametrize("name", ["Max Verstappen", "Sergio Perez", "Red Bull Racing", "Carlos Sainz", "Ferrari"])
+def test_points_thresholds_flip_the_best_team(name):
+    table = utils.get_pick_data().table()
+    report = sensitivity.analyze(table)
+    team = best_team(table)
+    assert sorted(table.rows[pick.pick_id] for pick in report.team) == team[0]
+    pick = report[name]
+    row = table.find(name)
+    for threshold, direction, other in ((pick.points_lower, -1, pick.below), (pick.points_upper, 1, pick.above)):
+        if not math.isfinite(threshold):
+            assert other is None
+            continue
+        changed = table.copy()
+        changed.points[row] = threshold - direction * 0.1
+        assert best_team(changed) == team
+        changed.points[row] = threshold + direction * 0.1
+        rows, td = best_team(changed)
+        assert rows == sorted(table.rows[pick.pick_id] for pick in other)
+        assert td == next(table.rows[pick.pick_id] for pick in other if pick.td)
+
+
+def test_cost_thresholds():
+    table = utils.get_pick_data().table()
+    report = sensitivity.analyze(table)
+    team = best_team(table)
+    for pick in report.picks:
+        row = table.find(pick.pick.name)
+        if math.isfinite(pick.cost_upper):
+            assert pick.in_team
+            changed = table.copy()
+            changed.costs = table.costs.copy()
+            changed.costs[row] = pick.cost_upper + 0.1
+            assert best_team(changed) != team
+        if math.isfinite(pick.cost_lower):
+            changed = table.copy()
+            changed.costs = table.costs.copy()
+            changed.costs[row] = pick.cost_lower
+            assert best_team(changed) != team
+            changed.costs[row] = pick.cost_lower + 0.1
+            assert best_team(changed) == team
+    assert "Max Verstappen (TD)" in report.report()
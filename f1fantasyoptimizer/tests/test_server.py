@@ -0,0 +1,142 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.tests.utils as utils
+import f1fantasyoptimizer.ui.cli as cli
+import f1fantasyoptimizer.ui.server as server
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    downloads = {"mode_data": 0}
+    release = threading.Event()
+    results = data.parse_event_data(utils.load_fixture("race_result.html"))
+
+    def download_mode_data(*, season, venue_id, mode):
+        downloads["mode_data"] += 1
+        release.wait(5)
+        return results
+
+    monkeypatch.setattr(data, "download_pick_data", utils.get_pick_data)
+    monkeypatch.setattr(data, "download_venues", lambda season: {"Bahrain": "1141/bahrain"})
+    monkeypatch.setattr(data, "download_mode_data", download_mode_data)
+    downloads["release"] = release
+    return downloads
+
+
+async def request(port: int, method: str, path: str, body=None) -> tuple[int, dict]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    content = b"" if body is None else json.dumps(body).encode()
+    writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(content)}\r\nConnection: close\r\n\r\n".encode()
+                 + content)
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(content)
+
+
+def run_server(test):
+    async def main():
+        optimization_server = server.OptimizationServer(cli.Runner(engine="dp"), max_workers=4)
+        listener = await optimization_server.start("127.0.0.1", 0)
+        try:
+            return await test(optimization_server, listener.sockets[0].getsockname()[1])
+        finally:
+            listener.close()
+            await listener.wait_closed()
+            optimization_server.close()
+
+    return asyncio.run(main())
+
+
+def test_solve_simulate_and_evaluate(downloads):
+    downloads["release"].set()
+    names, td = utils.get_team_names()
+
+    async def test(optimization_server, port):
+        event = {"season": 2023, "venue": "bahrain", "modes": ["race-result"]}
+        status, result = await request(port, "POST", "/solve", event)
+        assert status == 200
+        assert len(result["team"]["picks"]) == 7
+        status, result = await request(port, "POST", "/simulate", event)
+        assert status == 200
+        assert result["picks"][0]["name"] == "Red Bull Racing"
+        status, result = await request(port, "POST", "/evaluate", {**event, "team": names, "td": td})
+        assert status == 200
+        assert result["team"]["cost"] <= 100
+
+    run_server(test)
+
+
+def test_identical_requests_are_coalesced(downloads):
+    async def test(optimization_server, port):
+        event = {"season": 2023, "venue": "1141/bahrain", "modes": ["race-result"]}
+        requests = [asyncio.create_task(request(port, "POST", "/solve", event)) for _ in range(5)]
+        while optimization_server.requests < 5:
+            await asyncio.sleep(0.01)
+        downloads["release"].set()
+        responses = await asyncio.gather(*requests)
+        assert all(status == 200 for status, _ in responses)
+        assert all(result == responses[0][1] for _, result in responses)
+        assert downloads["mode_data"] == 1
+        status, health = await request(port, "GET", "/health")
+        assert health == {"status": "ok", "requests": 5, "coalesced": 4}
+
+    run_server(test)
+
+
+def test_jobs_of_cancelled_requests_are_still_coalesced(downloads):
+    async def test(optimization_server, port):
+        job = cli.Job.from_dict({"command": "solve", "season": 2023, "venue": "1141/bahrain",
+                                 "modes": ["race-result"]})
+        first = asyncio.create_task(optimization_server.run_job(job))
+        while downloads["mode_data"] < 1:
+            await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        second = asyncio.create_task(optimization_server.run_job(job))
+        await asyncio.sleep(0.01)
+        downloads["release"].set()
+        result = await second
+        assert len(result["team"]["picks"]) == 7
+        assert downloads["mode_data"] == 1
+        assert optimization_server.coalesced == 1
+
+    run_server(test)
+
+
+def test_errors(downloads):
+    downloads["release"].set()
+
+    async def test(optimization_server, port):
+        assert (await request(port, "POST", "/fly", {}))[0] == 404
+        assert (await request(port, "GET", "/solve"))[0] == 405
+        assert (await request(port, "POST", "/solve", {"season": 2023}))[0] == 400
+        status, result = await request(port, "POST", "/solve", {"season": 2023, "venue": "Monaco"})
+        assert status == 404
+        assert "Unknown venue" in result["error"]
+
+    run_server(test)
+
+
+def test_oversized_heads_and_unexpected_errors(downloads, monkeypatch):
+    downloads["release"].set()
+
+    async def test(optimization_server, port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /health HTTP/1.1\r\nX-Padding: " + b"x" * (1 << 17) + b"\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        assert response.startswith(b"HTTP/1.1 431 ")
+        monkeypatch.setattr(optimization_server.runner, "run", lambda job: iter([None.attribute]))
+        status, result = await request(port, "POST", "/solve", {"season": 2023, "venue": "Bahrain"})
+        assert status == 500
+        assert "AttributeError" in result["error"]
+        assert (await request(port, "GET", "/health"))[0] == 200
+
+    run_server(test)
@@ -0,0 +1,150 @@
+import numpy as np
+import pytest
+
+import f1fantasyoptimizer.simulator as simulator
+import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.tests.utils as utils
+from f1fantasyoptimizer.data import Pick
+
+
+def assert_valid_team(team):
+    assert len(team) == solver.CAPACITY
+    assert len({pick.pick_id for pick in team}) == solver.CAPACITY
+    assert sum(pick.pick_type == Pick.PickType.CONSTRUCTOR for pick in team) == solver.NUMBER_OF_CONSTRUCTORS
+    assert sum(pick.td for pick in team) == 1
+    assert all(pick.pick_type == Pick.PickType.DRIVER for pick in team if pick.td)
+    assert simulator.calculate_team_totals(team)["cost"] <= solver.BUDGET + 1e-9
+
+
+def test_solve():
+    team = solver.solve(utils.get_pick_data())
+    assert_valid_team(team)
+    assert simulator.calculate_team_totals(team)["points"] == 609.0
+
+
+def test_solve_does_not_modify_picks():
+    pick_data = utils.get_pick_data()
+    team = solver.solve(pick_data)
+    assert not any(pick.td for pick in pick_data.values())
+    assert all(pick is not pick_data[pick.pick_id] for pick in team)
+
+
+def test_solve_top_k():
+    pick_data = utils.get_pick_data()
+    teams = solver.solve_top_k(pick_data, 20)
+    assert len(teams) == 20
+    for team in teams:
+        assert_valid_team(team)
+    points = [simulator.calculate_team_totals(team)["points"] for team in teams]
+    assert points == sorted(points, reverse=True)
+    assert points[0] == simulator.calculate_team_totals(solver.solve(pick_data))["points"]
+    assert len({frozenset(pick.pick_id for pick in team) for team in teams}) == 20
+    # The turbo driver is the driver with the most points of each team
+    for team in teams:
+        td = next(pick for pick in team if pick.td)
+        assert td.points == max(pick.points for pick in team if pick.pick_type == Pick.PickType.DRIVER)
+
+
+def test_solve_dp_engine():
+    team = solver.solve(utils.get_pick_data(), engine="dp")
+    assert_valid_team(team)
+    assert simulator.calculate_team_totals(team)["points"] == 609.0
+
+
+def test_solve_engines_agree():
+    for seed in range(10):
+        pick_data = utils.get_random_pick_data(seed)
+        cpsat_team = solver.solve(pick_data, engine="cpsat")
+        cpsat_points = simulator.calculate_team_totals(cpsat_team)["points"]
+        dp_team = solver.solve(pick_data, engine=solver.DynamicProgrammingEngine())
+        assert_valid_team(dp_team)
+        assert simulator.calculate_team_totals(dp_team)["points"] == pytest.approx(cpsat_points)
+
+
+def test_solve_unknown_engine():
+    with pytest.raises(ValueError):
+        solver.solve(utils.get_pick_data(), engine="unknown")
+
+
+def test_solve_batch():
+    pick_data = utils.get_pick_data()
+    rng = np.random.default_rng(0)
+    points = np.round(rng.normal(20, 30, size=(25, len(pick_data))))
+    points[0] = [pick.points for pick in pick_data.values()]
+    teams = solver.solve_batch(pick_data, points)
+    assert len(teams) == len(points)
+    for row, team in zip(points, teams):
+        assert_valid_team(team)
+        for pick, value in zip(pick_data.values(), row):
+            pick.points = value
+        expected = simulator.calculate_team_totals(solver.solve(pick_data, engine="dp"))["points"]
+        assert simulator.calculate_team_totals(team)["points"] == pytest.approx(expected)
+    assert simulator.calculate_team_totals(teams[0])["points"] == 609.0
+
+
+def test_solver_session():
+    pick_data = utils.get_pick_data()
+    session = solver.SolverSession(pick_data)
+    assert simulator.calculate_team_totals(session.team)["points"] == 609.0
+    rng = np.random.default_rng(0)
+    pick_ids = list(pick_data.keys())
+    for _ in range(30):
+        changes = {int(pick_id): float(np.round(pick_data[int(pick_id)].points + rng.normal(0, 10)))
+                   for pick_id in rng.choice(pick_ids, 2, replace=False)}
+        for pick_id, points in changes.items():
+            pick_data[pick_id].points = points
+        team = session.update(changes)
+        assert_valid_team(team)
+        expected = simulator.calculate_team_totals(solver.solve(pick_data, engine="dp"))["points"]
+        assert simulator.calculate_team_totals(team)["points"] == pytest.approx(expected)
+    assert session.skipped > 0
+
+
+def test_solver_session_skips_provably_optimal_updates():
+    pick_data = utils.get_pick_data()
+    session = solver.SolverSession(pick_data)
+    team = session.team
+    # Increasing the points of the turbo driver or decreasing the points of an unselected pick cannot make any other
+    # team better
+    td = next(pick for pick in team if pick.td)
+    unselected = next(pick for pick in pick_data.values() if pick.pick_id not in {p.pick_id for p in team})
+    session.update({td.pick_id: td.points + 10, unselected.pick_id: unselected.points - 10})
+    assert session.skipped == 1
+    assert {pick.pick_id for pick in session.team} == {pick.pick_id for pick in team}
+    assert simulator.calculate_team_totals(session.team)["points"] == 629.0
+
+
+def test_solver_session_does_not_skip_after_feasible_solves():
+    pick_data = utils.get_pick_data()
+    session = solver.SolverSession(pick_data)
+    # As if the time limit had stopped the search before optimality was proven
+    session.metrics.status = "FEASIBLE"
+    td = next(pick for pick in session.team if pick.td)
+    session.update({td.pick_id: td.points + 10})
+    assert session.skipped == 0
+    assert session.metrics.optimal
+
+
+@pytest.mark.parametrize("engine", list(solver.ENGINES))
+def test_solve_with_metrics(engine):
+    team, metrics = solver.solve_with_metrics(utils.get_pick_data(), engine=engine,
+                                              options=solver.SolverOptions(workers=2, time_limit=10))
+    assert_valid_team(team)
+    assert metrics.engine == engine
+    assert metrics.optimal
+    assert metrics.objective == pytest.approx(609.0)
+    assert metrics.best_bound == pytest.approx(609.0)
+    assert metrics.solve_time > 0
+    if engine == "cpsat":
+        assert metrics.workers == 2
+        assert metrics.branches is not None
+
+
+def test_solver_options_accept_feasible():
+    from ortools.sat.python import cp_model
+
+    solver.SolverOptions().check_status(cp_model.FEASIBLE)
+    with pytest.raises(RuntimeError):
+        solver.SolverOptions(accept_feasible=False).check_status(cp_model.FEASIBLE)
+    with pytest.raises(RuntimeError):
+        solver.SolverOptions().check_status(cp_model.UNKNOWN)
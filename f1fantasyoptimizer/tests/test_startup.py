@@ -0,0 +1,29 @@
+import subprocess
+import sys
+
+import pytest
+
+import f1fantasyoptimizer
+
+# Modules which must not be loaded before the code paths using them run
+HEAVY_MODULES = ["numpy", "lxml", "ortools", "f1fantasyoptimizer.solver"]
+
+
+def loaded_heavy_modules(module: str) -> list[str]:
+    code = f"import sys, {module}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, check=True, text=True).stdout.split()
+
+
+def test_cli_imports_are_lazy():
+    assert loaded_heavy_modules("f1fantasyoptimizer.ui.cli") == []
+
+
+def test_gui_imports_are_lazy():
+    pytest.importorskip("tkinter")
+    assert loaded_heavy_modules("f1fantasyoptimizer.ui.gui") == []
+
+
+def test_version():
+    result = subprocess.run([sys.executable, "-m", "f1fantasyoptimizer", "--version"], capture_output=True, check=True,
+                            text=True)
+    assert result.stdout.strip() == f"f1fantasyoptimizer {f1fantasyoptimizer.__version__}"
@@ -0,0 +1,80 @@
+import collections
+import concurrent.futures
+import threading
+
+import pytest
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.store as store
+import f1fantasyoptimizer.tests.utils as utils
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = collections.Counter()
+
+    def download_pick_data():
+        calls["pick_data"] += 1
+        return utils.get_pick_data()
+
+    def download_venues(season):
+        calls[("venues", season)] += 1
+        return {"Bahrain": "1141/bahrain"}
+
+    monkeypatch.setattr(data, "download_pick_data", download_pick_data)
+    monkeypatch.setattr(data, "download_venues", download_venues)
+    return calls
+
+
+def test_data_is_downloaded_once(calls):
+    data_store = store.DataStore()
+    assert data_store.venues(2023) == {"Bahrain": "1141/bahrain"}
+    assert data_store.venues(2023) == {"Bahrain": "1141/bahrain"}
+    data_store.venues(2022)
+    assert calls[("venues", 2023)] == 1
+    assert calls[("venues", 2022)] == 1
+
+
+def test_pick_data_is_copied(calls):
+    data_store = store.DataStore()
+    pick_data = data_store.pick_data()
+    data.reset_points(pick_data)
+    assert data_store.pick_data()[131].points == 96.0
+    assert calls["pick_data"] == 1
+
+
+def test_concurrent_requests_share_one_download(monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    calls = collections.Counter()
+
+    def download_seasons():
+        calls["seasons"] += 1
+        started.set()
+        release.wait()
+        return [2023, 2022]
+
+    monkeypatch.setattr(data, "download_seasons", download_seasons)
+    data_store = store.DataStore()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(data_store.seasons) for _ in range(4)]
+        started.wait()
+        release.set()
+        assert all(future.result() == [2023, 2022] for future in futures)
+    assert calls["seasons"] == 1
+
+
+def test_failures_are_not_memoized(monkeypatch):
+    results = [ConnectionError(), {"Bahrain": "1141/bahrain"}]
+
+    def download_venues(season):
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(data, "download_venues", download_venues)
+    data_store = store.DataStore()
+    with pytest.raises(ConnectionError):
+        data_store.venues(2023)
+    assert data_store.venues(2023) == {"Bahrain": "1141/bahrain"}
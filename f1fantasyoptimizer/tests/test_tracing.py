@@ -0,0 +1,53 @@
+import json
+import time
+
+import f1fantasyoptimizer.tracing as tracing
+
+
+def test_disabled_spans_are_shared():
+    assert tracing.get_tracer() is None
+    assert tracing.span("a") is tracing.span("b", tracing.PARSE, size=1)
+
+    @tracing.traced("f")
+    def f(x, *, y):
+        return x + y
+
+    assert f(1, y=2) == 3
+    assert f.__name__ == "f"
+
+
+def test_spans(tmp_path, capsys):
+    path = str(tmp_path / "trace.json")
+    with tracing.record(path) as tracer:
+        with tracing.span("outer", tracing.SOLVE, picks=3):
+            time.sleep(0.01)
+            with tracing.span("inner", tracing.PARSE):
+                time.sleep(0.001)
+        with tracing.span("inner", tracing.PARSE):
+            pass
+    assert tracing.get_tracer() is None
+    assert [span.name for span in tracer.spans] == ["inner", "outer", "inner"]
+    outer, inner = tracer.spans[1], tracer.spans[0]
+    assert outer.args == {"picks": 3}
+    assert outer.start <= inner.start and inner.start + inner.duration <= outer.start + outer.duration
+    assert tracer._self_times()[1] == outer.duration - inner.duration
+
+    summary = capsys.readouterr().err.splitlines()
+    assert summary[0].split()[:4] == ["span", "category", "calls", "total"]
+    assert summary[1].split()[:3] == ["outer", "solve", "1"]
+    assert summary[2].split()[:3] == ["inner", "parse", "2"]
+    with open(path) as f:
+        events = json.load(f)["traceEvents"]
+    assert [event["name"] for event in events if event["ph"] == "X"] == ["inner", "outer", "inner"]
+    assert {event["ph"] for event in events} == {"M", "X"}
+
+
+def test_trace_from_env(monkeypatch):
+    monkeypatch.delenv(tracing.TRACE_ENV_VAR, raising=False)
+    assert tracing.trace_from_env() is None
+    monkeypatch.setenv(tracing.TRACE_ENV_VAR, "0")
+    assert tracing.trace_from_env() is None
+    monkeypatch.setenv(tracing.TRACE_ENV_VAR, "1")
+    assert tracing.trace_from_env() == ""
+    monkeypatch.setenv(tracing.TRACE_ENV_VAR, "trace.json")
+    assert tracing.trace_from_env() == "trace.json"
@@ -0,0 +1,104 @@
+import collections
+
+import pytest
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.montecarlo as montecarlo
+import f1fantasyoptimizer.tests.utils as utils
+import f1fantasyoptimizer.warehouse as warehouse
+
+VENUES = {"Bahrain": "1141/bahrain", "Saudi Arabia": "1142/saudi-arabia"}
+MODES = {"Race Result": "race-result", "Qualifying": "qualifying"}
+
+
+@pytest.fixture
+def website(monkeypatch):
+    website = {
+        "venues": dict(VENUES),
+        "results": {"race-result": data.parse_event_data(utils.load_fixture("race_result.html")),
+                    "qualifying": data.parse_event_data(utils.load_fixture("qualifying.html"))},
+        "calls": collections.Counter(),
+    }
+
+    def download_venues(season):
+        website["calls"]["venues"] += 1
+        return website["venues"]
+
+    def download_event_modes(*, season, venue_id):
+        website["calls"]["modes"] += 1
+        return MODES
+
+    def download_mode_data(*, season, venue_id, mode):
+        website["calls"][(venue_id, mode)] += 1
+        return website["results"][mode]
+
+    monkeypatch.setattr(data, "download_venues", download_venues)
+    monkeypatch.setattr(data, "download_event_modes", download_event_modes)
+    monkeypatch.setattr(data, "download_mode_data", download_mode_data)
+    return website
+
+
+@pytest.fixture
+def results_warehouse(tmp_path):
+    with warehouse.ResultsWarehouse(str(tmp_path / "results.sqlite3")) as results_warehouse:
+        yield results_warehouse
+
+
+def test_ingest_stores_all_results(website, results_warehouse):
+    assert results_warehouse.ingest(2023) == 4
+    assert results_warehouse.seasons() == [2023]
+    assert results_warehouse.venues(2023) == VENUES
+    assert results_warehouse.event_modes(season=2023, venue_id="1141/bahrain") == MODES
+    assert results_warehouse.mode_data(season=2023, venue_id="1142/saudi-arabia", mode="qualifying") == \
+        website["results"]["qualifying"]
+    assert results_warehouse.season_results(2023, modes=["race-result"]) == \
+        {venue_id: {"race-result": website["results"]["race-result"]} for venue_id in VENUES.values()}
+    with pytest.raises(KeyError):
+        results_warehouse.mode_data(season=2022, venue_id="1141/bahrain", mode="qualifying")
+
+
+def test_ingest_fetches_only_missing_results(website, results_warehouse):
+    website["results"]["race-result"] = []
+    assert results_warehouse.ingest(2023) == 2
+    assert website["calls"][("1141/bahrain", "race-result")] == 1
+
+    # Only the venue with missing results is downloaded again
+    website["results"]["race-result"] = data.parse_event_data(utils.load_fixture("race_result.html"))
+    website["venues"] = {**VENUES, "Australia": "1143/australia"}
+    assert results_warehouse.ingest(2023) == 4
+    assert website["calls"][("1141/bahrain", "race-result")] == 2
+    assert website["calls"][("1141/bahrain", "qualifying")] == 1
+    assert website["calls"][("1143/australia", "qualifying")] == 1
+    assert results_warehouse.ingest(2023) == 0
+    assert website["calls"][("1141/bahrain", "race-result")] == 2
+
+
+def test_complete_past_season_is_not_downloaded_again(website, results_warehouse):
+    results_warehouse.ingest(2021)
+    results_warehouse.ingest(2021)
+    assert website["calls"]["venues"] == 1
+    assert results_warehouse.ingest(2021, refresh=True) == 4
+    assert website["calls"]["venues"] == 2
+
+
+def test_warehouse_is_persisted(website, tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    with warehouse.ResultsWarehouse(path) as results_warehouse:
+        results_warehouse.ingest(2023)
+    with warehouse.ResultsWarehouse(path) as results_warehouse:
+        season_data = results_warehouse.season_results(2023)
+    assert season_data == {venue_id: website["results"] for venue_id in VENUES.values()}
+
+
+def test_queries(website, results_warehouse):
+    results_warehouse.ingest(2023)
+    results_warehouse.add_event(season=2022, venue_id="1124/bahrain", mode="race-result",
+                                order=[("1", "Max Verstappen"), ("NC", "Sergio Perez")])
+    orders = results_warehouse.orders(modes=["race-result"])
+    assert len(orders) == 3
+    assert results_warehouse.orders(seasons=[2022]) == [[("1", "Max Verstappen"), ("NC", "Sergio Perez")]]
+    distribution = montecarlo.PositionDistribution.from_results(orders)
+    assert "Sergio Perez" in distribution.drivers
+    results = results_warehouse.driver_results("perez sergio", modes=["race-result"])
+    assert results[-1] == (2022, "1124/bahrain", "race-result", "NC")
+    assert len(results) == 3
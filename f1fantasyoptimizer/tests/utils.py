@@ -1,6 +1,16 @@
+import collections
+import hashlib
+import http.server
+import json
+import os
+import random
+import threading
+
 import f1fantasyoptimizer.data as data
 from f1fantasyoptimizer.data import Pick
 
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
 
 def print_pick_data(pick_data: data.PickData):
     print("{")
@@ -12,7 +22,7 @@ def print_pick_data(pick_data: data.PickData):
 
 
 def get_pick_data():
-    return {
+    return data.PickData({
         29: Pick(29, Pick.PickType.CONSTRUCTOR, "Red Bull Racing", 173.0, 27.2, 29, td=False),
         131: Pick(131, Pick.PickType.DRIVER, "Max Verstappen", 96.0, 26.9, 29, td=False),
         28: Pick(28, Pick.PickType.CONSTRUCTOR, "Mercedes", 89.0, 25.1, 28, td=False),
@@ -43,7 +53,7 @@ def get_pick_data():
         130: Pick(130, Pick.PickType.DRIVER, "Yuki Tsunoda", 17.0, 4.8, 22, td=False),
         111: Pick(111, Pick.PickType.DRIVER, "Nico Hulkenberg", 0.0, 4.3, 26, td=False),
         126: Pick(126, Pick.PickType.DRIVER, "Logan Sargeant", 13.0, 4.0, 210, td=False),
-    }
+    })
 
 
 def get_team_names():
@@ -58,3 +68,138 @@ def get_team_names():
     team_names = ([driver0, driver1, driver2, driver3, driver4,
                    constructor0, constructor1], td)
     return team_names
+
+
+def load_fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+class LocalHTTPServer:
+    """
+    Local stand-in for the F1 websites serving static content with `ETag` revalidation.
+    """
+
+    def __init__(self):
+        self.content: dict[str, bytes] = dict()
+        self.failures: dict[str, list[int]] = dict()
+        self.requests: collections.Counter = collections.Counter()
+        self.not_modified: collections.Counter = collections.Counter()
+        self.connections: set = set()
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.requests[self.path] += 1
+                server.connections.add(self.client_address)
+                if server.failures.get(self.path):
+                    self.send_error(server.failures[self.path].pop(0))
+                    return
+                if self.path not in server.content:
+                    self.send_error(404)
+                    return
+                body = server.content[self.path]
+                etag = '"{}"'.format(hashlib.sha256(body).hexdigest())
+                if self.headers.get("If-None-Match") == etag:
+                    server.not_modified[self.path] += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, kwargs=dict(poll_interval=0.01), daemon=True)
+        self.thread.start()
+
+    def set(self, path: str, body: bytes):
+        self.content[path] = body
+
+    def fail(self, path: str, *codes: int):
+        """
+        Respond to the next requests of `path` with the given error status codes.
+        """
+        self.failures[path] = list(codes)
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}{path}"
+
+    def close(self):
+        if self.thread.is_alive():
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def get_random_pick_data(seed: int, *, n_drivers: int = 20, n_constructors: int = 10) -> data.PickData:
+    """
+    Generate a random pool of picks with points and costs on a 0.1 grid.
+    """
+    rng = random.Random(seed)
+    pick_data = data.PickData()
+    for team_id in range(n_constructors):
+        pick_data[team_id] = Pick(team_id, Pick.PickType.CONSTRUCTOR, f"Constructor {team_id}",
+                                  rng.randint(-200, 2000) / 10, rng.randint(50, 300) / 10, team_id)
+    for i in range(n_drivers):
+        pick_id = n_constructors + i
+        pick_data[pick_id] = Pick(pick_id, Pick.PickType.DRIVER, f"Driver {i}", rng.randint(-200, 1000) / 10,
+                                  rng.randint(40, 300) / 10, i % n_constructors)
+    return pick_data
+
+
+def get_synthetic_pick_data(n_picks: int, seed: int = 0) -> data.PickData:
+    """
+    Generate a random pool of picks of any size, of which a third are constructors like in the real game.
+    """
+    return get_random_pick_data(seed, n_drivers=n_picks - n_picks // 3, n_constructors=n_picks // 3)
+
+
+def get_random_order(pick_data: data.PickData, seed: int) -> list[tuple[str, str]]:
+    """
+    Generate a random finishing order of all drivers in the format of `data.parse_event_data`.
+    """
+    names = [pick.name for pick in pick_data.by_type(Pick.PickType.DRIVER)]
+    random.Random(seed).shuffle(names)
+    return [(str(i + 1), name) for i, name in enumerate(names)]
+
+
+def render_results_page(order: list[tuple[str, str]]) -> bytes:
+    """
+    Render a finishing order as a results page of the F1 website, which `data.parse_event_data` parses back.
+    """
+    rows = []
+    for placement, name in order:
+        first_name, _, last_name = name.partition(" ")
+        rows.append(f'<tr>\n<td class="limiter"></td>\n<td class="dark">{placement}</td>\n'
+                    f'<td class="dark hide-for-mobile">{placement}</td>\n<td class="dark bold">\n'
+                    f'<span class="hide-for-tablet">{first_name}</span>\n'
+                    f'<span class="hide-for-mobile">{last_name}</span>\n'
+                    f'<span class="uppercase hide-for-desktop">{last_name[:3].upper()}</span>\n</td>\n'
+                    f'<td class="bold">0</td>\n<td class="limiter"></td>\n</tr>')
+    return ('<!DOCTYPE html>\n<html>\n<body>\n<table class="resultsarchive-table">\n<tbody>\n' + "\n".join(rows) +
+            '\n</tbody>\n</table>\n</body>\n</html>\n').encode()
+
+
+def render_pick_feed(pick_data: data.PickData) -> bytes:
+    """
+    Render picks as the feed of the F1Fantasy website, which `data.parse_pick_data` parses back.
+    """
+    entries = [{"PlayerId": str(pick.pick_id), "PositionName": pick.pick_type.name.title(), "FUllName": pick.name,
+                "OverallPpints": str(pick.points), "Value": str(pick.cost), "TeamId": str(pick.team_id)}
+               for pick in pick_data.values()]
+    return json.dumps({"Data": {"Value": entries}}).encode()
@@ -0,0 +1,255 @@
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Iterator, Optional, TextIO, TypeVar
+
+TRACE_ENV_VAR: str = "F1FANTASYOPTIMIZER_TRACE"
+
+# Categories of spans
+DOWNLOAD: str = "download"
+NETWORK: str = "network"
+PARSE: str = "parse"
+SIMULATE: str = "simulate"
+SOLVE: str = "solve"
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+class SpanRecord:
+    """
+    A finished span.
+    """
+    __slots__ = ("name", "category", "start", "duration", "thread_id", "args")
+
+    def __init__(self, name: str, category: str, start: int, duration: int, thread_id: int, args: dict[str, Any]):
+        """
+        :param name: the name of the span
+        :param category: the category of the span, e.g. `NETWORK`
+        :param start: the start time in nanoseconds as returned by `time.perf_counter_ns()`
+        :param duration: the duration in nanoseconds
+        :param thread_id: the identifier of the thread which ran the span
+        :param args: further information about the span, e.g. the downloaded URL
+        """
+        self.name = name
+        self.category = category
+        self.start = start
+        self.duration = duration
+        self.thread_id = thread_id
+        self.args = args
+
+
+class Tracer:
+    """
+    Collects the spans of all threads of the current process. Spans of worker processes, e.g. of a
+    `ProcessPoolExecutor`, are not recorded.
+    """
+
+    def __init__(self):
+        self.spans: list[SpanRecord] = []
+        self.thread_names: dict[int, str] = dict()
+        self.start = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    def add(self, span: SpanRecord):
+        with self._lock:
+            self.spans.append(span)
+            if span.thread_id not in self.thread_names:
+                self.thread_names[span.thread_id] = threading.current_thread().name
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """
+        Convert the spans to the Trace Event Format, which is shown by `chrome://tracing` and Perfetto.
+        :return: the trace as JSON object
+        """
+        pid = os.getpid()
+        events: list[dict[str, Any]] = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                                         "args": {"name": name}} for tid, name in self.thread_names.items()]
+        for span in self.spans:
+            events.append({"name": span.name, "cat": span.category, "ph": "X", "ts": (span.start - self.start) / 1000,
+                           "dur": span.duration / 1000, "pid": pid, "tid": span.thread_id, "args": span.args})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str):
+        """
+        Write the spans to a file in the Trace Event Format.
+        :param path: path of the file
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def _self_times(self) -> list[int]:
+        """
+        Calculate the time of every span which is not spent in spans nested in it on the same thread.
+        :return: the self time of every span in nanoseconds
+        """
+        self_times = [span.duration for span in self.spans]
+        stacks: dict[int, list[int]] = dict()
+        for i in sorted(range(len(self.spans)), key=lambda i: (self.spans[i].start, -self.spans[i].duration)):
+            span = self.spans[i]
+            stack = stacks.setdefault(span.thread_id, [])
+            while stack and self.spans[stack[-1]].start + self.spans[stack[-1]].duration <= span.start:
+                stack.pop()
+            if stack:
+                self_times[stack[-1]] -= span.duration
+            stack.append(i)
+        return self_times
+
+    def summary(self) -> str:
+        """
+        Summarize the spans by their name, ordered by their total self time.
+        :return: the summary as text
+        """
+        totals: dict[tuple[str, str], list[float]] = dict()
+        for span, self_time in zip(self.spans, self._self_times()):
+            total = totals.setdefault((span.name, span.category), [0, 0.0, 0.0, 0.0])
+            total[0] += 1
+            total[1] += span.duration / 1e6
+            total[2] += self_time / 1e6
+            total[3] = max(total[3], span.duration / 1e6)
+        width = max([len("span")] + [len(name) for name, _ in totals])
+        lines = [f"{'span':<{width}} {'category':<9} {'calls':>6} {'total [ms]':>11} {'self [ms]':>10} "
+                 f"{'max [ms]':>9}"]
+        for (name, category), (calls, total, self_time, longest) in sorted(totals.items(), key=lambda t: -t[1][2]):
+            lines.append(f"{name:<{width}} {category:<9} {calls:>6} {total:>11.2f} {self_time:>10.2f} "
+                         f"{longest:>9.2f}")
+        return "\n".join(lines)
+
+
+_tracer: Optional[Tracer] = None
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer: Tracer, name: str, category: str, args: dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        duration = time.perf_counter_ns() - self.start
+        self.tracer.add(SpanRecord(self.name, self.category, self.start, duration, threading.get_ident(), self.args))
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, category: str = "", **args: Any):
+    """
+    Measure the time of a block: `with tracing.span("solver.search", tracing.SOLVE): ...`.
+
+    Returns a shared object which does nothing if tracing is disabled.
+    :param name: the name of the span
+    :param category: the category of the span, e.g. `NETWORK`
+    :param args: further information about the span, which is shown in the trace
+    :return: the context manager
+    """
+    if _tracer is None:
+        return _NULL_SPAN
+    return _Span(_tracer, name, category, args)
+
+
+def traced(name: str, category: str = "") -> Callable[[_F], _F]:
+    """
+    Decorator measuring every call of a function in a span.
+    :param name: the name of the span
+    :param category: the category of the span
+    """
+    def decorator(function: _F) -> _F:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return function(*args, **kwargs)
+            with _Span(_tracer, name, category, dict()):
+                return function(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+def enable() -> Tracer:
+    """
+    Start recording spans in a new tracer.
+    :return: the tracer
+    """
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable() -> Optional[Tracer]:
+    """
+    Stop recording spans.
+    :return: the tracer which recorded the spans, `None` if tracing was disabled
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def trace_from_env() -> Optional[str]:
+    """
+    Check whether tracing was requested by setting the environment variable `F1FANTASYOPTIMIZER_TRACE`.
+
+    The variable is either set to a flag like `1`, to print a summary of the spans, or to the path of a file to which
+    the spans are written in the Trace Event Format as well.
+    :return: `None` if tracing is disabled, otherwise the path of the trace file or an empty string for no file
+    """
+    value = os.environ.get(TRACE_ENV_VAR, "")
+    if value.lower() in ("", "0", "false", "no", "off"):
+        return None
+    return "" if value.lower() in ("1", "true", "yes", "on") else value
+
+
+def report(tracer: Tracer, path: str = "", *, file: Optional[TextIO] = None):
+    """
+    Print the summary of the spans and write them to a trace file.
+    :param tracer: the tracer which recorded the spans
+    :param path: path of the trace file, an empty string to only print the summary
+    :param file: the file to which the summary is printed, stderr by default
+    """
+    file = file or sys.stderr
+    print(tracer.summary(), file=file)
+    if path:
+        tracer.write_chrome_trace(path)
+        print(f"Wrote the trace to {path}.", file=file)
+
+
+@contextlib.contextmanager
+def record(path: Optional[str]) -> Iterator[Optional[Tracer]]:
+    """
+    Record the spans of a block and report them when it is left, e.g. at the end of a CLI run.
+    :param path: the path of the trace file, an empty string for no file or `None` to disable tracing
+    :return: the tracer, `None` if tracing is disabled
+    """
+    if path is None:
+        yield None
+        return
+    tracer = enable()
+    try:
+        yield tracer
+    finally:
+        disable()
+        report(tracer, path)
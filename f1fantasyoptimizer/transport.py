@@ -0,0 +1,132 @@
+import http.client
+import io
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Optional
+
+DEFAULT_TIMEOUT: float = 30  # seconds
+MAX_REDIRECTS: int = 5
+USER_AGENT: str = "f1fantasyoptimizer"
+
+
+class Response:
+    """
+    A completely read HTTP response.
+
+    Provides the subset of the interface of the objects returned by `urllib.request.urlopen` that is used by this
+    package.
+    """
+
+    def __init__(self, url: str, status: int, headers: http.client.HTTPMessage, body: bytes):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def read(self) -> bytes:
+        return self.body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+class KeepAliveOpener:
+    """
+    Opens requests over persistent HTTP/1.1 connections.
+
+    Every thread keeps at most one connection per host alive, which is only reused by later requests of the same
+    thread. Downloads should therefore run on long-lived threads like those of `data.download_executor`: the
+    connections of a thread are only closed by `close` in that thread or once the thread has ended and its state is
+    garbage collected. Redirects are followed and responses with a status code of 400 or above raise a
+    `urllib.error.HTTPError` just like `urllib.request.urlopen` does.
+    """
+
+    def __init__(self, *, timeout: float = DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def __call__(self, request: urllib.request.Request) -> Response:
+        url = request.full_url
+        headers = {"User-Agent": USER_AGENT, **dict(request.header_items())}
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._request(url, headers)
+            location = response.headers.get("Location")
+            if response.status in (301, 302, 303, 307, 308) and location:
+                url = urllib.parse.urljoin(url, location)
+                continue
+            if response.status >= 400:
+                raise urllib.error.HTTPError(url, response.status, response.headers.get_content_charset() or "",
+                                             response.headers, io.BytesIO(response.body))
+            return response
+        raise urllib.error.URLError(f"Too many redirects while requesting `{request.full_url}`.")
+
+    def close(self):
+        """
+        Close all connections of the calling thread.
+        """
+        for connection in self._connections().values():
+            connection.close()
+        self._connections().clear()
+
+    def _connections(self) -> dict[tuple[str, str], http.client.HTTPConnection]:
+        if not hasattr(self._local, "connections"):
+            self._local.connections = dict()
+        return self._local.connections
+
+    def _request(self, url: str, headers: dict[str, str]) -> Response:
+        parts = urllib.parse.urlsplit(url)
+        path = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+        key = (parts.scheme, parts.netloc)
+        connections = self._connections()
+        # A kept-alive connection may have been closed by the server in the meantime, so retry once on a new one
+        for attempt in range(2):
+            connection = connections.get(key)
+            reused = connection is not None
+            if connection is None:
+                connection = self._connect(parts.scheme, parts.netloc)
+                connections[key] = connection
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, ConnectionError) as e:
+                connection.close()
+                del connections[key]
+                if reused and attempt == 0:
+                    continue
+                raise urllib.error.URLError(e)
+            except OSError as e:
+                connection.close()
+                del connections[key]
+                raise urllib.error.URLError(e)
+            if response.will_close:
+                connection.close()
+                del connections[key]
+            return Response(url, response.status, response.headers, body)
+        raise AssertionError("unreachable")
+
+    def _connect(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout)
+        if scheme == "http":
+            return http.client.HTTPConnection(netloc, timeout=self.timeout)
+        raise urllib.error.URLError(f"Unsupported URL scheme `{scheme}`.")
+
+
+_default_opener: Optional[KeepAliveOpener] = None
+
+
+def default_opener() -> KeepAliveOpener:
+    """
+    Get the opener shared by all downloads of this package.
+    :return: the shared opener
+    """
+    global _default_opener
+    if _default_opener is None:
+        _default_opener = KeepAliveOpener()
+    return _default_opener
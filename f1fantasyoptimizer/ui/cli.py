@@ -1,26 +1,20 @@
 #!/usr/bin/env python3
+import argparse
+import concurrent.futures
+import json
+import sys
+import threading
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional, TextIO
+
 import f1fantasyoptimizer.data as data
 import f1fantasyoptimizer.simulator as simulator
-import f1fantasyoptimizer.solver as solver
-
-# Select event for which to download event data
-SEASON: data.Season = 2023
-VENUE_NAME: data.Venue.Name = "Bahrain"
-
-# Select a team which should also be evaluated
-YOUR_TEAM = (["Max Verstappen", "Fernando Alonso", "Sergio Perez", "Lance Stroll", "Zhou Guanyu",
-              "Red Bull Racing", "Aston Martin"], "Max Verstappen")
+import f1fantasyoptimizer.store as store
+import f1fantasyoptimizer.tracing as tracing
 
-# MODE = None
-MODE = "qualifying"
+if TYPE_CHECKING:
+    import f1fantasyoptimizer.solver as solver
 
-
-def print_team(picks: data.Team):
-    picks = sorted(picks, key=lambda p: (str(p.pick_type), p.cost), reverse=True)
-    for pick in picks:
-        print(pick)
-    total = simulator.calculate_team_totals(picks)
-    print(f"Team total: {total['points']} Pts, ${total['cost']:.1f}M")
+COMMANDS: tuple[str, ...] = ("solve", "simulate", "evaluate", "backtest", "sensitivity")
 
 
 def print_pick_data(pick_data: data.PickData):
@@ -30,25 +24,380 @@ def print_pick_data(pick_data: data.PickData):
     print()
 
 
-def main():
-    venues = data.download_venues(SEASON)
-    pick_data = data.download_pick_data()
+def pick_to_dict(pick: data.Pick) -> dict[str, Any]:
+    return {"pick_id": pick.pick_id, "type": str(pick.pick_type).lower(), "name": pick.name, "points": pick.points,
+            "cost": pick.cost, "td": pick.td}
 
-    if MODE:
-        data.reset_points(pick_data)
-        event_data = data.download_event_data(venue_id=venues[VENUE_NAME], season=SEASON, modes=[MODE])
-        simulator.simulate(pick_data, event_data[MODE])
-        print_pick_data(pick_data)
 
-    print("Best team:")
-    best_team = solver.solve(pick_data)
-    print_team(best_team)
-    print()
+def team_to_dict(team: data.Team) -> dict[str, Any]:
+    total = simulator.calculate_team_totals(team)
+    return {"picks": [pick_to_dict(pick) for pick in team], "points": total["points"], "cost": round(total["cost"], 1)}
 
-    print("Your team:")
-    your_picks = data.create_team_from_names(YOUR_TEAM, pick_data)
-    print_team(your_picks)
-    print()
+
+class Job:
+    """
+    A command together with its arguments, e.g. a line of a batch file.
+    """
+
+    def __init__(self, command: str, *, season: data.Season, venue: Optional[str] = None,
+                 modes: Iterable[data.Mode.Id] = (), team: Optional[list[str]] = None, td: Optional[str] = None):
+        """
+        :param command: one of `COMMANDS`
+        :param season: the season of the event
+        :param venue: the name or the ID of the venue, `None` for all venues of the season if the command is `backtest`
+        :param modes: the modes whose results are simulated, no modes to use the points of the fantasy game
+        :param team: the names of the picks of a team to evaluate
+        :param td: the name of the turbo driver of the team
+        """
+        if command not in COMMANDS:
+            raise ValueError(f"Unknown command `{command}`, expected one of {', '.join(COMMANDS)}.")
+        if venue is None and command != "backtest":
+            raise ValueError(f"The command `{command}` requires a venue.")
+        if team is None and command == "evaluate":
+            raise ValueError("The command `evaluate` requires a team.")
+        if team is not None and td is None:
+            raise ValueError("The team requires a turbo driver.")
+        self.command = command
+        self.season = season
+        self.venue = venue
+        self.modes = list(modes)
+        self.team = team
+        self.td = td
+
+    @staticmethod
+    def from_dict(job: dict[str, Any]) -> "Job":
+        """
+        Create a job from its JSON representation.
+        :param job: the job, containing the key `command` and the arguments of the constructor
+        :return: the job
+        """
+        job = dict(job)
+        try:
+            command = job.pop("command")
+            season = int(job.pop("season"))
+        except KeyError as e:
+            raise ValueError(f"The job lacks the key `{e.args[0]}`.") from None
+        unknown = set(job) - {"venue", "modes", "team", "td"}
+        if unknown:
+            raise ValueError(f"Unknown keys {', '.join(sorted(unknown))}.")
+        return Job(command, season=season, **job)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {key: value for key, value in vars(self).items() if value is not None}
+
+
+class Runner:
+    """
+    Runs jobs while sharing downloaded data and the solver between them.
+
+    Jobs may be run by several threads at the same time; solves are serialized, because they share one model.
+    """
+
+    def __init__(self, *, engine: Optional[str] = None, options: Optional["solver.SolverOptions"] = None,
+                 data_store: Optional[store.DataStore] = None):
+        """
+        :param engine: the name of the engine which finds the best teams, `None` for the default engine
+        :param options: parameters of the solver
+        :param data_store: the store of downloaded data, `None` to create one
+        """
+        self.engine = engine
+        self.options = options
+        self.store = data_store or store.DataStore()
+        self._engine: Optional["solver.Engine"] = None
+        self._session: Optional["solver.SolverSession"] = None
+        self._solver_lock = threading.Lock()
+
+    def prefetch(self, jobs: Iterable[Job], *, max_workers: int = data.DEFAULT_MAX_WORKERS):
+        """
+        Download all data required by several jobs concurrently.
+
+        Failed downloads are ignored here, they fail again when the job runs.
+        :param jobs: the jobs
+        :param max_workers: maximum number of pages which are downloaded concurrently
+        """
+        jobs = list(jobs)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            executor.submit(self.store.pick_data)
+            for season in {job.season for job in jobs}:
+                executor.submit(self.store.venues, season)
+            for job in jobs:
+                executor.submit(self._prefetch_job, job)
+
+    def _prefetch_job(self, job: Job):
+        try:
+            venue_ids = [self.venue_id(job.season, job.venue)] if job.venue is not None \
+                else list(self.store.venues(job.season).values())
+        except (KeyError, OSError):
+            return
+        for venue_id in venue_ids:
+            for mode in job.modes:
+                try:
+                    self.store.mode_data(season=job.season, venue_id=venue_id, mode=mode)
+                except OSError:
+                    pass
+
+    def venue_id(self, season: data.Season, venue: str) -> data.Venue.Id:
+        """
+        Look up the ID of a venue.
+        :param season: the season of the venue
+        :param venue: the name or the ID of the venue; names are compared case-insensitively
+        :return: the ID of the venue
+        """
+        venues = self.store.venues(season)
+        if venue in venues.values():
+            return venue
+        matches = [venue_id for name, venue_id in venues.items() if name.casefold() == venue.casefold()]
+        if not matches:
+            raise KeyError(f"Unknown venue `{venue}` in season {season}, expected one of {', '.join(venues)}.")
+        return matches[0]
+
+    def pick_data(self, season: data.Season, venue_id: data.Venue.Id, modes: list[data.Mode.Id]) -> data.PickData:
+        """
+        Get all picks with the points they scored in the given modes of an event.
+        :param season: the season of the event
+        :param venue_id: the venue of the event
+        :param modes: the modes whose results are simulated, no modes to use the points of the fantasy game
+        :return: a copy of all picks
+        """
+        pick_data = self.store.pick_data()
+        if not modes:
+            return pick_data
+        table = pick_data.table()
+        table.points = sum(simulator.score(table, self.store.mode_data(season=season, venue_id=venue_id, mode=mode))
+                           for mode in modes)
+        table.write_points(pick_data)
+        return pick_data
+
+    def solve(self, pick_data: data.PickData) -> tuple[data.Team, Optional["solver.SolveMetrics"]]:
+        """
+        Find the best team.
+
+        The CP-SAT model is kept between calls and only its objective is updated, as long as the picks do not change.
+        :param pick_data: object containing all information about all possible picks
+        :return: the best team and the measurements of the solve, `None` if solving was not necessary
+        """
+        import f1fantasyoptimizer.solver as solver
+
+        engine = self.engine or solver.DEFAULT_ENGINE
+        with self._solver_lock:
+            if engine != "cpsat":
+                if self._engine is None:
+                    self._engine = solver.get_engine(engine, self.options)
+                return solver.solve_with_metrics(pick_data, engine=self._engine)
+            session = self._session
+            if session is None or session.table.pick_ids.tolist() != list(pick_data.keys()) \
+                    or session.table.costs.tolist() != [pick.cost for pick in pick_data.values()]:
+                self._session = solver.SolverSession(pick_data, options=self.options)
+                return self._session.team, self._session.metrics
+            skipped = session.skipped
+            team = session.update({pick_id: pick.points for pick_id, pick in pick_data.items()})
+            return team, None if session.skipped > skipped else session.metrics
+
+    def run(self, job: Job) -> Iterator[dict[str, Any]]:
+        """
+        Run a job.
+        :param job: the job
+        :return: the results; one per venue for `backtest`, one for all other commands
+        """
+        if job.command == "backtest":
+            yield from self._backtest(job)
+            return
+        # The span only covers the computation, not the time the consumer spends between the results
+        with tracing.span("cli.run", command=job.command):
+            result = self._run(job)
+        yield result
+
+    def _run(self, job: Job) -> dict[str, Any]:
+        venue_id = self.venue_id(job.season, job.venue)
+        pick_data = self.pick_data(job.season, venue_id, job.modes)
+        result: dict[str, Any] = {"command": job.command, "season": job.season, "venue_id": venue_id,
+                                  "modes": job.modes}
+        if job.command == "simulate":
+            result["picks"] = [pick_to_dict(pick)
+                               for pick in sorted(pick_data.values(), key=lambda p: p.points, reverse=True)]
+        elif job.command == "solve":
+            team, metrics = self.solve(pick_data)
+            result["team"] = team_to_dict(team)
+            result["metrics"] = None if metrics is None else metrics.to_dict()
+        elif job.command == "sensitivity":
+            import f1fantasyoptimizer.sensitivity as sensitivity
+
+            report = sensitivity.analyze(pick_data)
+            result["team"] = team_to_dict(report.team)
+            result.update(report.to_dict())
+        else:
+            result["team"] = team_to_dict(data.create_team_from_names((job.team, job.td), pick_data))
+        return result
+
+    def _backtest(self, job: Job) -> Iterator[dict[str, Any]]:
+        venues = self.store.venues(job.season)
+        venue_ids = [self.venue_id(job.season, job.venue)] if job.venue is not None else list(venues.values())
+        best_total = team_total = 0.0
+        for venue_id in venue_ids:
+            with tracing.span("cli.run", command=job.command, venue_id=venue_id):
+                pick_data = self.pick_data(job.season, venue_id, job.modes)
+                best, _ = self.solve(pick_data)
+                result: dict[str, Any] = {"command": "backtest", "season": job.season, "venue_id": venue_id,
+                                          "modes": job.modes, "best": team_to_dict(best)}
+                best_total += result["best"]["points"]
+                result["best_total"] = best_total
+                if job.team is not None:
+                    result["team"] = team_to_dict(data.create_team_from_names((job.team, job.td), pick_data))
+                    team_total += result["team"]["points"]
+                    result["team_total"] = team_total
+            yield result
+
+
+def read_jobs(file: TextIO) -> list[Job]:
+    """
+    Read jobs from a JSON Lines file. Empty lines are skipped.
+    :param file: the file containing one job per line
+    :return: the jobs
+    """
+    jobs = []
+    for i, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            jobs.append(Job.from_dict(json.loads(line)))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid job in line {i}: {e}") from None
+    return jobs
+
+
+def run_jobs(runner: Runner, jobs: list[Job], output: TextIO) -> bool:
+    """
+    Run jobs and write their results to a file as JSON Lines.
+
+    A failing job does not stop the remaining jobs; its error is written instead of its results.
+    :param runner: the runner
+    :param jobs: the jobs
+    :param output: the file to which the results are written
+    :return: whether all jobs succeeded
+    """
+    success = True
+    for i, job in enumerate(jobs):
+        try:
+            for result in runner.run(job):
+                output.write(json.dumps({"job": i, **result}) + "\n")
+                output.flush()
+        except Exception as e:
+            # Besides invalid jobs and failed downloads, this includes e.g. pages which cannot be parsed
+            output.write(json.dumps({"job": i, **job.to_dict(), "error": str(e.args[0] if e.args else e)}) + "\n")
+            output.flush()
+            success = False
+    return success
+
+
+def read_team(path: str) -> tuple[list[str], str]:
+    """
+    Read a team from a JSON file of the form `{"picks": [names], "td": name}`.
+    :param path: path of the file
+    :return: the names of the picks and the name of the turbo driver
+    """
+    with open(path) as f:
+        team = json.load(f)
+    if not isinstance(team, dict):
+        raise ValueError("expected a JSON object")
+    return list(team["picks"]), team["td"]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    arg_parser = argparse.ArgumentParser(
+        prog="f1fantasyoptimizer", description="Find the best team to pick in F1 Fantasy. Results are written to "
+                                               "stdout as JSON Lines.",
+        epilog="Run `f1fantasyoptimizer --gui` to start the GUI, `f1fantasyoptimizer --list-venues SEASON` to list "
+               "the venues of a season or `f1fantasyoptimizer --version` to print the version.")
+    solver_arguments = argparse.ArgumentParser(add_help=False)
+    solver_arguments.add_argument("--engine", help="engine which finds the best team: cpsat (default) or dp")
+    solver_arguments.add_argument("--time-limit", type=float, help="maximum number of seconds to search per solve")
+    solver_arguments.add_argument("--workers", type=int, help="number of parallel search workers of CP-SAT")
+    event_arguments = argparse.ArgumentParser(add_help=False)
+    event_arguments.add_argument("--season", type=int, required=True)
+    event_arguments.add_argument("--modes", nargs="+", default=[], metavar="MODE",
+                                 help="modes whose results are simulated, e.g. qualifying race-result; the points of "
+                                      "the fantasy game are used if no modes are given")
+    trace_arguments = argparse.ArgumentParser(add_help=False)
+    trace_arguments.add_argument("--trace", action="store_true",
+                                 help="print how long downloading, parsing, simulating and solving took to stderr; can "
+                                      f"also be enabled by setting the environment variable {tracing.TRACE_ENV_VAR}=1")
+    trace_arguments.add_argument("--trace-file", metavar="PATH",
+                                 help="trace the run and write the spans to a file in the Chrome trace format, which "
+                                      "can be opened with chrome://tracing or Perfetto")
+    team_arguments = argparse.ArgumentParser(add_help=False)
+    team_arguments.add_argument("--team", nargs="+", metavar="NAME", help="names of the drivers and constructors")
+    team_arguments.add_argument("--td", metavar="NAME", help="name of the turbo driver")
+    team_arguments.add_argument("--team-file", metavar="PATH",
+                                help='JSON file containing a team: {"picks": [names], "td": name}')
+
+    subparsers = arg_parser.add_subparsers(dest="command", required=True)
+    solve_parser = subparsers.add_parser("solve", parents=[event_arguments, solver_arguments, trace_arguments],
+                                         help="find the best team for an event")
+    solve_parser.add_argument("--venue", required=True, help="name or ID of the venue")
+    simulate_parser = subparsers.add_parser("simulate", parents=[event_arguments, trace_arguments],
+                                            help="calculate the points of all picks in an event")
+    simulate_parser.add_argument("--venue", required=True, help="name or ID of the venue")
+    evaluate_parser = subparsers.add_parser("evaluate", parents=[event_arguments, team_arguments, trace_arguments],
+                                            help="calculate the points of a team in an event")
+    evaluate_parser.add_argument("--venue", required=True, help="name or ID of the venue")
+    sensitivity_parser = subparsers.add_parser("sensitivity", parents=[event_arguments, trace_arguments],
+                                               help="find how far the points and the cost of every pick may change "
+                                                    "before the best team of an event changes")
+    sensitivity_parser.add_argument("--venue", required=True, help="name or ID of the venue")
+    backtest_parser = subparsers.add_parser("backtest", parents=[event_arguments, team_arguments, solver_arguments,
+                                                                     trace_arguments],
+                                            help="compare the best team and a team at every venue of a season")
+    backtest_parser.add_argument("--venue", help="name or ID of the venue, all venues of the season by default")
+    batch_parser = subparsers.add_parser("batch", parents=[solver_arguments, trace_arguments],
+                                         help="run many jobs in one process, sharing downloaded data and the solver")
+    batch_parser.add_argument("jobs", metavar="FILE",
+                              help='JSON Lines file with one job per line, e.g. {"command": "solve", "season": 2023, '
+                                   '"venue": "Bahrain", "modes": ["qualifying"]}, or - to read from stdin')
+    return arg_parser
+
+
+def main(argv: Optional[list[str]] = None):
+    arg_parser = build_parser()
+    args = arg_parser.parse_args(argv)
+
+    options = None
+    if getattr(args, "time_limit", None) is not None or getattr(args, "workers", None) is not None:
+        # The solver loads NumPy and OR-Tools, so it is only imported once it is needed
+        import f1fantasyoptimizer.solver as solver
+        options = solver.SolverOptions(workers=args.workers, time_limit=args.time_limit)
+    runner = Runner(engine=getattr(args, "engine", None), options=options)
+
+    if args.command == "batch":
+        try:
+            if args.jobs == "-":
+                jobs = read_jobs(sys.stdin)
+            else:
+                with open(args.jobs) as f:
+                    jobs = read_jobs(f)
+        except (OSError, ValueError) as e:
+            arg_parser.error(str(e))
+    else:
+        team, td = getattr(args, "team", None), getattr(args, "td", None)
+        if getattr(args, "team_file", None):
+            if team is not None or td is not None:
+                arg_parser.error("--team-file cannot be combined with --team or --td.")
+            try:
+                team, td = read_team(args.team_file)
+            except (OSError, ValueError, TypeError) as e:
+                arg_parser.error(f"Invalid team file `{args.team_file}`: {e}")
+            except KeyError as e:
+                arg_parser.error(f"Invalid team file `{args.team_file}`: the key `{e.args[0]}` is missing.")
+        try:
+            jobs = [Job(args.command, season=args.season, venue=args.venue, modes=args.modes, team=team, td=td)]
+        except ValueError as e:
+            arg_parser.error(str(e))
+    trace = args.trace_file if args.trace_file is not None else "" if args.trace else tracing.trace_from_env()
+    with tracing.record(trace):
+        if args.command == "batch":
+            runner.prefetch(jobs)
+        success = run_jobs(runner, jobs, sys.stdout)
+    if not success:
+        sys.exit(1)
 
 
 if __name__ == '__main__':
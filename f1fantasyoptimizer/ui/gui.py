@@ -1,12 +1,18 @@
 #!/usr/bin/env python3
+import concurrent.futures
 import tkinter as tk
 import tkinter.font
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional
 
 import f1fantasyoptimizer.data as data
 import f1fantasyoptimizer.simulator as simulator
-import f1fantasyoptimizer.solver as solver
+import f1fantasyoptimizer.store as store
+import f1fantasyoptimizer.tracing as tracing
 import f1fantasyoptimizer.ui.cli as cli
 
+if TYPE_CHECKING:
+    import f1fantasyoptimizer.sensitivity as sensitivity
+
 WINDOW_TITLE = "F1FantasyOptimizer"
 
 FANTASY_MODE = ("Fantasy", "")
@@ -18,7 +24,7 @@ class PickWidget(tk.Frame):
     """
     # Frame width in "M" characters of the largest font
     FRAME_WIDTH_CHARS = 10
-    FRAME_HEIGHT = 140
+    FRAME_HEIGHT = 160
     FRAME_PADDING = 5
     FRAME_RELIEF = tk.RAISED
     FRAME_BORDER_WIDTH = 1
@@ -35,6 +41,8 @@ class PickWidget(tk.Frame):
     TYPE_LABEL_TEXT_CONSTRUCTOR = "Constructor"
     TYPE_LABEL_TEXT_DRIVER = "Driver"
     TD_LABEL_TEXT = "TD"
+    # Text of the range of points within which the team stays the best team
+    RANGE_LABEL_TEXT = "Stable: {lower} to {upper} Pts"
 
     def __init__(self, parent, **kwargs):
         tk.Frame.__init__(self, parent, relief=PickWidget.FRAME_RELIEF, borderwidth=PickWidget.FRAME_BORDER_WIDTH,
@@ -65,12 +73,15 @@ class PickWidget(tk.Frame):
         type_font = tk.font.Font(font=self.type_label["font"])
         self.type_label.configure(font=type_font)
 
+        self.range_label = tk.Label(self)
+
         self.td_label.grid(row=0, column=0, columnspan=2, sticky=tk.N, pady=(PickWidget.FRAME_PADDING, 0))
         self.name_label.grid(row=1, column=0, columnspan=2, sticky=tk.N + tk.W + tk.E, padx=PickWidget.FRAME_PADDING)
         self.type_label.grid(row=2, column=0, columnspan=2, sticky=tk.N + tk.W + tk.E,
                              pady=(0, PickWidget.TYPE_PADDING_BOT * self.type_label.winfo_reqheight()))
         self.points_label.grid(row=3, column=0, sticky=tk.N + tk.W + tk.E)
         self.cost_label.grid(row=3, column=1, sticky=tk.N + tk.W + tk.E)
+        self.range_label.grid(row=4, column=0, columnspan=2, sticky=tk.N + tk.W + tk.E)
 
         # Size of the frame defined by a given amount of "M" characters in the largest font
         frame_width = name_font.measure("M" * PickWidget.FRAME_WIDTH_CHARS) + 2 * PickWidget.FRAME_PADDING
@@ -81,7 +92,7 @@ class PickWidget(tk.Frame):
         self.grid_columnconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=1)
 
-    def set_pick(self, pick):
+    def set_pick(self, pick, pick_sensitivity: Optional["sensitivity.PickSensitivity"] = None):
         if pick.pick_type == data.Pick.PickType.DRIVER:
             bg_color = PickWidget.FRAME_BG_COLOR_DRIVER
             self.type_label.config(text=PickWidget.TYPE_LABEL_TEXT_DRIVER)
@@ -96,11 +107,17 @@ class PickWidget(tk.Frame):
         self.name_label.config(text=pick.name)
         self.points_label.config(text=f"{pick.points} Pts")
         self.cost_label.config(text=f"${pick.cost:.1f}M")
+        if pick_sensitivity is None:
+            self.range_label.config(text="")
+        else:
+            self.range_label.config(text=PickWidget.RANGE_LABEL_TEXT.format(
+                lower=f"{pick_sensitivity.points_lower:.1f}", upper=f"{pick_sensitivity.points_upper:.1f}"))
         self.configure(bg=bg_color)
         self.name_label.configure(bg=bg_color)
         self.type_label.configure(bg=bg_color)
         self.points_label.configure(bg=bg_color)
         self.cost_label.configure(bg=bg_color)
+        self.range_label.configure(bg=bg_color)
 
 
 class TeamWidget(tk.Frame):
@@ -177,9 +194,9 @@ class TeamWidget(tk.Frame):
         self.total_cost.pack(side=tk.LEFT, padx=TeamWidget.TOTAL_PADDING)
         self.row3.pack(pady=(TeamWidget.TOTAL_PADDING_TOP, 0), fill=tk.Y, expand=False)
 
-    def set_team(self, team: data.Team):
+    def set_team(self, team: data.Team, report: Optional["sensitivity.SensitivityReport"] = None):
         for i, pick in enumerate(team):
-            self.picks[i].set_pick(pick)
+            self.picks[i].set_pick(pick, None if report is None else report[pick.name])
         total = simulator.calculate_team_totals(team)
         self.total_points.config(text=f"{total['points']} Pts")
         self.total_cost.config(text=f"${total['cost']:.1f}M")
@@ -195,6 +212,9 @@ class MainWindow(tk.Frame):
     OPTIONMENU_BG_ACTIVE = "white"
     # Border color of the OptionMenus. Pass "parent" to use the background color of the parent widget.
     OPTIONMENU_HIGHLIGHTBACKGROUND = "parent"
+    # Interval in milliseconds in which the results of the background worker are polled
+    POLL_INTERVAL = 20
+    STATUS_TEXT_LOADING = "Loading..."
 
     def __init__(self, parent, **kwargs):
         tk.Frame.__init__(self, parent, **kwargs)
@@ -214,23 +234,33 @@ class MainWindow(tk.Frame):
         else:
             optionmenu_highlightbackground = MainWindow.OPTIONMENU_HIGHLIGHTBACKGROUND
 
+        self.store = store.DataStore()
+        # Loads data and solves on a single background thread, so that the Tk main loop never blocks
+        self.worker = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        # Venues, modes, best teams and their sensitivity of all combinations of season, venue and mode which have
+        # already been solved
+        self.teams: dict[tuple[data.Season, data.Venue.Name, data.Mode.Name],
+                         tuple[data.Venues, data.Modes, data.Team, "sensitivity.SensitivityReport"]] = dict()
+        self.seasons: list[data.Season] = []
+        self.venues: data.Venues = dict()
+        self.modes: data.Modes = dict()
+        self.pending: Optional[concurrent.futures.Future] = None
+        self.updating_options = False
+
         self.options_frame = tk.Frame(self, bg=self["bg"])
 
         self.event_season = tk.IntVar(self)
         self.event_venue = tk.StringVar(self)
         self.event_mode = tk.StringVar(self)
 
-        years = data.download_seasons()
-        self.event_season.set(years[0])
-        self.yom = tk.OptionMenu(self.options_frame, self.event_season, *years)
+        # The menus of the seasons and venues are filled once they are downloaded
+        self.yom = tk.OptionMenu(self.options_frame, self.event_season, "")
         self.event_season.trace("w", lambda name, index, mode: self.update())
         self.yom.config(bg=optionmenu_bg, highlightbackground=optionmenu_highlightbackground,
                         activebackground=optionmenu_bg_active)
         self.yom["menu"].config(bg=optionmenu_bg)
 
-        events = data.download_venues(self.event_season.get())
-        self.event_venue.set(next(iter(events)))
-        self.pom = tk.OptionMenu(self.options_frame, self.event_venue, *events.keys())
+        self.pom = tk.OptionMenu(self.options_frame, self.event_venue, "")
         self.event_venue.trace("w", lambda name, index, mode: self.update())
         self.pom.config(bg=optionmenu_bg, highlightbackground=optionmenu_highlightbackground,
                         activebackground=optionmenu_bg_active)
@@ -244,6 +274,7 @@ class MainWindow(tk.Frame):
         self.mom["menu"].config(bg=optionmenu_bg)
 
         self.team_widget = TeamWidget(self, bg=self["bg"])
+        self.status_label = tk.Label(self, bg=self["bg"])
 
         self.yom.grid(row=0, column=0, sticky=MainWindow.WIDGETS_STICKY)
         self.pom.grid(row=0, column=1, sticky=MainWindow.WIDGETS_STICKY)
@@ -255,29 +286,121 @@ class MainWindow(tk.Frame):
         self.options_frame.pack(fill=tk.X, expand=False)
 
         self.team_widget.pack(fill=tk.BOTH, expand=True)
+        self.status_label.pack(fill=tk.X, expand=False)
 
         self.pack(padx=MainWindow.PADDING, pady=MainWindow.PADDING, fill=tk.BOTH, expand=True)
 
-        self.update()
+        # Even the seasons are downloaded by the background worker, so the window appears before any download
+        self.status_label.config(text=MainWindow.STATUS_TEXT_LOADING)
+        self.pending = self.worker.submit(self.store.seasons)
+        self.after(MainWindow.POLL_INTERVAL, self.poll, self.pending, self.show_seasons)
+
+    def show_seasons(self, seasons: list[data.Season]):
+        self.seasons = seasons
+        self.set_menu(self.yom, self.event_season, seasons)
+        # Selecting a season triggers `update`, which loads the venues and the best team
+        self.event_season.set(seasons[0])
 
     def update(self):
-        season = self.event_season.get()
-        venue_id = data.download_venues(season)[self.event_venue.get()]
-        pick_data = data.download_pick_data()
-        modes = {FANTASY_MODE[0]: FANTASY_MODE[1], **data.download_event_modes(venue_id=venue_id, season=season)}
-        self.mom["menu"].delete("0", tk.END)
-        for mode in modes.keys():
-            self.mom["menu"].add_command(label=mode, command=tk._setit(self.event_mode, mode))
-        mode = modes[self.event_mode.get()]
+        if self.updating_options or not self.seasons:
+            return
+        key = (self.event_season.get(), self.event_venue.get(), self.event_mode.get())
+        if key in self.teams:
+            # A load of an earlier selection which is still running must not replace this one
+            self.pending = None
+            venues, modes, team, report = self.teams[key]
+            self.set_options(key, venues, modes)
+            self.show_team(team, report)
+            return
+        self.status_label.config(text=MainWindow.STATUS_TEXT_LOADING)
+        self.pending = self.worker.submit(self.load, *key)
+        self.after(MainWindow.POLL_INTERVAL, self.poll, self.pending, self.show_loaded)
+
+    @tracing.traced("gui.load")
+    def load(self, season: data.Season, venue_name: data.Venue.Name, mode_name: data.Mode.Name) \
+            -> tuple[tuple[data.Season, data.Venue.Name, data.Mode.Name], data.Venues, data.Modes, data.Team,
+                     "sensitivity.SensitivityReport"]:
+        """
+        Download all data required for the given selection, find the best team and how stable it is.
+
+        Runs on the background worker, so it must not access any widgets.
+        """
+        # The analysis loads NumPy, so it is imported by the worker instead of delaying the window
+        import f1fantasyoptimizer.sensitivity as sensitivity
+
+        venues = self.store.venues(season)
+        if venue_name not in venues:
+            venue_name = next(iter(venues))
+        venue_id = venues[venue_name]
+        modes = {FANTASY_MODE[0]: FANTASY_MODE[1], **self.store.event_modes(season=season, venue_id=venue_id)}
+        if mode_name not in modes:
+            mode_name = FANTASY_MODE[0]
+        pick_data = self.store.pick_data()
+        mode = modes[mode_name]
         if mode:
-            data.reset_points(pick_data)
-            event_data = data.download_event_data(venue_id=venue_id, season=season,
-                                                  modes=[mode])
-            simulator.simulate(pick_data, event_data[mode])
+            table = pick_data.table()
+            table.points = simulator.score(table, self.store.mode_data(season=season, venue_id=venue_id, mode=mode))
+            table.write_points(pick_data)
             cli.print_pick_data(pick_data)
 
-        best_team = sorted(solver.solve(pick_data), key=lambda p: (str(p.pick_type), p.cost), reverse=True)
-        self.team_widget.set_team(best_team)
+        report = sensitivity.analyze(pick_data)
+        best_team = sorted(report.team, key=lambda p: (str(p.pick_type), p.cost), reverse=True)
+        return (season, venue_name, mode_name), venues, modes, best_team, report
+
+    def poll(self, future: concurrent.futures.Future, callback: Callable[[Any], None]):
+        """
+        Wait for a result of the background worker without blocking the main loop and pass it to `callback`.
+        """
+        if not future.done():
+            self.after(MainWindow.POLL_INTERVAL, self.poll, future, callback)
+            return
+        if future is not self.pending:
+            # The selection changed in the meantime, a newer result is on its way or was taken from the cache
+            return
+        self.pending = None
+        try:
+            result = future.result()
+        except Exception as e:
+            self.status_label.config(text=f"Error: {e}")
+            return
+        callback(result)
+
+    def show_loaded(self, result: tuple[tuple[data.Season, data.Venue.Name, data.Mode.Name], data.Venues, data.Modes,
+                                        data.Team, "sensitivity.SensitivityReport"]):
+        key, venues, modes, best_team, report = result
+        self.teams[key] = (venues, modes, best_team, report)
+        self.set_options(key, venues, modes)
+        self.show_team(best_team, report)
+
+    @staticmethod
+    def set_menu(option_menu: tk.OptionMenu, variable: tk.Variable, values: Iterable):
+        option_menu["menu"].delete("0", tk.END)
+        for value in values:
+            option_menu["menu"].add_command(label=value, command=tk._setit(variable, value))
+
+    def set_options(self, key: tuple[data.Season, data.Venue.Name, data.Mode.Name], venues: data.Venues,
+                    modes: data.Modes):
+        # Changing the selected values triggers `update`, which must not start a new download
+        self.updating_options = True
+        try:
+            if venues != self.venues:
+                self.venues = venues
+                self.set_menu(self.pom, self.event_venue, venues.keys())
+            if modes != self.modes:
+                self.modes = modes
+                self.set_menu(self.mom, self.event_mode, modes.keys())
+            self.event_venue.set(key[1])
+            self.event_mode.set(key[2])
+        finally:
+            self.updating_options = False
+
+    def show_team(self, team: data.Team, report: Optional["sensitivity.SensitivityReport"] = None):
+        self.status_label.config(text="")
+        self.team_widget.set_team(team, report)
+
+    def destroy(self):
+        self.worker.shutdown(wait=False, cancel_futures=True)
+        super().destroy()
 
 
 class App(tk.Tk):
@@ -297,8 +420,10 @@ class App(tk.Tk):
 
 
 def main():
-    app = App()
-    app.mainloop()
+    # The spans of all refreshes are reported when the window is closed
+    with tracing.record(tracing.trace_from_env()):
+        app = App()
+        app.mainloop()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import sys
+from typing import Any, Optional
+
+import f1fantasyoptimizer.data as data
+import f1fantasyoptimizer.ui.cli as cli
+
+# Commands which can be requested over HTTP, each at `POST /<command>`
+SERVER_COMMANDS: tuple[str, ...] = ("solve", "simulate", "evaluate")
+DEFAULT_HOST: str = "127.0.0.1"
+DEFAULT_PORT: int = 8421
+# Requests with larger bodies are rejected
+MAX_BODY_SIZE: int = 1 << 16
+# Seconds an idle keep-alive connection is kept open
+KEEP_ALIVE_TIMEOUT: float = 30.0
+
+_REASONS: dict[int, str] = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                            413: "Payload Too Large", 431: "Request Header Fields Too Large",
+                            500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    """
+    Error which is reported to the client with the given status code.
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class OptimizationServer:
+    """
+    Local HTTP server answering solve, simulate and evaluate requests.
+
+    The picks, the downloaded results and the CP-SAT model are kept in memory by a `cli.Runner` between requests. Jobs
+    run in a thread pool, so the event loop keeps accepting requests while a solve is running. Identical requests which
+    arrive while the first of them is still running share its result instead of being run again.
+
+    Requests are `POST /solve`, `POST /simulate` and `POST /evaluate` with a JSON object containing the keys of a
+    `cli.Job` except `command`, e.g. `{"season": 2023, "venue": "Bahrain", "modes": ["qualifying"]}`. `GET /health`
+    reports the number of requests served so far.
+    """
+
+    def __init__(self, runner: Optional[cli.Runner] = None, *, max_workers: int = data.DEFAULT_MAX_WORKERS):
+        """
+        :param runner: the runner which runs the jobs, `None` to create one with the default engine
+        :param max_workers: maximum number of jobs which run at the same time
+        """
+        self.runner = runner or cli.Runner()
+        self.max_workers = max_workers
+        # Number of jobs requested and number of requests which joined an identical running job
+        self.requests = 0
+        self.coalesced = 0
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._inflight: dict[str, asyncio.Future] = dict()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.Server:
+        """
+        Start listening for requests. The picks are downloaded before the first request is accepted.
+        :param host: the interface to listen on
+        :param port: the port to listen on, `0` to choose a free port
+        :return: the listening server; close it and call `close` to stop
+        """
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.runner.store.pick_data)
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    def close(self):
+        """
+        Stop the worker threads after the running jobs are finished.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def run_job(self, job: cli.Job) -> dict[str, Any]:
+        """
+        Run a job in the thread pool, sharing the result with identical jobs which are running already.
+        :param job: the job; `backtest` is not supported
+        :return: the result of the job
+        """
+        if job.command not in SERVER_COMMANDS:
+            raise ValueError(f"The command `{job.command}` is not supported by the server.")
+        self.requests += 1
+        key = json.dumps(job.to_dict(), sort_keys=True)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # Shielded, so that a client disconnecting does not cancel the job for the other clients
+            return await asyncio.shield(future)
+        future = asyncio.get_running_loop().run_in_executor(self._executor, lambda: next(self.runner.run(job)))
+        self._inflight[key] = future
+        # Removed once the job is done rather than when this request ends, which happens earlier if its client
+        # disconnects, so that identical requests still share the running job
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(_read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except HTTPError as e:
+                    await _write_response(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                except ValueError as e:
+                    await _write_response(writer, 400, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, response = await self._respond(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await _write_response(writer, status, response, keep_alive=keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, method: str, path: str, body: bytes) -> tuple[int, dict[str, Any]]:
+        try:
+            if path == "/health":
+                if method != "GET":
+                    raise HTTPError(405, f"Use GET for `{path}`.")
+                return 200, {"status": "ok", "requests": self.requests, "coalesced": self.coalesced}
+            command = path.strip("/")
+            if command not in SERVER_COMMANDS:
+                raise HTTPError(404, f"Unknown path `{path}`.")
+            if method != "POST":
+                raise HTTPError(405, f"Use POST for `{path}`.")
+            try:
+                arguments = json.loads(body or b"{}")
+            except ValueError:
+                raise HTTPError(400, "The body is not valid JSON.") from None
+            if not isinstance(arguments, dict):
+                raise HTTPError(400, "The body must be a JSON object.")
+            return 200, await self.run_job(cli.Job.from_dict({**arguments, "command": command}))
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except (ValueError, TypeError) as e:
+            return 400, {"error": str(e)}
+        except KeyError as e:
+            return 404, {"error": str(e.args[0] if e.args else e)}
+        except (RuntimeError, OSError) as e:
+            return 500, {"error": str(e)}
+        except Exception as e:
+            # An unexpected error must not leave the client without a response
+            return 500, {"error": f"Internal error: {type(e).__name__}: {e}"}
+
+
+async def _read_line(reader: asyncio.StreamReader) -> bytes:
+    """
+    Read a line of the request head.
+    :param reader: the stream of the connection
+    :return: the line including its line break
+    """
+    try:
+        return await reader.readline()
+    except ValueError:
+        # `readline` turns the `LimitOverrunError` of a line exceeding the limit of the stream into a `ValueError`
+        raise HTTPError(431, "A line of the request head is too long.") from None
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[tuple[str, str, dict[str, str], bytes]]:
+    """
+    Read an HTTP/1.1 request.
+    :param reader: the stream of the connection
+    :return: the method, path, headers with lower case names and body of the request, `None` if the connection was
+        closed before a request started
+    """
+    request_line = await _read_line(reader)
+    if not request_line.strip():
+        return None
+    try:
+        method, path, _ = request_line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "Malformed request line.") from None
+    headers = dict()
+    while True:
+        line = await _read_line(reader)
+        if not line.strip():
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(400, "Malformed Content-Length header.") from None
+    if length > MAX_BODY_SIZE:
+        raise HTTPError(413, f"The body exceeds {MAX_BODY_SIZE} bytes.")
+    body = await reader.readexactly(length) if length else b""
+    return method, path.split("?", 1)[0], headers, body
+
+
+async def _write_response(writer: asyncio.StreamWriter, status: int, response: dict[str, Any], *,
+                          keep_alive: bool = True):
+    body = json.dumps(response).encode()
+    writer.write(f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                 .encode("latin-1") + body)
+    await writer.drain()
+
+
+async def serve(server: OptimizationServer, host: str, port: int):
+    listener = await server.start(host, port)
+    print(f"Listening on http://{host}:{listener.sockets[0].getsockname()[1]}", file=sys.stderr)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main(argv: Optional[list[str]] = None):
+    arg_parser = argparse.ArgumentParser(prog="f1fantasyoptimizer-server",
+                                         description="Serve solve, simulate and evaluate requests over HTTP.")
+    arg_parser.add_argument("--host", default=DEFAULT_HOST)
+    arg_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    arg_parser.add_argument("--engine", help="engine which finds the best team: cpsat (default) or dp")
+    arg_parser.add_argument("--max-workers", type=int, default=data.DEFAULT_MAX_WORKERS,
+                            help="maximum number of requests which are processed at the same time")
+    args = arg_parser.parse_args(argv)
+    server = OptimizationServer(cli.Runner(engine=args.engine), max_workers=args.max_workers)
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
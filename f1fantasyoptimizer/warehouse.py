@@ -0,0 +1,320 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, Optional
+
+import f1fantasyoptimizer.cache as cache
+import f1fantasyoptimizer.data as data
+
+# Name of the warehouse file in the cache directory
+DEFAULT_FILE_NAME: str = "results.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seasons (
+    season INTEGER PRIMARY KEY,
+    complete INTEGER NOT NULL,
+    ingested_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS venues (
+    season INTEGER NOT NULL,
+    venue_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    round INTEGER NOT NULL,
+    PRIMARY KEY (season, venue_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS modes (
+    season INTEGER NOT NULL,
+    venue_id TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (season, venue_id, mode)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS drivers (
+    driver_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    normalized_name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS drivers_normalized_name ON drivers (normalized_name);
+CREATE TABLE IF NOT EXISTS events (
+    event_id INTEGER PRIMARY KEY,
+    season INTEGER NOT NULL,
+    venue_id TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    ingested_at REAL NOT NULL,
+    UNIQUE (season, venue_id, mode)
+);
+CREATE INDEX IF NOT EXISTS events_mode ON events (mode, season);
+CREATE TABLE IF NOT EXISTS results (
+    event_id INTEGER NOT NULL REFERENCES events (event_id),
+    position INTEGER NOT NULL,
+    placement TEXT NOT NULL,
+    classified INTEGER NOT NULL,
+    driver_id INTEGER NOT NULL REFERENCES drivers (driver_id),
+    PRIMARY KEY (event_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_driver ON results (driver_id, event_id);
+"""
+
+
+def default_path() -> str:
+    """
+    Get the path of the warehouse file used by default, which is located in the cache directory.
+    :return: path of the default warehouse file
+    """
+    return os.path.join(cache.default_cache_dir(), DEFAULT_FILE_NAME)
+
+
+def _filter(column: str, values: Optional[Iterable]) -> tuple[str, list]:
+    if values is None:
+        return "", []
+    values = list(values)
+    return f" AND {column} IN ({', '.join('?' * len(values))})", values
+
+
+class ResultsWarehouse:
+    """
+    Local SQLite database containing the results of all ingested seasons.
+
+    Every results page is downloaded and parsed once. The placements are stored normalized into tables of seasons,
+    venues, modes, drivers, events and results, so they can be queried without accessing the network or parsing HTML.
+    Events without results, e.g. rounds which have not taken place yet, are not stored and are downloaded again by the
+    next ingest. The warehouse is thread-safe.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        :param path: path of the database file, `":memory:"` for a database which is not persisted, `None` for the
+            default path
+        """
+        self.path = default_path() if path is None else path
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def close(self):
+        """
+        Close the database.
+        """
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "ResultsWarehouse":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _query(self, sql: str, parameters: Iterable = ()) -> list[tuple]:
+        with self._lock:
+            return self._connection.execute(sql, tuple(parameters)).fetchall()
+
+    def ingest(self, season: data.Season, *, refresh: bool = False,
+               max_workers: int = data.DEFAULT_MAX_WORKERS) -> int:
+        """
+        Download all results of a season which are not stored yet.
+
+        Seasons which were stored completely before are skipped without any request. Otherwise, the venues are
+        downloaded, and the modes and results pages are only downloaded for venues with missing results.
+        :param season: the season to ingest
+        :param refresh: whether all results of the season should be downloaded again
+        :param max_workers: maximum number of pages which are downloaded concurrently
+        :return: the number of events which were stored
+        """
+        if refresh:
+            self.delete(season)
+        elif self._query("SELECT complete FROM seasons WHERE season = ?", (season,)) == [(1,)]:
+            return 0
+
+        venues = data.download_venues(season)
+        venue_modes = self._stored_modes(season)
+        stored = self._stored_events(season)
+        # The modes of a venue are downloaded again as long as some of its results are missing, because the website
+        # may add modes while the event is taking place
+        incomplete = [venue_id for venue_id in venues.values()
+                      if venue_id not in venue_modes or any((venue_id, mode) not in stored
+                                                            for mode in venue_modes[venue_id])]
+        executor = data.download_executor(max_workers)
+        mode_futures = {venue_id: executor.submit(data.download_event_modes, season=season, venue_id=venue_id)
+                        for venue_id in incomplete}
+        downloaded_modes = {venue_id: future.result() for venue_id, future in mode_futures.items()}
+        futures = {(venue_id, mode): executor.submit(data.download_mode_data, season=season, venue_id=venue_id,
+                                                     mode=mode)
+                   for venue_id, modes in downloaded_modes.items() for mode in modes.values()
+                   if (venue_id, mode) not in stored}
+        results = {key: future.result() for key, future in futures.items()}
+
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO venues (season, venue_id, name, round) VALUES (?, ?, ?, ?)",
+                [(season, venue_id, name, i) for i, (name, venue_id) in enumerate(venues.items())])
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO modes (season, venue_id, mode, name) VALUES (?, ?, ?, ?)",
+                [(season, venue_id, mode, name) for venue_id, modes in downloaded_modes.items()
+                 for name, mode in modes.items()])
+            n_events = 0
+            for (venue_id, mode), order in results.items():
+                if order:
+                    self._insert_event(season, venue_id, mode, order, now)
+                    n_events += 1
+            missing = self._connection.execute(
+                "SELECT COUNT(*) FROM modes LEFT JOIN events USING (season, venue_id, mode) "
+                "WHERE modes.season = ? AND events.event_id IS NULL", (season,)).fetchone()[0]
+            n_venues_with_modes = self._connection.execute(
+                "SELECT COUNT(DISTINCT venue_id) FROM modes WHERE season = ?", (season,)).fetchone()[0]
+            # Results of past seasons do not change anymore once all of them are stored
+            complete = season < datetime.today().year and not missing and n_venues_with_modes == len(venues)
+            self._connection.execute("INSERT OR REPLACE INTO seasons (season, complete, ingested_at) VALUES (?, ?, ?)",
+                                     (season, int(complete), now))
+        return n_events
+
+    def add_event(self, *, season: data.Season, venue_id: data.Venue.Id, mode: data.Mode.Id,
+                  order: list[tuple[str, str]]):
+        """
+        Store the results of an event which were obtained elsewhere, replacing stored results of the same event.
+        :param season: the season of the event
+        :param venue_id: the venue of the event
+        :param mode: the mode of the event
+        :param order: a list of the placement of a driver and their name
+        """
+        with self._lock, self._connection:
+            self._insert_event(season, venue_id, mode, order, time.time())
+
+    def _insert_event(self, season: data.Season, venue_id: data.Venue.Id, mode: data.Mode.Id,
+                      order: list[tuple[str, str]], now: float):
+        # Must be called while holding the lock within a transaction
+        connection = self._connection
+        connection.execute("DELETE FROM results WHERE event_id IN "
+                           "(SELECT event_id FROM events WHERE season = ? AND venue_id = ? AND mode = ?)",
+                           (season, venue_id, mode))
+        connection.execute("INSERT OR REPLACE INTO events (season, venue_id, mode, ingested_at) VALUES (?, ?, ?, ?)",
+                           (season, venue_id, mode, now))
+        event_id = connection.execute("SELECT event_id FROM events WHERE season = ? AND venue_id = ? AND mode = ?",
+                                      (season, venue_id, mode)).fetchone()[0]
+        connection.executemany("INSERT OR IGNORE INTO drivers (name, normalized_name) VALUES (?, ?)",
+                               [(name, data.normalize_name(name)) for _, name in order])
+        names = list({name for _, name in order})
+        driver_ids = dict(connection.execute(
+            f"SELECT name, driver_id FROM drivers WHERE name IN ({', '.join('?' * len(names))})", names).fetchall())
+        connection.executemany(
+            "INSERT INTO results (event_id, position, placement, classified, driver_id) VALUES (?, ?, ?, ?, ?)",
+            [(event_id, i, placement, int(placement.isdigit()), driver_ids[name])
+             for i, (placement, name) in enumerate(order)])
+
+    def delete(self, season: data.Season):
+        """
+        Remove all stored data of a season.
+        :param season: the season to remove
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM results WHERE event_id IN "
+                                     "(SELECT event_id FROM events WHERE season = ?)", (season,))
+            for table in ("events", "modes", "venues", "seasons"):
+                self._connection.execute(f"DELETE FROM {table} WHERE season = ?", (season,))
+
+    def _stored_modes(self, season: data.Season) -> dict[data.Venue.Id, list[data.Mode.Id]]:
+        venue_modes = dict()
+        for venue_id, mode in self._query("SELECT venue_id, mode FROM modes WHERE season = ?", (season,)):
+            venue_modes.setdefault(venue_id, []).append(mode)
+        return venue_modes
+
+    def _stored_events(self, season: data.Season) -> set[tuple[data.Venue.Id, data.Mode.Id]]:
+        return set(self._query("SELECT venue_id, mode FROM events WHERE season = ?", (season,)))
+
+    def seasons(self) -> list[data.Season]:
+        """
+        Get all stored seasons.
+        :return: a list of all stored seasons, the latest first
+        """
+        return [season for season, in self._query("SELECT season FROM seasons ORDER BY season DESC")]
+
+    def venues(self, season: data.Season) -> data.Venues:
+        """
+        Get all stored venues of a season.
+        :param season: the season for which to get the list of venues
+        :return: a dictionary consisting of all venues and their IDs in the order of the rounds
+        """
+        return dict(self._query("SELECT name, venue_id FROM venues WHERE season = ? ORDER BY round", (season,)))
+
+    def event_modes(self, *, season: data.Season, venue_id: data.Venue.Id) -> data.Modes:
+        """
+        Get the stored modes of a venue.
+        :param season: the season for which to get the data
+        :param venue_id: the venue for which to get the data
+        :return: a dictionary consisting of all modes and their IDs
+        """
+        return dict(self._query("SELECT name, mode FROM modes WHERE season = ? AND venue_id = ?", (season, venue_id)))
+
+    def mode_data(self, *, season: data.Season, venue_id: data.Venue.Id, mode: data.Mode.Id) \
+            -> list[tuple[str, str]]:
+        """
+        Get the stored placement data for a single mode of a venue.
+        :param season: the season for which to get the data
+        :param venue_id: the venue for which to get the data
+        :param mode: the mode for which to get placement data
+        :return: a list of the placement of a driver and their name
+        """
+        rows = self._query("SELECT events.event_id, placement, drivers.name FROM events "
+                           "LEFT JOIN results USING (event_id) LEFT JOIN drivers USING (driver_id) "
+                           "WHERE season = ? AND venue_id = ? AND mode = ? ORDER BY position",
+                           (season, venue_id, mode))
+        if not rows:
+            raise KeyError(f"No results stored for mode `{mode}` of venue `{venue_id}` in season {season}.")
+        return [(placement, name) for _, placement, name in rows if name is not None]
+
+    def season_results(self, season: data.Season, *, modes: Optional[list[data.Mode.Id]] = None) -> data.SeasonData:
+        """
+        Get the stored placement data of all venues of a season.
+        :param season: the season for which to get the data
+        :param modes: a list of modes for which to get placement data, `None` for all modes
+        :return: dictionary containing the placement data of all venues of the season in the order of the rounds
+        """
+        mode_filter, mode_values = _filter("events.mode", modes)
+        season_data: data.SeasonData = dict()
+        for venue_id, mode, placement, name in self._query(
+                "SELECT venue_id, events.mode, placement, drivers.name FROM events "
+                "LEFT JOIN venues USING (season, venue_id) JOIN results USING (event_id) "
+                "JOIN drivers USING (driver_id) "
+                f"WHERE season = ?{mode_filter} ORDER BY round, events.mode, position", [season] + mode_values):
+            season_data.setdefault(venue_id, dict()).setdefault(mode, []).append((placement, name))
+        return season_data
+
+    def orders(self, *, seasons: Optional[Iterable[data.Season]] = None,
+               modes: Optional[Iterable[data.Mode.Id]] = None) -> list[list[tuple[str, str]]]:
+        """
+        Get the finishing orders of all stored events, e.g. for `montecarlo.PositionDistribution.from_results`.
+        :param seasons: the seasons of the events, `None` for all seasons
+        :param modes: the modes of the events, `None` for all modes
+        :return: the results of all matching events, each a list of the placement of a driver and their name
+        """
+        season_filter, season_values = _filter("season", seasons)
+        mode_filter, mode_values = _filter("mode", modes)
+        orders: dict[int, list[tuple[str, str]]] = dict()
+        for event_id, placement, name in self._query(
+                "SELECT event_id, placement, drivers.name FROM events "
+                "JOIN results USING (event_id) JOIN drivers USING (driver_id) "
+                f"WHERE 1{season_filter}{mode_filter} ORDER BY event_id, position", season_values + mode_values):
+            orders.setdefault(event_id, []).append((placement, name))
+        return list(orders.values())
+
+    def driver_results(self, name: str, *, modes: Optional[Iterable[data.Mode.Id]] = None) \
+            -> list[tuple[data.Season, data.Venue.Id, data.Mode.Id, str]]:
+        """
+        Get all stored results of a driver.
+
+        Names are compared like `data.PickData.find` does, so accents, case and the order of the names do not matter.
+        :param name: the name of the driver
+        :param modes: the modes of the events, `None` for all modes
+        :return: the season, venue, mode and placement of every result of the driver, the latest season first
+        """
+        mode_filter, mode_values = _filter("mode", modes)
+        return self._query(
+            "SELECT season, venue_id, mode, placement FROM drivers "
+            "JOIN results USING (driver_id) JOIN events USING (event_id) LEFT JOIN venues USING (season, venue_id) "
+            f"WHERE normalized_name = ?{mode_filter} ORDER BY season DESC, round, mode",
+            [data.normalize_name(name)] + mode_values)